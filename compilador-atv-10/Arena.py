@@ -0,0 +1,141 @@
+from array import array
+from Syntactic import (
+    Const, Var, OpBin,
+    Decl, Programa,
+    CmdAtrib, CmdIf, CmdWhile,
+    OPERADORES_BINARIOS, inteiro_64,
+)
+
+# Tipos de nó da arena
+CONST, VAR, OPBIN, DECL, ATRIB, IF, WHILE, PROGRAMA = range(8)
+
+# Código de cada operador na coluna 'operador'
+OPERADORES = list(OPERADORES_BINARIOS)
+CODIGOS_OPERADORES = {op: codigo for codigo, op in enumerate(OPERADORES)}
+
+# marca de "sem nó" (fim de lista, filho ausente) e de "sem posição"
+NENHUM = -1
+
+
+class ArenaAST:
+    """AST em colunas paralelas: cada nó é um índice nas arrays abaixo.
+
+    Colunas (por nó):
+        tipo      CONST, VAR, OPBIN, DECL, ATRIB, IF, WHILE ou PROGRAMA
+        operador  código do operador (OPBIN)
+        esq       OPBIN: operando esquerdo; DECL/ATRIB: expressão;
+                  IF/WHILE: condição; PROGRAMA: primeira declaração
+        dir       OPBIN: operando direito; IF: primeiro comando do then;
+                  WHILE: primeiro comando do corpo; PROGRAMA: primeiro comando
+        valor     CONST: o valor; VAR/DECL/ATRIB: índice do nome em nomes;
+                  IF: primeiro comando do else; PROGRAMA: expressão do return
+        prox      próximo item da mesma lista (declarações ou comandos)
+        posicao   posição no fonte (VAR/ATRIB), para as mensagens de erro
+
+    Os métodos com o nome das classes da AST (Const, Var, OpBin, ...) têm
+    a mesma assinatura dos construtores, então o Parser monta a arena no
+    lugar dos objetos (Parser(lexer, arena=ArenaAST())).
+    """
+
+    def __init__(self):
+        self.tipo = array('b')
+        self.operador = array('b')
+        self.esq = array('i')
+        self.dir = array('i')
+        self.valor = array('q')
+        self.prox = array('i')
+        self.posicao = array('q')
+
+        # nomes de variáveis (a coluna valor guarda o índice)
+        self.nomes = []
+        self.indices_nomes = {}
+
+    def __len__(self):
+        return len(self.tipo)
+
+    def novo(self, tipo, operador=0, esq=NENHUM, dir=NENHUM, valor=0, posicao=None):
+        self.tipo.append(tipo)
+        self.operador.append(operador)
+        self.esq.append(esq)
+        self.dir.append(dir)
+        self.valor.append(valor)
+        self.prox.append(NENHUM)
+        self.posicao.append(NENHUM if posicao is None else posicao)
+        return len(self.tipo) - 1
+
+    def nome(self, nome):
+        """Índice do nome na tabela de nomes (acrescenta se for novo)."""
+        indice = self.indices_nomes.get(nome)
+        if indice is None:
+            indice = self.indices_nomes[nome] = len(self.nomes)
+            self.nomes.append(nome)
+        return indice
+
+    def encadear(self, nos):
+        """Liga uma lista de nós pela coluna prox; retorna o primeiro (ou NENHUM)."""
+        prox = self.prox
+        for anterior, seguinte in zip(nos, nos[1:]):
+            prox[anterior] = seguinte
+        return nos[0] if nos else NENHUM
+
+    def lista(self, primeiro):
+        """Itera os nós de uma lista encadeada a partir do primeiro."""
+        prox = self.prox
+        no = primeiro
+        while no != NENHUM:
+            yield no
+            no = prox[no]
+
+    # CONSTRUTORES (mesma interface das classes da AST)
+    def Const(self, valor):
+        # reduzido como no Const da AST de objetos (a coluna valor tem 64 bits)
+        return self.novo(CONST, valor=inteiro_64(int(valor)))
+
+    def Var(self, nome, posicao=None):
+        return self.novo(VAR, valor=self.nome(nome), posicao=posicao)
+
+    def OpBin(self, operador, opEsq, opDir):
+        return self.novo(OPBIN, CODIGOS_OPERADORES[operador], opEsq, opDir)
+
+    def Decl(self, nome, expressao):
+        return self.novo(DECL, esq=expressao, valor=self.nome(nome))
+
+    def CmdAtrib(self, nome, expressao, posicao=None):
+        return self.novo(ATRIB, esq=expressao, valor=self.nome(nome), posicao=posicao)
+
+    def CmdIf(self, cond, then_cmds, else_cmds):
+        return self.novo(IF, esq=cond, dir=self.encadear(then_cmds), valor=self.encadear(else_cmds))
+
+    def CmdWhile(self, cond, corpo):
+        return self.novo(WHILE, esq=cond, dir=self.encadear(corpo))
+
+    def Programa(self, declaracoes, comandos, retorno):
+        # retorno None: programa parcial da recuperação de erros (Parser.parse_recuperando)
+        retorno = NENHUM if retorno is None else retorno
+        return self.novo(PROGRAMA, esq=self.encadear(declaracoes), dir=self.encadear(comandos), valor=retorno)
+
+    # VISÃO EM OBJETOS
+    def para_objetos(self, no):
+        """Monta a árvore de objetos (Const, OpBin, Programa, ...) do nó."""
+        tipo = self.tipo[no]
+        posicao = self.posicao[no] if self.posicao[no] != NENHUM else None
+
+        if tipo == CONST:
+            return Const(self.valor[no])
+        if tipo == VAR:
+            return Var(self.nomes[self.valor[no]], posicao)
+        if tipo == OPBIN:
+            return OpBin(OPERADORES[self.operador[no]], self.para_objetos(self.esq[no]), self.para_objetos(self.dir[no]))
+        if tipo == DECL:
+            return Decl(self.nomes[self.valor[no]], self.para_objetos(self.esq[no]))
+        if tipo == ATRIB:
+            return CmdAtrib(self.nomes[self.valor[no]], self.para_objetos(self.esq[no]), posicao)
+        if tipo == IF:
+            return CmdIf(self.para_objetos(self.esq[no]), self.objetos_lista(self.dir[no]), self.objetos_lista(self.valor[no]))
+        if tipo == WHILE:
+            return CmdWhile(self.para_objetos(self.esq[no]), self.objetos_lista(self.dir[no]))
+        retorno = self.para_objetos(self.valor[no]) if self.valor[no] != NENHUM else None
+        return Programa(self.objetos_lista(self.esq[no]), self.objetos_lista(self.dir[no]), retorno)
+
+    def objetos_lista(self, primeiro):
+        return [self.para_objetos(no) for no in self.lista(primeiro)]
@@ -0,0 +1,339 @@
+import hashlib
+import marshal
+import os
+import struct
+import sys
+from array import array
+from itertools import islice, repeat
+from Lexer import (
+    Lexer, lexar_trecho, tokens_de_colunas,
+    VERSAO_LEXER, FIXOS, CODIGO_LITERAL, CODIGO_IDENTIFICADOR,
+)
+from Token import Token, EOF
+from Arena import (
+    ArenaAST, CONST, VAR, OPBIN, DECL, ATRIB, IF, WHILE, PROGRAMA,
+    OPERADORES, NENHUM,
+)
+
+# Formato do arquivo .evtok (cabeçalho little-endian):
+#   MAGICO | resumo sha256 do fonte (32 bytes) | n_tokens (Q) | tamanho dos lexemas (Q)
+#   sha256 do resto do arquivo (32 bytes)
+#   códigos (n_tokens bytes) | posições (n_tokens * 8 bytes, array 'q' na ordem da máquina)
+#   lexemas dos literais e identificadores em UTF-8, separados por '\n'
+# Os códigos e posições são as colunas de lexar_trecho. O segundo resumo
+# pega qualquer byte trocado nas colunas (um '+' que vira '*', por exemplo).
+MAGICO = b"EVTOK\x02"
+CABECALHO = struct.Struct("<32sQQ32s")
+
+
+def resumo_fonte(texto):
+    """Chave do cache: sha256 do fonte, da versão do lexer e da tabela de códigos."""
+    h = hashlib.sha256()
+    h.update(f"{VERSAO_LEXER}:{sys.byteorder}:{FIXOS!r}\0".encode())
+    h.update(texto.encode('utf-8'))
+    return h.digest()
+
+
+def caminho_cache(arquivo_entrada):
+    """programa.ev -> programa.evtok"""
+    return os.path.splitext(arquivo_entrada)[0] + '.evtok'
+
+
+def carregar_tokens(caminho, texto):
+    """Lê as colunas de tokens do cache com uma única leitura.
+
+    Retorna (codigos, posicoes, lexemas) ou None se o arquivo não existe,
+    é de outro fonte/versão do lexer ou está corrompido.
+    """
+    try:
+        with open(caminho, 'rb') as f:
+            dados = f.read()
+    except OSError:
+        return None
+
+    if not dados.startswith(MAGICO):
+        return None
+
+    try:
+        resumo, n, tamanho_lexemas, resumo_carga = CABECALHO.unpack_from(dados, len(MAGICO))
+    except struct.error:
+        return None
+
+    if resumo != resumo_fonte(texto):
+        return None
+
+    inicio_codigos = len(MAGICO) + CABECALHO.size
+    inicio_posicoes = inicio_codigos + n
+    inicio_lexemas = inicio_posicoes + 8 * n
+    if len(dados) != inicio_lexemas + tamanho_lexemas:
+        return None
+    if hashlib.sha256(memoryview(dados)[inicio_codigos:]).digest() != resumo_carga:
+        return None
+
+    codigos = dados[inicio_codigos:inicio_posicoes]
+    posicoes = array('q')
+    posicoes.frombytes(dados[inicio_posicoes:inicio_lexemas])
+
+    try:
+        bloco = dados[inicio_lexemas:].decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+    lexemas = bloco.split('\n') if bloco else []
+
+    # cada literal/identificador precisa do seu lexema, e nenhum código
+    # pode passar do último conhecido
+    if codigos and max(codigos) > CODIGO_IDENTIFICADOR:
+        return None
+    if len(lexemas) != codigos.count(CODIGO_LITERAL) + codigos.count(CODIGO_IDENTIFICADOR):
+        return None
+
+    # cada token começa depois do anterior e dentro do fonte
+    if posicoes and not (0 <= posicoes[0] and posicoes[-1] < len(texto)):
+        return None
+    if not all(anterior < seguinte for anterior, seguinte in zip(posicoes, islice(posicoes, 1, None))):
+        return None
+
+    return codigos, posicoes, lexemas
+
+
+def salvar_tokens(caminho, texto, codigos, posicoes, lexemas):
+    """Grava as colunas no cache; falhas de escrita são ignoradas."""
+    bloco = '\n'.join(lexemas).encode('utf-8')
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+
+    try:
+        carga = b"".join((codigos, posicoes.tobytes(), bloco))
+        with open(temporario, 'wb') as f:
+            f.write(MAGICO)
+            f.write(CABECALHO.pack(resumo_fonte(texto), len(codigos), len(bloco), hashlib.sha256(carga).digest()))
+            f.write(carga)
+        # troca atômica: outro processo nunca lê um cache pela metade
+        os.replace(temporario, caminho)
+    except OSError:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+class LexerCache(Lexer):
+    """Lexer que só repassa tokens já prontos (lidos do cache .evtok).
+
+    As posições são as do fonte original, então linha/coluna nas mensagens
+    de erro continuam corretas.
+    """
+
+    def __init__(self, texto, colunas):
+        self.colunas = colunas
+        super().__init__(texto)
+
+    def gerar_tokens(self):
+        yield from tokens_de_colunas(*self.colunas)
+        yield from repeat(Token(EOF, '', len(self.texto)))
+
+
+def lexer_com_cache(arquivo_entrada, texto, classe_lexer):
+    """Retorna um lexer para o fonte, usando (e preenchendo) o cache .evtok.
+
+    Numa falta, o fonte é analisado por lexar_trecho e as colunas são
+    gravadas. Fontes com erro léxico (ou fora do ASCII) não vão para o
+    cache e seguem pelo classe_lexer escolhido.
+    """
+    caminho = caminho_cache(arquivo_entrada)
+
+    colunas = carregar_tokens(caminho, texto)
+    if colunas is None:
+        codigos, posicoes, lexemas, invalido = lexar_trecho(texto, 0)
+        if invalido is not None:
+            return classe_lexer(texto)
+        colunas = (codigos, posicoes, lexemas)
+        salvar_tokens(caminho, texto, *colunas)
+
+    return LexerCache(texto, colunas)
+
+
+# CACHE DA AST
+# Guarda o Programa já analisado e verificado (em colunas da ArenaAST) num
+# diretório, um arquivo <sha256>.evast por fonte. Acertos atualizam o mtime
+# do arquivo, e o diretório é podado do menos recente para o mais recente
+# (LRU) quando passa de TAMANHO_MAXIMO_CACHE_AST.
+
+#
+# Formato do arquivo .evast:
+#   MAGICO_AST | sha256 do resto (32 bytes) | marshal de (colunas, nomes, programa)
+# O resumo pega qualquer byte trocado; a arena ainda é conferida nó a nó
+# (arena_valida) antes de ir para o Generator, que não checa nada.
+
+# Versão do compilador até a AST: mude sempre que o parser ou o formato da
+# arena mudarem, para invalidar os .evast antigos.
+VERSAO_COMPILADOR = 2
+MAGICO_AST = b"EVAST\x02"
+TAMANHO_MAXIMO_CACHE_AST = 64 * 1024 * 1024
+COLUNAS_ARENA = ('tipo', 'operador', 'esq', 'dir', 'valor', 'prox', 'posicao')
+
+# tipos de nó aceitos em cada posição da árvore
+EXPRESSOES = (CONST, VAR, OPBIN)
+COMANDOS = (ATRIB, IF, WHILE)
+
+
+def caminho_ast(diretorio, fonte):
+    """Arquivo do cache para o fonte (str ou bytes, como veio do disco)."""
+    if isinstance(fonte, str):
+        fonte = fonte.encode('utf-8')
+
+    h = hashlib.sha256()
+    h.update(f"{VERSAO_COMPILADOR}:{VERSAO_LEXER}:{sys.byteorder}\0".encode())
+    h.update(fonte)
+    return os.path.join(diretorio, h.hexdigest() + '.evast')
+
+
+def arena_valida(arena, programa):
+    """Confere a estrutura da arena lida do cache.
+
+    Os filhos têm índice menor que o pai (então não há ciclos), cada
+    posição tem um tipo de nó que cabe nela, operadores e nomes existem, e
+    as listas (prox) só andam para a frente, entre nós do mesmo tipo de lista.
+    """
+    tipo, operador, esq, dir, valor, prox = (
+        arena.tipo, arena.operador, arena.esq, arena.dir, arena.valor, arena.prox
+    )
+    n_nomes = len(arena.nomes)
+
+    def filho(no, indice, tipos):
+        return 0 <= indice < no and tipo[indice] in tipos
+
+    def lista(no, indice, tipos):
+        return indice == NENHUM or filho(no, indice, tipos)
+
+    if not 0 <= programa < len(arena) or tipo[programa] != PROGRAMA:
+        return False
+
+    for no in range(len(arena)):
+        t = tipo[no]
+
+        if t == CONST:
+            ok = True
+        elif t == VAR:
+            ok = 0 <= valor[no] < n_nomes
+        elif t == OPBIN:
+            ok = (0 <= operador[no] < len(OPERADORES)
+                  and filho(no, esq[no], EXPRESSOES) and filho(no, dir[no], EXPRESSOES))
+        elif t == DECL or t == ATRIB:
+            ok = 0 <= valor[no] < n_nomes and filho(no, esq[no], EXPRESSOES)
+        elif t == IF:
+            ok = (filho(no, esq[no], EXPRESSOES)
+                  and lista(no, dir[no], COMANDOS) and lista(no, valor[no], COMANDOS))
+        elif t == WHILE:
+            ok = filho(no, esq[no], EXPRESSOES) and lista(no, dir[no], COMANDOS)
+        elif t == PROGRAMA:
+            ok = (lista(no, esq[no], (DECL,)) and lista(no, dir[no], COMANDOS)
+                  and filho(no, valor[no], EXPRESSOES))
+        else:
+            ok = False
+
+        # o próximo da lista vem depois e é do mesmo tipo de lista
+        seguinte = prox[no]
+        if seguinte != NENHUM:
+            ok = ok and no < seguinte < len(arena) and (
+                tipo[seguinte] == DECL if t == DECL else t in COMANDOS and tipo[seguinte] in COMANDOS
+            )
+
+        if not ok:
+            return False
+
+    return True
+
+
+def carregar_ast(diretorio, fonte):
+    """Retorna (arena, programa) do cache, ou None se faltar ou estiver corrompido."""
+    caminho = caminho_ast(diretorio, fonte)
+
+    try:
+        with open(caminho, 'rb') as f:
+            dados = f.read()
+    except OSError:
+        return None
+
+    if not dados.startswith(MAGICO_AST):
+        return None
+
+    inicio = len(MAGICO_AST) + 32
+    resumo, carga = dados[len(MAGICO_AST):inicio], dados[inicio:]
+    if hashlib.sha256(carga).digest() != resumo:
+        return None
+
+    try:
+        colunas, nomes, programa = marshal.loads(carga)
+    except (EOFError, ValueError, TypeError):
+        return None
+
+    if len(colunas) != len(COLUNAS_ARENA) or not isinstance(programa, int):
+        return None
+    if not isinstance(nomes, list) or not all(type(nome) is str for nome in nomes):
+        return None
+
+    arena = ArenaAST()
+    try:
+        for nome, bloco in zip(COLUNAS_ARENA, colunas):
+            getattr(arena, nome).frombytes(bloco)
+    except (TypeError, ValueError):
+        return None
+
+    if len({len(getattr(arena, nome)) for nome in COLUNAS_ARENA}) != 1:
+        return None
+
+    arena.nomes = nomes
+    if not arena_valida(arena, programa):
+        return None
+    arena.indices_nomes = {nome: indice for indice, nome in enumerate(nomes)}
+
+    # acerto: passa a ser o mais recente para o LRU
+    try:
+        os.utime(caminho)
+    except OSError:
+        pass
+
+    return arena, programa
+
+
+def salvar_ast(diretorio, fonte, arena, programa, tamanho_maximo=TAMANHO_MAXIMO_CACHE_AST):
+    """Grava a AST verificada no cache e poda o diretório; falhas de escrita são ignoradas."""
+    caminho = caminho_ast(diretorio, fonte)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    colunas = tuple(getattr(arena, nome).tobytes() for nome in COLUNAS_ARENA)
+
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        carga = marshal.dumps((colunas, list(arena.nomes), programa))
+        with open(temporario, 'wb') as f:
+            f.write(MAGICO_AST)
+            f.write(hashlib.sha256(carga).digest())
+            f.write(carga)
+        os.replace(temporario, caminho)
+    except OSError:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        return
+
+    podar_cache_ast(diretorio, tamanho_maximo)
+
+
+def podar_cache_ast(diretorio, tamanho_maximo):
+    """Remove os .evast menos usados até o diretório caber em tamanho_maximo bytes."""
+    arquivos = []
+    try:
+        with os.scandir(diretorio) as entradas:
+            for entrada in entradas:
+                if entrada.name.endswith('.evast') and entrada.is_file():
+                    info = entrada.stat()
+                    arquivos.append((info.st_mtime, info.st_size, entrada.path))
+    except OSError:
+        return
+
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= tamanho_maximo:
+            break
+        try:
+            os.remove(caminho)
+            total -= tamanho
+        except OSError:
+            pass
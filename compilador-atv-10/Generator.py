@@ -1,9 +1,33 @@
-from Syntactic import Const, Var, OpBin, CmdAtrib, CmdIf, CmdWhile
+from Visitor import Visitante
+from Syntactic import Const, Var, OpBin
+from Arena import CONST, VAR, OPBIN, ATRIB, IF, WHILE, OPERADORES
+from IR import Temp, COPIA, CARREGA, GUARDA, SALTA, DESVIA, RETORNA
 
-class Generator:
-    def __init__(self):
+# Área das variáveis no .bss: a variável do slot s fica em variaveis+8*s
+ROTULO_VARIAVEIS = "variaveis"
+
+# Instruções de cada operador: combinam %rax (esquerdo) com %rbx (direito)
+# e deixam o resultado em %rax
+EMISSORES = {
+    # aritméticos
+    '+': ("  add %rbx, %rax",),
+    '-': ("  sub %rbx, %rax",),
+    '*': ("  imul %rbx, %rax",),
+    '/': ("  cqo", "  idiv %rbx"),
+
+    # comparações
+    '<': ("  cmp %rbx, %rax", "  setl %al", "  movzb %al, %rax"),
+    '>': ("  cmp %rbx, %rax", "  setg %al", "  movzb %al, %rax"),
+    '==': ("  cmp %rbx, %rax", "  sete %al", "  movzb %al, %rax"),
+}
+
+class Generator(Visitante):
+    def __init__(self, tabela=None):
+        super().__init__()
         self.instrucoes = []
-        self.variaveis = []
+        # nomes das variáveis por slot; com a TabelaSimbolos da análise
+        # semântica, é a própria lista dela (e cresce junto no modo --fluxo)
+        self.variaveis = tabela.nomes if tabela is not None else []
         self.label_count = 0  #contador de labels
 
     # LABELS
@@ -12,17 +36,17 @@ class Generator:
         self.label_count += 1
         return label
 
+    # VARIÁVEIS
+    def endereco(self, slot):
+        return f"{ROTULO_VARIAVEIS}+{8 * slot}"
+
     # PROGRAMA
     def gera_programa(self, programa):
-        # coletar variáveis
-        for decl in programa.declaracoes:
-            self.variaveis.append(decl.nome)
+        # os slots das variáveis já vêm da análise semântica (Var.slot, ...)
 
         # declarações
         for decl in programa.declaracoes:
-            self.instrucoes.append(f"  # {decl.nome} = ...")
-            self.gera_exp(decl.expressao)
-            self.instrucoes.append(f"  mov %rax, {decl.nome}")
+            self.gera_decl(decl)
 
         # comandos
         self.instrucoes.append("  # comandos")
@@ -33,104 +57,618 @@ class Generator:
         self.instrucoes.append("  # return")
         self.gera_exp(programa.retorno)
 
+    # DECLARAÇÃO
+    def gera_decl(self, decl):
+        self.instrucoes.append(f"  # {decl.nome} = ...")
+        self.gera_exp(decl.expressao)
+        self.instrucoes.append(f"  mov %rax, {self.endereco(decl.slot)}")
+
     # COMANDOS
     def gera_cmd(self, cmd):
-        if isinstance(cmd, CmdAtrib):
-            self.instrucoes.append(f"  # {cmd.nome} = ...")
-            self.gera_exp(cmd.expressao)
-            self.instrucoes.append(f"  mov %rax, {cmd.nome}")
+        self.despacho[type(cmd)](cmd)
+
+    def visita_CmdAtrib(self, cmd):
+        self.instrucoes.append(f"  # {cmd.nome} = ...")
+        self.gera_exp(cmd.expressao)
+        self.instrucoes.append(f"  mov %rax, {self.endereco(cmd.slot)}")
+
+    def visita_CmdIf(self, cmd):
+        label_else = self.nova_label()
+        label_end = self.nova_label()
+
+        # condição
+        self.gera_exp(cmd.cond)
+        self.instrucoes.append("  cmp $0, %rax")
+        self.instrucoes.append(f"  jz {label_else}")
+
+        # THEN
+        for c in cmd.then_cmds:
+            self.gera_cmd(c)
+
+        self.instrucoes.append(f"  jmp {label_end}")
+
+        # ELSE
+        self.instrucoes.append(f"{label_else}:")
+        for c in cmd.else_cmds:
+            self.gera_cmd(c)
+
+        self.instrucoes.append(f"{label_end}:")
+
+    def visita_CmdWhile(self, cmd):
+        label_inicio = self.nova_label()
+        label_fim = self.nova_label()
+
+        self.instrucoes.append(f"{label_inicio}:")
+
+        # condição
+        self.gera_exp(cmd.cond)
+        self.instrucoes.append("  cmp $0, %rax")
+        self.instrucoes.append(f"  jz {label_fim}")
+
+        # corpo
+        for c in cmd.corpo:
+            self.gera_cmd(c)
+
+        self.instrucoes.append(f"  jmp {label_inicio}")
+        self.instrucoes.append(f"{label_fim}:")
+
+    def visita_CmdReturn(self, cmd):
+        self.instrucoes.append("  # return")
+        self.gera_exp(cmd.expressao)
+
+    # EXPRESSÕES
+    def gera_exp(self, node):
+        self.despacho[type(node)](node)
+
+    def visita_Const(self, node):
+        self.instrucoes.append(f"  mov ${node.valor}, %rax")
+
+    def visita_Var(self, node):
+        self.instrucoes.append(f"  mov {self.endereco(node.slot)}, %rax")
+
+    def visita_OpBin(self, node):
+        # sem recursão: a pilha guarda os nós ainda por gerar e, entre eles,
+        # as linhas que vêm depois de cada um (tuplas)
+        despacho = self.despacho
+        instrucoes = self.instrucoes
+        pilha = [node]
+
+        while pilha:
+            node = pilha.pop()
+
+            if type(node) is tuple:
+                instrucoes.extend(node)
+
+            elif type(node) is OpBin:
+                # direito, push, esquerdo, pop, operador (empilhados ao contrário)
+                pilha.append(EMISSORES[node.operador])
+                pilha.append(("  pop %rbx",))
+                pilha.append(node.opEsq)
+                pilha.append(("  push %rax",))
+                pilha.append(node.opDir)
+
+            else:
+                despacho[type(node)](node)
 
-        elif isinstance(cmd, CmdIf):
+    # ARENA (Arena.py): mesmo código, percorrendo as colunas
+    def gera_programa_arena(self, arena, programa):
+        # o índice do nome na arena serve de slot
+        self.variaveis = arena.nomes
+
+        for decl in arena.lista(arena.esq[programa]):
+            slot = arena.valor[decl]
+            self.instrucoes.append(f"  # {arena.nomes[slot]} = ...")
+            self.gera_exp_arena(arena, arena.esq[decl])
+            self.instrucoes.append(f"  mov %rax, {self.endereco(slot)}")
+
+        self.instrucoes.append("  # comandos")
+        for cmd in arena.lista(arena.dir[programa]):
+            self.gera_cmd_arena(arena, cmd)
+
+        self.instrucoes.append("  # return")
+        self.gera_exp_arena(arena, arena.valor[programa])
+
+    def gera_cmd_arena(self, arena, cmd):
+        tipo = arena.tipo[cmd]
+
+        if tipo == ATRIB:
+            slot = arena.valor[cmd]
+            self.instrucoes.append(f"  # {arena.nomes[slot]} = ...")
+            self.gera_exp_arena(arena, arena.esq[cmd])
+            self.instrucoes.append(f"  mov %rax, {self.endereco(slot)}")
+
+        elif tipo == IF:
             label_else = self.nova_label()
             label_end = self.nova_label()
 
-            # condição
-            self.gera_exp(cmd.cond)
+            self.gera_exp_arena(arena, arena.esq[cmd])
             self.instrucoes.append("  cmp $0, %rax")
             self.instrucoes.append(f"  jz {label_else}")
 
-            # THEN
-            for c in cmd.then_cmds:
-                self.gera_cmd(c)
+            for c in arena.lista(arena.dir[cmd]):
+                self.gera_cmd_arena(arena, c)
 
             self.instrucoes.append(f"  jmp {label_end}")
 
-            # ELSE
             self.instrucoes.append(f"{label_else}:")
-            for c in cmd.else_cmds:
-                self.gera_cmd(c)
+            for c in arena.lista(arena.valor[cmd]):
+                self.gera_cmd_arena(arena, c)
 
             self.instrucoes.append(f"{label_end}:")
 
-        elif isinstance(cmd, CmdWhile):
+        elif tipo == WHILE:
             label_inicio = self.nova_label()
             label_fim = self.nova_label()
 
             self.instrucoes.append(f"{label_inicio}:")
 
-            # condição
-            self.gera_exp(cmd.cond)
+            self.gera_exp_arena(arena, arena.esq[cmd])
             self.instrucoes.append("  cmp $0, %rax")
             self.instrucoes.append(f"  jz {label_fim}")
 
-            # corpo
-            for c in cmd.corpo:
-                self.gera_cmd(c)
+            for c in arena.lista(arena.dir[cmd]):
+                self.gera_cmd_arena(arena, c)
 
             self.instrucoes.append(f"  jmp {label_inicio}")
             self.instrucoes.append(f"{label_fim}:")
 
+    def gera_exp_arena(self, arena, node):
+        # sem recursão: a pilha guarda os nós ainda por gerar e, entre eles,
+        # as linhas que vêm depois de cada um (tuplas)
+        tipo, esq, dir, valor = arena.tipo, arena.esq, arena.dir, arena.valor
+        instrucoes = self.instrucoes
+        pilha = [node]
+
+        while pilha:
+            node = pilha.pop()
+
+            if type(node) is tuple:
+                instrucoes.extend(node)
+
+            elif tipo[node] == CONST:
+                instrucoes.append(f"  mov ${valor[node]}, %rax")
+
+            elif tipo[node] == VAR:
+                instrucoes.append(f"  mov {self.endereco(valor[node])}, %rax")
+
+            elif tipo[node] == OPBIN:
+                # direito, push, esquerdo, pop, operador (empilhados ao contrário)
+                pilha.append(EMISSORES[OPERADORES[arena.operador[node]]])
+                pilha.append(("  pop %rbx",))
+                pilha.append(esq[node])
+                pilha.append(("  push %rax",))
+                pilha.append(dir[node])
+
+    # BSS
+    def get_codigo_bss(self):
+        linhas = []
+        for slot, var in enumerate(self.variaveis):
+            linhas.append(f"  # {var}: {self.endereco(slot)}")
+        if self.variaveis:
+            linhas.append(f"  .lcomm {ROTULO_VARIAVEIS}, {8 * len(self.variaveis)}")
+        return "\n".join(linhas)
+
+    # TEXT
+    def get_codigo_text(self):
+        return "\n".join(self.instrucoes)
+
+    def descarregar(self, arquivo):
+        """Escreve as instruções pendentes no arquivo e esvazia a lista (main.py --fluxo)."""
+        if self.instrucoes:
+            arquivo.write("\n".join(self.instrucoes))
+            arquivo.write("\n")
+            self.instrucoes.clear()
+
+# BACKEND COM REGISTRADORES
+# Registradores para os temporários das expressões. %rax e %rdx ficam de
+# fora: o idiv usa os dois e %rax recebe o valor final da expressão
+REGISTRADORES = [
+    "%rbx", "%rcx", "%rsi", "%rdi",
+    "%r8", "%r9", "%r10", "%r11", "%r12", "%r13", "%r14", "%r15",
+]
+
+# operador -> instrução de dois operandos (origem, destino)
+ARITMETICOS = {'+': 'add', '-': 'sub', '*': 'imul'}
+
+# operador -> set da comparação (o resultado passa por %al)
+COMPARACOES = {'<': 'setl', '>': 'setg', '==': 'sete'}
+
+
+def cabe_em_32_bits(valor):
+    # imediatos das instruções aritméticas têm 32 bits com sinal
+    return -(1 << 31) <= valor < (1 << 31)
+
+
+def registrador(lugar):
+    return lugar.startswith('%')
+
+
+class GeneratorRegistradores(Generator):
+    """Gera as expressões com os temporários em registradores, sem push/pop.
+
+    A ordem de avaliação é a de Sethi-Ullman: necessidades[no] é quantos
+    registradores o nó precisa, e o filho que precisa de mais é avaliado
+    primeiro. Um operando direito que é Var (memória) ou Const pequena
+    (imediato) entra direto na instrução e não ocupa registrador. Se nem
+    assim os registradores bastam, o operando direito é guardado na pilha
+    (spill) enquanto o esquerdo é calculado.
+
+    O resultado de cada expressão termina em %rax, como no Generator, então
+    os comandos (atribuição, if, while) são os mesmos.
+    """
+
+    def __init__(self, tabela=None, registradores=len(REGISTRADORES)):
+        super().__init__(tabela)
+        if not 2 <= registradores <= len(REGISTRADORES):
+            raise Exception(f"Erro: o número de registradores deve estar entre 2 e {len(REGISTRADORES)}")
+        self.registradores = REGISTRADORES[:registradores]
+        self.necessidades = {}
+
     # EXPRESSÕES
     def gera_exp(self, node):
-        if isinstance(node, Const):
-            self.instrucoes.append(f"  mov ${node.valor}, %rax")
+        if type(node) is not OpBin:
+            # folha: um mov direto para %rax, como no Generator
+            self.despacho[type(node)](node, ["%rax"])
+            return
+
+        self.rotular(node)
+        self.despacho[type(node)](node, self.registradores)
+        self.instrucoes.append(f"  mov {self.registradores[0]}, %rax")
+        self.necessidades.clear()
+
+    def rotular(self, node):
+        """Preenche necessidades[no], os registradores que cada nó precisa
+        (Sethi-Ullman), em pós-ordem com pilha explícita."""
+        necessidades = self.necessidades
+        pilha = [(node, False)]
+
+        while pilha:
+            node, filhos_prontos = pilha.pop()
+            if node in necessidades:
+                # subexpressão compartilhada já rotulada
+                continue
+
+            if type(node) is not OpBin:
+                necessidades[node] = 1
+            elif filhos_prontos:
+                esq = necessidades[node.opEsq]
+                dir = 0 if self.operando_direto(node.operador, node.opDir) else necessidades[node.opDir]
+                necessidades[node] = max(esq, dir) if esq != dir else esq + 1
+            else:
+                pilha.append((node, True))
+                pilha.append((node.opDir, False))
+                pilha.append((node.opEsq, False))
+
+    def operando_direto(self, operador, node):
+        """Var ou Const como operando da própria instrução, ou None."""
+        if type(node) is Var:
+            return self.endereco(node.slot)
+        # idiv não aceita imediato
+        if type(node) is Const and operador != '/' and cabe_em_32_bits(node.valor):
+            return f"${node.valor}"
+        return None
+
+    # cada visita_ deixa o valor do nó em regs[0], usando só os registradores de regs
+    def visita_Const(self, node, regs):
+        self.instrucoes.append(f"  mov ${node.valor}, {regs[0]}")
+
+    def visita_Var(self, node, regs):
+        self.instrucoes.append(f"  mov {self.endereco(node.slot)}, {regs[0]}")
+
+    def visita_OpBin(self, node, regs):
+        # sem recursão: a pilha guarda pares (nó, registradores) ainda por
+        # gerar e, entre eles, as linhas que vêm depois de cada um (tuplas,
+        # com None no lugar dos registradores). Tudo é empilhado ao contrário
+        despacho = self.despacho
+        necessidades = self.necessidades
+        instrucoes = self.instrucoes
+        pilha = [(node, regs)]
+
+        while pilha:
+            node, regs = pilha.pop()
 
-        elif isinstance(node, Var):
-            self.instrucoes.append(f"  mov {node.nome}, %rax")
+            if regs is None:
+                instrucoes.extend(node)
+                continue
 
-        elif isinstance(node, OpBin):
-            # direito
-            self.gera_exp(node.opDir)
-            self.instrucoes.append("  push %rax")
+            if type(node) is not OpBin:
+                despacho[type(node)](node, regs)
+                continue
+
+            esq, dir = node.opEsq, node.opDir
+
+            direto = self.operando_direto(node.operador, dir)
+            if direto is not None:
+                pilha.append((self.operar(node.operador, regs[0], direto), None))
+                pilha.append((esq, regs))
+                continue
+
+            pilha.append((self.operar(node.operador, regs[0], regs[1]), None))
+            if necessidades[node] <= len(regs):
+                if necessidades[esq] >= necessidades[dir]:
+                    pilha.append((dir, regs[1:]))
+                    pilha.append((esq, regs))
+                else:
+                    # o direito usa todos, mas termina em regs[1]; o esquerdo usa os demais
+                    pilha.append((esq, [regs[0]] + regs[2:]))
+                    pilha.append((dir, [regs[1], regs[0]] + regs[2:]))
+            else:
+                # spill: faltam registradores para manter os dois lados
+                pilha.append(((f"  pop {regs[1]}",), None))
+                pilha.append((esq, regs))
+                pilha.append(((f"  push {regs[0]}",), None))
+                pilha.append((dir, regs))
+
+    def operar(self, operador, destino, origem):
+        """Linhas de destino = destino <operador> origem."""
+        if operador in ARITMETICOS:
+            return (f"  {ARITMETICOS[operador]} {origem}, {destino}",)
+
+        if operador == '/':
+            return (
+                f"  mov {destino}, %rax",
+                "  cqo",
+                f"  idivq {origem}",
+                f"  mov %rax, {destino}",
+            )
+
+        return (
+            f"  cmp {origem}, {destino}",
+            f"  {COMPARACOES[operador]} %al",
+            f"  movzb %al, {destino}",
+        )
+
+# BACKEND DO IR (IR.py)
+# %r11 fica de fora dos temporários: é onde vão as constantes que não
+# cabem como imediato (mais de 32 bits, ou divisor do idiv)
+REGISTRADORES_IR = [reg for reg in REGISTRADORES if reg != "%r11"]
+RESERVA = "%r11"
+
+# Área dos Temps que não cabem em registrador ou vivem entre blocos
+ROTULO_TEMPORARIOS = "temporarios"
+
+# comparação -> salto quando ela é verdadeira / quando é falsa
+SALTO_SE = {'<': 'jl', '>': 'jg', '==': 'je'}
+SALTO_SENAO = {'<': 'jge', '>': 'jle', '==': 'jne'}
+
+
+class GeneratorIR(Generator):
+    """Emite x86-64 a partir do IR (IR.py) em vez da AST.
+
+    Cada bloco é alocado sozinho: um Temp definido e usado só dentro do
+    bloco fica num registrador de REGISTRADORES_IR, que volta para os livres
+    no último uso; um Temp lido em outro bloco (ou sem registrador livre)
+    fica na memória, em temporarios+8*k. Uma comparação usada só pelo
+    desvia logo depois dela vira cmp + salto condicional, sem setCC.
+    """
+
+    def __init__(self, tabela=None):
+        super().__init__(tabela)
+        # Temp -> endereço na área temporarios
+        self.enderecos_temps = {}
+
+    # PROGRAMA
+    def gera_programa_ir(self, programa):
+        self.globais = self.temps_globais(programa)
 
-            # esquerdo
-            self.gera_exp(node.opEsq)
-            self.instrucoes.append("  pop %rbx")
+        blocos = programa.blocos
+        for i, bloco in enumerate(blocos):
+            proximo = blocos[i + 1] if i + 1 < len(blocos) else None
+            self.instrucoes.append(f"{bloco.rotulo}:")
+            self.gera_bloco(bloco, proximo)
 
-            # aritméticos
-            if node.operador == '+':
-                self.instrucoes.append("  add %rbx, %rax")
+    def temps_globais(self, programa):
+        """Temps lidos num bloco sem terem sido definidos antes nele."""
+        globais = set()
+        for bloco in programa.blocos:
+            definidos = set()
+            for ins in bloco.instrucoes:
+                for arg in ins.args:
+                    if type(arg) is Temp and arg not in definidos:
+                        globais.add(arg)
+                if ins.destino is not None:
+                    definidos.add(ins.destino)
+        return globais
 
-            elif node.operador == '-':
-                self.instrucoes.append("  sub %rbx, %rax")
+    def endereco_temp(self, temp):
+        endereco = self.enderecos_temps.get(temp)
+        if endereco is None:
+            endereco = f"{ROTULO_TEMPORARIOS}+{8 * len(self.enderecos_temps)}"
+            self.enderecos_temps[temp] = endereco
+        return endereco
 
-            elif node.operador == '*':
-                self.instrucoes.append("  imul %rbx, %rax")
+    # BLOCO
+    def gera_bloco(self, bloco, proximo):
+        instrucoes = bloco.instrucoes
 
-            elif node.operador == '/':
-                self.instrucoes.append("  cqo")
-                self.instrucoes.append("  idiv %rbx")
+        # índice do último uso de cada Temp no bloco
+        self.ultimo_uso = {}
+        for i, ins in enumerate(instrucoes):
+            for arg in ins.args:
+                if type(arg) is Temp:
+                    self.ultimo_uso[arg] = i
 
-            # 🔥 COMPARAÇÕES
-            elif node.operador in ('<', '>', '=='):
-                self.instrucoes.append("  cmp %rbx, %rax")
+        self.livres = REGISTRADORES_IR[::-1]
+        self.locais = {}  # Temp -> registrador ou endereço
 
-                if node.operador == '<':
-                    self.instrucoes.append("  setl %al")
-                elif node.operador == '>':
-                    self.instrucoes.append("  setg %al")
-                elif node.operador == '==':
-                    self.instrucoes.append("  sete %al")
+        for i, ins in enumerate(instrucoes):
+            self.i = i
+            op = ins.op
 
-                self.instrucoes.append("  movzb %al, %rax")
+            if op == CARREGA:
+                destino = self.alocar(ins.destino)
+                self.mover(self.endereco(ins.slot), destino)
+
+            elif op == GUARDA:
+                self.mover(self.operando(ins.args[0]), self.endereco(ins.slot))
+                self.liberar(ins.args[0])
+
+            elif op == COPIA:
+                origem = self.operando(ins.args[0])
+                self.mover(origem, self.alocar(ins.destino, self.liberar(ins.args[0])))
+
+            elif op == RETORNA:
+                self.mover(self.operando(ins.args[0]), "%rax")
+
+            elif op == SALTA:
+                if ins.alvos[0] is not proximo:
+                    self.instrucoes.append(f"  jmp {ins.alvos[0].rotulo}")
+
+            elif op == DESVIA:
+                self.gera_desvia(ins, instrucoes[i - 1] if i else None, proximo)
+
+            elif op in SALTO_SE and self.desvia_logo_depois(ins, instrucoes):
+                # o desvia seguinte emite o salto; aqui só o cmp
+                self.comparar(ins)
+
+            else:
+                self.gera_operacao(ins)
+
+            if ins.destino is not None and ins.destino not in self.ultimo_uso:
+                # resultado nunca lido
+                self.liberar(ins.destino)
+
+    # OPERANDOS
+    def operando(self, arg):
+        """Onde está o valor: $constante, registrador ou endereço."""
+        if type(arg) is Temp:
+            return self.locais[arg] if arg in self.locais else self.endereco_temp(arg)
+        return f"${arg}"
+
+    def origem(self, arg):
+        """Operando que pode ir como origem de add/sub/imul/cmp."""
+        if type(arg) is not Temp and not cabe_em_32_bits(arg):
+            self.instrucoes.append(f"  mov ${arg}, {RESERVA}")
+            return RESERVA
+        return self.operando(arg)
+
+    def alocar(self, temp, preferido=None):
+        """Registrador (ou endereço) que vai receber o Temp."""
+        if temp in self.globais:
+            lugar = self.endereco_temp(temp)
+        elif preferido is not None:
+            # o registrador que o operando acabou de devolver
+            self.livres.remove(preferido)
+            lugar = preferido
+        elif self.livres:
+            lugar = self.livres.pop()
+        else:
+            lugar = self.endereco_temp(temp)
+        self.locais[temp] = lugar
+        return lugar
+
+    def liberar(self, arg):
+        """Devolve o registrador do Temp se ele morre aqui; retorna o registrador."""
+        if type(arg) is not Temp or self.ultimo_uso.get(arg, self.i) != self.i:
+            return None
+        lugar = self.locais.pop(arg, None)
+        if lugar is not None and registrador(lugar):
+            self.livres.append(lugar)
+            return lugar
+        return None
+
+    def mover(self, origem, destino):
+        if origem == destino:
+            return
+        if registrador(origem) or registrador(destino):
+            self.instrucoes.append(f"  mov {origem}, {destino}")
+        elif origem.startswith('$') and cabe_em_32_bits(int(origem[1:])):
+            self.instrucoes.append(f"  movq {origem}, {destino}")
+        else:
+            # memória para memória (ou constante grande): passa por %rax
+            self.instrucoes.append(f"  mov {origem}, %rax")
+            self.instrucoes.append(f"  mov %rax, {destino}")
+
+    # OPERAÇÕES
+    def gera_operacao(self, ins):
+        """destino = a <op> b."""
+        a, b = ins.args
+        operador = ins.op
+        origem_b = self.origem(b) if operador != '/' else self.divisor(b)
+
+        # o destino reaproveita o registrador de a se a morre aqui
+        lugar_a = self.operando(a)
+        destino = self.alocar(ins.destino, self.liberar(a))
+        self.liberar(b)
+
+        if operador == '/':
+            self.mover(lugar_a, "%rax")
+            self.instrucoes.append("  cqo")
+            self.instrucoes.append(f"  idivq {origem_b}")
+            self.mover("%rax", destino)
+            return
+
+        trabalho = destino if registrador(destino) else "%rax"
+        self.mover(lugar_a, trabalho)
+        if operador in ARITMETICOS:
+            self.instrucoes.append(f"  {ARITMETICOS[operador]} {origem_b}, {trabalho}")
+        else:
+            self.instrucoes.append(f"  cmp {origem_b}, {trabalho}")
+            self.instrucoes.append(f"  {COMPARACOES[operador]} %al")
+            self.instrucoes.append(f"  movzb %al, {trabalho}")
+        self.mover(trabalho, destino)
+
+    def divisor(self, arg):
+        # idiv não aceita imediato
+        if type(arg) is not Temp:
+            self.instrucoes.append(f"  mov ${arg}, {RESERVA}")
+            return RESERVA
+        return self.operando(arg)
+
+    # DESVIOS
+    def desvia_logo_depois(self, ins, instrucoes):
+        """A comparação só é lida pelo desvia que vem logo depois dela?"""
+        i = self.i
+        if i + 1 >= len(instrucoes) or ins.destino in self.globais:
+            return False
+        seguinte = instrucoes[i + 1]
+        return (seguinte.op == DESVIA and seguinte.args[0] is ins.destino
+                and self.ultimo_uso.get(ins.destino) == i + 1)
+
+    def comparar(self, ins):
+        a, b = ins.args
+        origem_b = self.origem(b)
+        lugar_a = self.operando(a)
+        if not registrador(lugar_a):
+            self.mover(lugar_a, "%rax")
+            lugar_a = "%rax"
+        self.instrucoes.append(f"  cmp {origem_b}, {lugar_a}")
+        self.liberar(a)
+        self.liberar(b)
+
+    def gera_desvia(self, ins, anterior, proximo):
+        cond = ins.args[0]
+        verdadeiro, falso = ins.alvos
+
+        if type(cond) is not Temp:
+            # condição constante: salto incondicional (ou nenhum)
+            alvo = verdadeiro if cond != 0 else falso
+            if alvo is not proximo:
+                self.instrucoes.append(f"  jmp {alvo.rotulo}")
+            return
+
+        if (anterior is not None and anterior.op in SALTO_SE and anterior.destino is cond
+                and cond not in self.locais and cond not in self.globais):
+            # as flags ainda são as do cmp da comparação anterior
+            salto_se, salto_senao = SALTO_SE[anterior.op], SALTO_SENAO[anterior.op]
+        else:
+            lugar = self.operando(cond)
+            self.instrucoes.append(f"  cmp{'' if registrador(lugar) else 'q'} $0, {lugar}")
+            self.liberar(cond)
+            salto_se, salto_senao = 'jne', 'je'
+
+        if falso is proximo:
+            self.instrucoes.append(f"  {salto_se} {verdadeiro.rotulo}")
+        elif verdadeiro is proximo:
+            self.instrucoes.append(f"  {salto_senao} {falso.rotulo}")
+        else:
+            self.instrucoes.append(f"  {salto_se} {verdadeiro.rotulo}")
+            self.instrucoes.append(f"  jmp {falso.rotulo}")
 
     # BSS
     def get_codigo_bss(self):
-        linhas = []
-        for var in self.variaveis:
-            linhas.append(f"  .lcomm {var}, 8")
-        return "\n".join(linhas)
-
-    # TEXT
-    def get_codigo_text(self):
-        return "\n".join(self.instrucoes)
\ No newline at end of file
+        codigo = super().get_codigo_bss()
+        if self.enderecos_temps:
+            area = f"  .lcomm {ROTULO_TEMPORARIOS}, {8 * len(self.enderecos_temps)}"
+            codigo = f"{codigo}\n{area}" if codigo else area
+        return codigo
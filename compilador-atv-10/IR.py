@@ -0,0 +1,241 @@
+from Visitor import Visitante
+from Syntactic import OpBin
+
+# REPRESENTAÇÃO INTERMEDIÁRIA (IR)
+# O programa vira uma lista de blocos básicos; cada bloco é uma sequência
+# de instruções de três endereços sobre registradores virtuais (Temp) e
+# termina num salto, num desvio condicional ou no retorno. Os operandos
+# são Temp ou int (constante). As variáveis do programa ficam na memória
+# e só são lidas/escritas por carrega/guarda, pelo slot da TabelaSimbolos.
+#
+#   t2 = t0 + t1            op = '+' (qualquer operador de EMISSORES)
+#   t3 = copia t2           op = COPIA
+#   t4 = carrega x          op = CARREGA, slot de x
+#   guarda x, t4            op = GUARDA, slot de x
+#   salta B3                op = SALTA
+#   desvia t5, B1, B2       op = DESVIA: B1 se t5 != 0, senão B2
+#   retorna t6              op = RETORNA (o valor final do programa)
+#   t7 = fi B1: t2, B4: t6  op = FI, só na forma SSA (SSA.py): o valor que
+#                           veio do predecessor (alvos) por onde se chegou
+
+COPIA = 'copia'
+CARREGA = 'carrega'
+GUARDA = 'guarda'
+SALTA = 'salta'
+DESVIA = 'desvia'
+RETORNA = 'retorna'
+FI = 'fi'
+
+# instruções que terminam um bloco
+TERMINADORES = (SALTA, DESVIA, RETORNA)
+
+
+class Temp:
+    """Registrador virtual. Cada um é um objeto próprio; o número é só para o texto."""
+    __slots__ = ('numero',)
+
+    def __init__(self, numero):
+        self.numero = numero
+
+    def __repr__(self):
+        return f"t{self.numero}"
+
+
+class Instrucao:
+    __slots__ = ('op', 'destino', 'args', 'slot', 'alvos')
+
+    def __init__(self, op, destino=None, args=(), slot=None, alvos=()):
+        self.op = op
+        self.destino = destino  # Temp definido (ou None)
+        self.args = args        # operandos lidos: Temp ou int
+        self.slot = slot        # variável de carrega/guarda
+        self.alvos = alvos      # blocos de destino de salta/desvia; predecessores do fi
+
+
+class Bloco:
+    __slots__ = ('rotulo', 'instrucoes')
+
+    def __init__(self, rotulo):
+        self.rotulo = rotulo
+        self.instrucoes = []
+
+    @property
+    def terminador(self):
+        return self.instrucoes[-1] if self.instrucoes else None
+
+    def sucessores(self):
+        terminador = self.terminador
+        return terminador.alvos if terminador is not None else ()
+
+
+class ProgramaIR:
+    """Blocos na ordem em que serão emitidos; o primeiro é a entrada."""
+
+    def __init__(self, variaveis):
+        self.blocos = []
+        # nomes por slot (a lista da TabelaSimbolos)
+        self.variaveis = variaveis
+        self.n_temps = 0
+        self.n_blocos = 0
+
+    def novo_temp(self):
+        temp = Temp(self.n_temps)
+        self.n_temps += 1
+        return temp
+
+    def novo_bloco(self):
+        bloco = Bloco(f"B{self.n_blocos}")
+        self.n_blocos += 1
+        return bloco
+
+    # TEXTO (main.py --dump-ir)
+    def texto_instrucao(self, ins):
+        args = ", ".join(str(arg) for arg in ins.args)
+        if ins.op == CARREGA:
+            return f"  {ins.destino} = carrega {self.variaveis[ins.slot]}"
+        if ins.op == GUARDA:
+            return f"  guarda {self.variaveis[ins.slot]}, {args}"
+        if ins.op == COPIA:
+            return f"  {ins.destino} = copia {args}"
+        if ins.op == SALTA:
+            return f"  salta {ins.alvos[0].rotulo}"
+        if ins.op == DESVIA:
+            return f"  desvia {args}, {ins.alvos[0].rotulo}, {ins.alvos[1].rotulo}"
+        if ins.op == RETORNA:
+            return f"  retorna {args}"
+        if ins.op == FI:
+            pares = ", ".join(f"{bloco.rotulo}: {arg}" for bloco, arg in zip(ins.alvos, ins.args))
+            return f"  {ins.destino} = fi {pares}"
+        a, b = ins.args
+        return f"  {ins.destino} = {a} {ins.op} {b}"
+
+    def texto(self):
+        linhas = []
+        for bloco in self.blocos:
+            linhas.append(f"{bloco.rotulo}:")
+            linhas.extend(self.texto_instrucao(ins) for ins in bloco.instrucoes)
+        return "\n".join(linhas)
+
+
+class GeradorIR(Visitante):
+    """Traduz a AST de objetos (já verificada, com os slots) para o IR.
+
+    Cada visita_ de expressão retorna o operando com o valor do nó: a
+    própria constante (int) ou o Temp que recebeu o resultado.
+    """
+
+    def __init__(self, tabela=None):
+        super().__init__()
+        self.programa = ProgramaIR(tabela.nomes if tabela is not None else [])
+        self.atual = None
+
+    # BLOCOS
+    def iniciar(self, bloco):
+        """Passa a emitir no bloco (que entra na ordem de emissão aqui)."""
+        self.programa.blocos.append(bloco)
+        self.atual = bloco
+
+    def emitir(self, op, destino=None, args=(), slot=None, alvos=()):
+        self.atual.instrucoes.append(Instrucao(op, destino, args, slot, alvos))
+
+    # PROGRAMA
+    def gera_programa(self, programa):
+        self.iniciar(self.programa.novo_bloco())
+
+        for decl in programa.declaracoes:
+            self.gera_decl(decl)
+
+        for cmd in programa.comandos:
+            self.gera_cmd(cmd)
+
+        self.emitir(RETORNA, args=(self.gera_exp(programa.retorno),))
+        return self.programa
+
+    # DECLARAÇÃO
+    def gera_decl(self, decl):
+        self.emitir(GUARDA, args=(self.gera_exp(decl.expressao),), slot=decl.slot)
+
+    # COMANDOS
+    def gera_cmd(self, cmd):
+        self.despacho[type(cmd)](cmd)
+
+    def visita_CmdAtrib(self, cmd):
+        self.emitir(GUARDA, args=(self.gera_exp(cmd.expressao),), slot=cmd.slot)
+
+    def visita_CmdIf(self, cmd):
+        programa = self.programa
+        bloco_then = programa.novo_bloco()
+        bloco_else = programa.novo_bloco() if cmd.else_cmds else None
+        bloco_fim = programa.novo_bloco()
+
+        cond = self.gera_exp(cmd.cond)
+        self.emitir(DESVIA, args=(cond,), alvos=(bloco_then, bloco_else or bloco_fim))
+
+        self.iniciar(bloco_then)
+        for c in cmd.then_cmds:
+            self.gera_cmd(c)
+        self.emitir(SALTA, alvos=(bloco_fim,))
+
+        if bloco_else is not None:
+            self.iniciar(bloco_else)
+            for c in cmd.else_cmds:
+                self.gera_cmd(c)
+            self.emitir(SALTA, alvos=(bloco_fim,))
+
+        self.iniciar(bloco_fim)
+
+    def visita_CmdWhile(self, cmd):
+        programa = self.programa
+        bloco_cond = programa.novo_bloco()
+        bloco_corpo = programa.novo_bloco()
+        bloco_fim = programa.novo_bloco()
+
+        self.emitir(SALTA, alvos=(bloco_cond,))
+
+        self.iniciar(bloco_cond)
+        cond = self.gera_exp(cmd.cond)
+        self.emitir(DESVIA, args=(cond,), alvos=(bloco_corpo, bloco_fim))
+
+        self.iniciar(bloco_corpo)
+        for c in cmd.corpo:
+            self.gera_cmd(c)
+        self.emitir(SALTA, alvos=(bloco_cond,))
+
+        self.iniciar(bloco_fim)
+
+    # EXPRESSÕES
+    def gera_exp(self, node):
+        # pós-ordem com pilha explícita: um OpBin entra duas vezes, a segunda
+        # (operandos_prontos) com os operandos já no topo de resultados
+        despacho = self.despacho
+        pilha = [(node, False)]
+        resultados = []
+
+        while pilha:
+            node, operandos_prontos = pilha.pop()
+            if operandos_prontos:
+                dir = resultados.pop()
+                esq = resultados.pop()
+                resultados.append(despacho[type(node)](node, esq, dir))
+            elif type(node) is OpBin:
+                pilha.append((node, True))
+                pilha.append((node.opDir, False))
+                pilha.append((node.opEsq, False))
+            else:
+                resultados.append(despacho[type(node)](node))
+
+        return resultados[0]
+
+    def visita_Const(self, node):
+        return node.valor
+
+    def visita_Var(self, node):
+        temp = self.programa.novo_temp()
+        self.emitir(CARREGA, temp, slot=node.slot)
+        return temp
+
+    def visita_OpBin(self, node, esq, dir):
+        # esq e dir: os operandos dos dois lados, já gerados
+        temp = self.programa.novo_temp()
+        self.emitir(node.operador, temp, (esq, dir))
+        return temp
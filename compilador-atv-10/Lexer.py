@@ -1,10 +1,282 @@
-from Token import Token
+import mmap
+import os
+import re
+from array import array
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, chain, repeat
+from operator import sub
+from sys import intern
+from Token import (
+    Token, EOF, LITERAL_INTEIRO, IDENTIFICADOR,
+    PONTUACOES, OPERADORES, PALAVRAS_CHAVE,
+)
+
+# Versão da tokenização: mude sempre que os tokens gerados mudarem, para
+# invalidar os caches .evtok gravados por versões anteriores.
+VERSAO_LEXER = 2
+
+# Símbolos fixos (pontuação e operadores) -> tipo, e os mesmos lexemas do
+# mais longo para o mais curto: numa alternância de expressão regular (e
+# no Lexer) o primeiro que casa vence, então '==' vem antes de '='
+SIMBOLOS = {lexema: spec["tipo"] for lexema, spec in {**PONTUACOES, **OPERADORES}.items()}
+SIMBOLOS_ORDENADOS = sorted(SIMBOLOS, key=len, reverse=True)
+SIMBOLOS_LONGOS = [lexema for lexema in SIMBOLOS_ORDENADOS if len(lexema) > 1]
+SIMBOLOS_CURTOS = [lexema for lexema in SIMBOLOS_ORDENADOS if len(lexema) == 1]
+
+# Tipos dos lexemas fixos (pontuação, operadores e palavras-chave)
+TIPOS_FIXOS = dict(SIMBOLOS)
+TIPOS_FIXOS.update(PALAVRAS_CHAVE)
+
+# Lexer: símbolos candidatos por caractere inicial, do mais longo ao mais curto
+SIMBOLOS_POR_INICIAL = {}
+for lexema in SIMBOLOS_ORDENADOS:
+    SIMBOLOS_POR_INICIAL.setdefault(lexema[0], []).append(lexema)
+
+# Expressão regular mestre do LexerRegex: uma única alternância que
+# separa todos os lexemas de uma vez (espaços são descartados pelo
+# próprio findall). Os símbolos de mais de um caractere vêm das tabelas;
+# os de um caractere caem no \S. Sequências inválidas como '237axy' ou
+# '@' também viram lexemas e são reconhecidas na classificação.
+PADRAO_LEXEMAS = re.compile(
+    r"[0-9]+[A-Za-z0-9]*|[A-Za-z][A-Za-z0-9]*|"
+    + "".join(re.escape(lexema) + "|" for lexema in SIMBOLOS_LONGOS)
+    + r"\S"
+)
+
+# Cada lexema com os espaços que vêm antes dele: o LexerRegex soma os
+# tamanhos desses pedaços para saber onde cada lexema começa
+PADRAO_PEDACOS = re.compile(r"\s*(?:" + PADRAO_LEXEMAS.pattern + ")")
+
+# Versão em bytes da mesma tokenização, usada pelo LexerBytes. Os grupos
+# separam literais (1), identificadores (2), símbolos de mais de um
+# caractere (3) e de um caractere (4); o grupo 5 captura qualquer outro
+# byte visível, o que inclui sequências inválidas e todo byte fora do ASCII.
+PADRAO_BYTES = re.compile(
+    rb"([0-9]+)(?![A-Za-z0-9\x80-\xff])"
+    rb"|([A-Za-z][A-Za-z0-9]*)(?![A-Za-z0-9\x80-\xff])"
+    + b"|(" + "|".join(map(re.escape, SIMBOLOS_LONGOS)).encode('ascii') + b")"
+    + b"|([" + "".join(map(re.escape, SIMBOLOS_CURTOS)).encode('ascii') + b"])"
+    + rb"|(\S)"
+)
+
+# Token de cada símbolo de um caractere, indexado pelo valor do byte
+SIMBOLOS_BYTE = [None] * 256
+for lexema in SIMBOLOS_CURTOS:
+    SIMBOLOS_BYTE[ord(lexema)] = (SIMBOLOS[lexema], lexema)
+
+# Códigos compactos usados pelo LexerParalelo para trafegar tokens entre
+# processos: cada lexema fixo tem um código (índice em FIXOS); literais e
+# identificadores usam os dois códigos seguintes e levam o lexema à parte.
+FIXOS = list(TIPOS_FIXOS.items())
+CODIGOS_FIXOS = {lexema: codigo for codigo, (lexema, _) in enumerate(FIXOS)}
+CODIGO_LITERAL = len(FIXOS)
+CODIGO_IDENTIFICADOR = len(FIXOS) + 1
+
+# Códigos dos lexemas feitos de letras e dígitos (palavras-chave, literais
+# e identificadores): colados a um caractere inválido, são parte dele
+CODIGOS_PALAVRAS = frozenset(
+    [CODIGOS_FIXOS[palavra] for palavra in PALAVRAS_CHAVE] + [CODIGO_LITERAL, CODIGO_IDENTIFICADOR]
+)
+
+
+# AUTÔMATO DO LexerAFD
+# Classes de caractere fixas; cada caractere dos símbolos fixos ganha uma
+# classe própria a partir de CLASSE_ALNUM + 1.
+CLASSE_INVALIDO, CLASSE_ESPACO, CLASSE_DIGITO, CLASSE_LETRA, CLASSE_ALNUM = range(5)
+
+# Estados fixos; os estados dos símbolos são criados a partir do 5.
+ESTADO_MORTO, ESTADO_INICIAL, ESTADO_NUMERO, ESTADO_IDENTIFICADOR, ESTADO_NUMERO_INVALIDO = range(5)
+
+# "tipo" aceito no estado de número seguido de letra (ex.: '237axy')
+TIPO_INVALIDO = -2
+
+
+def classificar(ch):
+    """Classe de um caractere que não é símbolo (mesmos testes do Lexer)."""
+    if ch.isspace():
+        return CLASSE_ESPACO
+    if ch.isdigit():
+        return CLASSE_DIGITO
+    if ch.isalpha():
+        return CLASSE_LETRA
+    if ch.isalnum():
+        return CLASSE_ALNUM
+    return CLASSE_INVALIDO
+
+
+def montar_afd(simbolos):
+    """Gera as tabelas do LexerAFD a partir dos símbolos fixos (lexema -> tipo).
+
+    Retorna (classes, transicoes, aceitacao, n_classes): `classes` (bytes)
+    dá a classe dos caracteres 0 a 255, `transicoes` (array 'B') tem uma
+    linha de n_classes colunas por estado e `aceitacao` (array 'b') o tipo
+    aceito em cada estado, ou -1.
+    """
+    caracteres = sorted({c for lexema in simbolos for c in lexema})
+    classe_simbolo = {c: CLASSE_ALNUM + 1 + i for i, c in enumerate(caracteres)}
+    n_classes = CLASSE_ALNUM + 1 + len(caracteres)
+
+    classes = bytes(
+        classe_simbolo[chr(b)] if chr(b) in classe_simbolo else classificar(chr(b))
+        for b in range(256)
+    )
+
+    linhas = [[ESTADO_MORTO] * n_classes for _ in range(ESTADO_NUMERO_INVALIDO + 1)]
+    aceitacao = [-1] * len(linhas)
+
+    linhas[ESTADO_INICIAL][CLASSE_DIGITO] = ESTADO_NUMERO
+    linhas[ESTADO_INICIAL][CLASSE_LETRA] = ESTADO_IDENTIFICADOR
+    linhas[ESTADO_NUMERO][CLASSE_DIGITO] = ESTADO_NUMERO
+    linhas[ESTADO_NUMERO][CLASSE_LETRA] = ESTADO_NUMERO_INVALIDO
+    for classe in (CLASSE_DIGITO, CLASSE_LETRA, CLASSE_ALNUM):
+        linhas[ESTADO_IDENTIFICADOR][classe] = ESTADO_IDENTIFICADOR
+
+    aceitacao[ESTADO_NUMERO] = LITERAL_INTEIRO
+    aceitacao[ESTADO_IDENTIFICADOR] = IDENTIFICADOR
+    aceitacao[ESTADO_NUMERO_INVALIDO] = TIPO_INVALIDO
+
+    # símbolos: uma árvore de prefixos a partir do estado inicial
+    for lexema, tipo in simbolos.items():
+        estado = ESTADO_INICIAL
+        for c in lexema:
+            classe = classe_simbolo[c]
+            if linhas[estado][classe] == ESTADO_MORTO:
+                linhas[estado][classe] = len(linhas)
+                linhas.append([ESTADO_MORTO] * n_classes)
+                aceitacao.append(-1)
+            estado = linhas[estado][classe]
+        aceitacao[estado] = tipo
+
+    transicoes = array('B', [destino for linha in linhas for destino in linha])
+    return classes, transicoes, array('b', aceitacao), n_classes
+
+
+CLASSES_AFD, TRANSICOES_AFD, ACEITACAO_AFD, N_CLASSES_AFD = montar_afd(SIMBOLOS)
+
+
+def lexar_trecho(texto, inicio):
+    """Analisa um trecho do fonte (executado num processo do LexerParalelo).
+
+    Retorna os tokens em colunas compactas: códigos (bytes), posições
+    absolutas (array) e os lexemas dos literais e identificadores. O
+    último valor é a posição do primeiro lexema inválido ou fora do
+    ASCII, ou None se o trecho inteiro foi reconhecido.
+    """
+    codigos = bytearray()
+    posicoes = array('q')
+    lexemas = []
+    fim_anterior = 0
+
+    for m in PADRAO_LEXEMAS.finditer(texto):
+        lexema = m.group()
+        codigo = CODIGOS_FIXOS.get(lexema)
+
+        if codigo is None:
+            if lexema.isascii() and lexema.isdigit():
+                codigo = CODIGO_LITERAL
+            elif lexema.isascii() and lexema.isalnum() and not lexema[0].isdigit():
+                codigo = CODIGO_IDENTIFICADOR
+            else:
+                invalido = m.start()
+                # uma palavra colada ao caractere inválido faz parte do
+                # mesmo lexema para o Lexer (ex.: 'abç', 'x²', 'ifç')
+                if codigos and codigos[-1] in CODIGOS_PALAVRAS and fim_anterior == invalido:
+                    if codigos.pop() >= CODIGO_LITERAL:
+                        lexemas.pop()
+                    invalido = posicoes.pop() - inicio
+                return bytes(codigos), posicoes, lexemas, inicio + invalido
+            lexemas.append(lexema)
+
+        codigos.append(codigo)
+        posicoes.append(inicio + m.start())
+        fim_anterior = m.end()
+
+    return bytes(codigos), posicoes, lexemas, None
+
+
+def tokens_de_colunas(codigos, posicoes, lexemas):
+    """Reconstrói os tokens a partir das colunas compactas de lexar_trecho."""
+    variaveis = iter(lexemas)
+
+    for codigo, posicao in zip(codigos, posicoes):
+        if codigo == CODIGO_IDENTIFICADOR:
+            yield Token(IDENTIFICADOR, intern(next(variaveis)), posicao)
+        elif codigo == CODIGO_LITERAL:
+            yield Token(LITERAL_INTEIRO, next(variaveis), posicao)
+        else:
+            lexema, tipo = FIXOS[codigo]
+            yield Token(tipo, lexema, posicao)
+
+
+class IndiceLinhas:
+    """Converte posições do fonte em (linha, coluna), ambas a partir de 1.
+
+    A tabela com o início de cada linha é montada uma única vez, na
+    primeira consulta (isto é, só quando algum diagnóstico é exibido),
+    e cada conversão é uma busca binária nela.
+    """
+
+    def __init__(self, texto):
+        self.texto = texto
+        self.inicios = None
+
+    def montar(self):
+        quebra = '\n' if isinstance(self.texto, str) else b'\n'
+        inicios = array('q', [0])
+
+        i = self.texto.find(quebra)
+        while i != -1:
+            inicios.append(i + 1)
+            i = self.texto.find(quebra, i + 1)
+
+        return inicios
+
+    def linha_coluna(self, posicao):
+        if self.inicios is None:
+            self.inicios = self.montar()
+
+        linha = bisect_right(self.inicios, posicao)
+        return linha, posicao - self.inicios[linha - 1] + 1
+
+
+class FluxoTokens:
+    """Fluxo de tokens sob demanda com um buffer de lookahead limitado.
+
+    Cada token sai do gerador uma única vez: olhar(k) só enche o buffer
+    até a posição k, e consumir() esvazia o buffer antes de pedir um
+    novo token ao gerador.
+    """
+
+    def __init__(self, tokens, capacidade=4):
+        self.tokens = tokens
+        self.buffer = deque()
+        self.capacidade = capacidade
+
+    def olhar(self, k=0):
+        """Retorna o k-ésimo token à frente (0 = o próximo) sem consumir."""
+        if k >= self.capacidade:
+            raise ValueError(f"Lookahead de {k + 1} tokens excede o buffer de {self.capacidade}")
+
+        while len(self.buffer) <= k:
+            self.buffer.append(next(self.tokens))
+
+        return self.buffer[k]
+
+    def consumir(self):
+        if self.buffer:
+            return self.buffer.popleft()
+        return next(self.tokens)
+
 
 class Lexer:
     def __init__(self, texto):
         self.texto = texto
         self.pos = 0
         self.char_atual = self.texto[self.pos] if self.texto else None
+        self.linhas = IndiceLinhas(texto)
+        self.fluxo = FluxoTokens(self.gerar_tokens())
 
     def avancar(self):
         self.pos += 1
@@ -19,20 +291,37 @@ class Lexer:
             return self.texto[self.pos + 1]
         return None
 
-    def olhar_proximo_token(self):
-        pos_salva = self.pos
-        char_salvo = self.char_atual
-        tok = self.proximo_token()
-        self.pos = pos_salva
-        self.char_atual = char_salvo
-        return tok
+    def gerar_tokens(self):
+        """Gera os tokens um a um; depois do fim, repete o EOF."""
+        while True:
+            tok = self.ler_token()
+            if tok.tipo == EOF:
+                yield from repeat(tok)
+            yield tok
+
+    def olhar_proximo_token(self, k=0):
+        """Retorna o próximo token (ou o k-ésimo adiante) sem consumir (lookahead)."""
+        return self.fluxo.olhar(k)
 
     def proximo_token(self):
+        return self.fluxo.consumir()
+
+    def linha_coluna(self, posicao):
+        """Converte a posição de um token deste lexer em (linha, coluna)."""
+        return self.linhas.linha_coluna(posicao)
+
+    def onde(self, posicao):
+        linha, coluna = self.linha_coluna(posicao)
+        return f"linha {linha}, coluna {coluna}"
+
+    def ler_token(self):
         while self.char_atual is not None:
             if self.char_atual.isspace():
                 self.pular_espacos()
                 continue
 
+            inicio = self.pos
+
             # NÚMEROS
             if self.char_atual.isdigit():
                 num_str = ''
@@ -41,9 +330,9 @@ class Lexer:
                     self.avancar()
 
                 if self.char_atual is not None and self.char_atual.isalpha():
-                    raise Exception(f"Erro léxico: sequência inválida '{num_str}{self.char_atual}' na posição {self.pos}")
+                    raise Exception(f"Erro léxico: sequência inválida '{num_str}{self.char_atual}' na posição {self.pos} ({self.onde(self.pos)})")
 
-                return Token('LITERAL_INTEIRO', num_str)
+                return Token(LITERAL_INTEIRO, num_str, inicio)
 
             # IDENTIFICADORES / KEYWORDS
             if self.char_atual.isalpha():
@@ -53,64 +342,253 @@ class Lexer:
                     self.avancar()
 
                 # palavras-chave
-                if ident_str == "if":
-                    return Token('IF', ident_str)
-                elif ident_str == "else":
-                    return Token('ELSE', ident_str)
-                elif ident_str == "while":
-                    return Token('WHILE', ident_str)
-                elif ident_str == "return":
-                    return Token('RETURN', ident_str)
-
-                return Token('IDENTIFICADOR', ident_str)
-
-            # PONTUAÇÃO
-            if self.char_atual == '{':
-                self.avancar()
-                return Token('ABRE_CHAVE', '{')
-
-            if self.char_atual == '}':
-                self.avancar()
-                return Token('FECHA_CHAVE', '}')
-
-            if self.char_atual == '(':
-                self.avancar()
-                return Token('ABRE_PARENTESE', '(')
-
-            if self.char_atual == ')':
-                self.avancar()
-                return Token('FECHA_PARENTESE', ')')
-
-            if self.char_atual == ';':
-                self.avancar()
-                return Token('PONTO_VIRGULA', ';')
-
-            # OPERADORES
-
-            # == (igualdade)
-            if self.char_atual == '=' and self.olhar_proximo_char() == '=':
-                self.avancar()
-                self.avancar()
-                return Token('OP_COMPARACAO', '==')
-
-            # = (atribuição)
-            if self.char_atual == '=':
-                self.avancar()
-                return Token('IGUAL', '=')
-
-            # < ou >
-            if self.char_atual in ('<', '>'):
-                op = self.char_atual
-                self.avancar()
-                return Token('OP_COMPARACAO', op)
-
-            # + - * /
-            if self.char_atual in ('+', '-', '*', '/'):
-                op = self.char_atual
-                self.avancar()
-                return Token('OPERADOR', op)
+                tipo = PALAVRAS_CHAVE.get(ident_str)
+                if tipo is not None:
+                    return Token(tipo, ident_str, inicio)
+
+                return Token(IDENTIFICADOR, intern(ident_str), inicio)
+
+            # PONTUAÇÃO E OPERADORES (o mais longo que casa, ex.: '==' antes de '=')
+            for lexema in SIMBOLOS_POR_INICIAL.get(self.char_atual, ()):
+                if len(lexema) == 1 or self.texto.startswith(lexema, inicio):
+                    self.pos += len(lexema) - 1
+                    self.avancar()
+                    return Token(SIMBOLOS[lexema], lexema, inicio)
 
             # ERRO
-            raise Exception(f"Erro léxico: caractere '{self.char_atual}' inesperado na posição {self.pos}")
+            raise Exception(f"Erro léxico: caractere '{self.char_atual}' inesperado na posição {self.pos} ({self.onde(self.pos)})")
+
+        return Token(EOF, '', self.pos)
+
+
+class LexerRegex(Lexer):
+    """Analisador léxico guiado por uma única expressão regular.
+
+    Separa todos os lexemas com um findall e classifica cada um por
+    consulta em tabela, em vez de percorrer o texto caractere a
+    caractere. Os tokens são criados sob demanda, na mesma ordem, com
+    os mesmos tipos e as mesmas posições do Lexer.
+
+    O findall devolve cada lexema junto com os espaços antes dele, então
+    a posição é a soma dos tamanhos dos pedaços até ali menos o tamanho
+    do lexema. Lexemas repetidos (nomes de variáveis, sobretudo) são
+    classificados uma vez só.
+    """
+
+    def gerar_tokens(self):
+        tokens = self.tokenizar()
+
+        if tokens is None:
+            return Lexer.gerar_tokens(self)
+
+        return tokens
+
+    def tokenizar(self):
+        pedacos = PADRAO_PEDACOS.findall(self.texto)
+        lexemas = list(map(str.lstrip, pedacos))
+
+        tabela = dict(TIPOS_FIXOS)
+        nomes = {}
+        for lexema in set(lexemas).difference(TIPOS_FIXOS):
+            if lexema.isascii() and lexema.isdigit():
+                tabela[lexema] = LITERAL_INTEIRO
+            elif lexema.isascii() and lexema.isalnum() and not lexema[0].isdigit():
+                tabela[lexema] = IDENTIFICADOR
+                nomes[lexema] = intern(lexema)
+            else:
+                # erro léxico ou caractere fora do ASCII: o Lexer
+                # caractere a caractere gera os tokens e o erro exatos
+                return None
+
+        # colunas prontas antes do primeiro token: os pedaços já podem ser
+        # liberados, e cada identificador passa a ser a cópia internada
+        posicoes = list(map(sub, accumulate(map(len, pedacos)), map(len, lexemas)))
+        del pedacos
+        tipos = list(map(tabela.__getitem__, lexemas))
+        lexemas = list(map(nomes.get, lexemas, lexemas))
+
+        fim = Token(EOF, '', len(self.texto))
+        return chain(map(Token, tipos, lexemas, posicoes), repeat(fim))
+
+
+class LexerBytes(Lexer):
+    """Analisador léxico direto sobre bytes (bytes, memoryview ou mmap).
+
+    O arquivo não é decodificado: os tokens são reconhecidos sobre os
+    bytes, e só identificadores e literais geram strings novas. Se
+    aparecer um byte fora do ASCII ou uma sequência inválida, o restante
+    do texto é decodificado e entregue ao Lexer caractere a caractere,
+    que produz os mesmos tokens e erros (até ali tudo era ASCII, então a
+    posição em bytes coincide com a posição em caracteres).
+    """
+
+    def __init__(self, dados):
+        self.dados = dados
+        self.pos = 0
+        self.linhas = IndiceLinhas(dados)
+        self.fluxo = FluxoTokens(self.gerar_tokens())
+
+    @classmethod
+    def de_arquivo(cls, caminho):
+        """Cria o lexer sobre o arquivo mapeado em memória (mmap)."""
+        with open(caminho, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return cls(b'')
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def gerar_tokens(self):
+        dados = self.dados
+
+        for m in PADRAO_BYTES.finditer(dados):
+            grupo = m.lastindex
+
+            if grupo == 1:
+                yield Token(LITERAL_INTEIRO, m.group(1).decode('ascii'), m.start())
+
+            elif grupo == 2:
+                lexema = intern(m.group(2).decode('ascii'))
+                yield Token(TIPOS_FIXOS.get(lexema, IDENTIFICADOR), lexema, m.start())
+
+            elif grupo == 3:
+                lexema = m.group(3).decode('ascii')
+                yield Token(SIMBOLOS[lexema], lexema, m.start())
+
+            elif grupo == 4:
+                inicio = m.start()
+                yield Token(*SIMBOLOS_BYTE[dados[inicio]], inicio)
+
+            else:
+                # caso raro: continua com o Lexer caractere a caractere
+                # (daqui em diante as posições são em caracteres)
+                texto = str(dados, 'utf-8')
+                lexer = Lexer(texto)
+                lexer.pos = m.start()
+                lexer.char_atual = texto[lexer.pos]
+                self.linhas = lexer.linhas
+                yield from lexer.gerar_tokens()
+                return
+
+        yield from repeat(Token(EOF, '', len(dados)))
+
+
+class LexerParalelo(Lexer):
+    """Analisador léxico que divide o fonte em trechos e os analisa em paralelo.
+
+    Os trechos são cortados em quebras de linha (que nunca ficam dentro
+    de um token), analisados num ProcessPoolExecutor e juntados na ordem
+    do fonte, já com as posições absolutas. Ao encontrar o primeiro
+    lexema inválido (ou fora do ASCII), a análise segue dali com o Lexer
+    caractere a caractere, então os erros léxicos saem na ordem do fonte
+    e com as mesmas mensagens.
+    """
+
+    # abaixo disso, o custo de criar processos supera o ganho
+    TAMANHO_MINIMO_TRECHO = 1 << 20
+
+    def __init__(self, texto, trabalhadores=None):
+        self.trabalhadores = trabalhadores or os.cpu_count() or 1
+        super().__init__(texto)
+
+    def dividir(self):
+        """Retorna as posições de início dos trechos, cortando em '\\n'."""
+        texto = self.texto
+        quantidade = min(self.trabalhadores, len(texto) // self.TAMANHO_MINIMO_TRECHO) or 1
+        tamanho = len(texto) // quantidade
+
+        inicios = [0]
+        for i in range(1, quantidade):
+            quebra = texto.find('\n', max(i * tamanho, inicios[-1]))
+            if quebra == -1:
+                break
+            inicios.append(quebra + 1)
+
+        return inicios
+
+    def gerar_tokens(self):
+        texto = self.texto
+        inicios = self.dividir()
+        fins = inicios[1:] + [len(texto)]
+        trechos = [texto[i:f] for i, f in zip(inicios, fins)]
+
+        if len(trechos) == 1:
+            resultados = [lexar_trecho(trechos[0], 0)]
+            yield from self.juntar(resultados)
+            return
+
+        with ProcessPoolExecutor(max_workers=len(trechos)) as executor:
+            yield from self.juntar(executor.map(lexar_trecho, trechos, inicios))
+
+    def juntar(self, resultados):
+        for codigos, posicoes, lexemas, invalido in resultados:
+            yield from tokens_de_colunas(codigos, posicoes, lexemas)
+
+            if invalido is not None:
+                self.pos = invalido
+                self.char_atual = self.texto[invalido]
+                yield from Lexer.gerar_tokens(self)
+                return
+
+        yield from repeat(Token(EOF, '', len(self.texto)))
+
+
+class LexerAFD(Lexer):
+    """Analisador léxico dirigido por tabelas (autômato finito determinístico).
+
+    O autômato é gerado por montar_afd a partir de PONTUACOES e OPERADORES:
+    cada caractere vira uma classe por consulta em CLASSES_AFD e cada passo
+    é uma consulta em TRANSICOES_AFD, então o custo por caractere não
+    depende da quantidade de tokens da linguagem. O token é o maior prefixo
+    aceito; palavras-chave são identificadores achados em PALAVRAS_CHAVE.
+    Tokens, posições e mensagens de erro são os mesmos do Lexer.
+    """
+
+    def gerar_tokens(self):
+        texto = self.texto
+        n = len(texto)
+        classes = CLASSES_AFD
+        transicoes = TRANSICOES_AFD
+        aceitacao = ACEITACAO_AFD
+        n_classes = N_CLASSES_AFD
+        pos = self.pos
+
+        while pos < n:
+            c = ord(texto[pos])
+            classe = classes[c] if c < 256 else classificar(texto[pos])
+            if classe == CLASSE_ESPACO:
+                pos += 1
+                continue
+
+            inicio = pos
+            estado = ESTADO_INICIAL
+            fim = tipo = -1
+            while True:
+                estado = transicoes[estado * n_classes + classe]
+                if estado == ESTADO_MORTO:
+                    break
+                pos += 1
+                if aceitacao[estado] != -1:
+                    fim = pos
+                    tipo = aceitacao[estado]
+                if pos == n:
+                    break
+                c = ord(texto[pos])
+                classe = classes[c] if c < 256 else classificar(texto[pos])
+
+            # ERROS
+            if tipo == -1:
+                self.pos = inicio
+                raise Exception(f"Erro léxico: caractere '{texto[inicio]}' inesperado na posição {inicio} ({self.onde(inicio)})")
+            if tipo == TIPO_INVALIDO:
+                self.pos = fim - 1
+                raise Exception(f"Erro léxico: sequência inválida '{texto[inicio:fim]}' na posição {fim - 1} ({self.onde(fim - 1)})")
+
+            pos = fim
+            lexema = texto[inicio:fim]
+            if tipo == IDENTIFICADOR:
+                tipo = PALAVRAS_CHAVE.get(lexema, IDENTIFICADOR)
+                if tipo == IDENTIFICADOR:
+                    lexema = intern(lexema)
+            yield Token(tipo, lexema, inicio)
 
-        return Token('EOF', '')
\ No newline at end of file
+        self.pos = n
+        yield from repeat(Token(EOF, '', n))
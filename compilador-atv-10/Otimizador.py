@@ -0,0 +1,312 @@
+from Visitor import Visitante
+from Syntactic import Const, Var, OpBin, CmdAtrib, CmdIf, CmdWhile, INT_MIN, inteiro_64
+from Arena import CONST, OPBIN, OPERADORES
+
+
+def dividir(a, b):
+    # idiv trunca em direção a zero (o // do Python arredonda para baixo)
+    quociente = abs(a) // abs(b)
+    return quociente if (a < 0) == (b < 0) else -quociente
+
+
+# operador -> resultado com os dois operandos constantes; mesma semântica
+# das instruções de Generator.EMISSORES
+DOBRAS = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': dividir,
+    '<': lambda a, b: int(a < b),
+    '>': lambda a, b: int(a > b),
+    '==': lambda a, b: int(a == b),
+}
+
+
+def dobrar(operador, a, b):
+    """Valor de a <operador> b calculado em tempo de compilação.
+
+    Retorna None quando a instrução falharia em tempo de execução (divisão
+    por zero ou INT_MIN / -1): o código fica como está.
+    """
+    a, b = inteiro_64(a), inteiro_64(b)
+    if operador == '/' and (b == 0 or (a == INT_MIN and b == -1)):
+        return None
+    return inteiro_64(DOBRAS[operador](a, b))
+
+
+class Otimizador(Visitante):
+    """Dobra de constantes: OpBin com os dois operandos Const vira um Const.
+
+    Roda depois da análise semântica e antes do Generator. Os comandos são
+    atualizados no lugar; as expressões dobradas são nós novos, então uma
+    subexpressão compartilhada (FabricaHashConsing) não é alterada.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.dobradas = 0  # quantas operações foram calculadas aqui
+
+    # PROGRAMA
+    def otimizar(self, programa):
+        for decl in programa.declaracoes:
+            self.otimizar_item(decl)
+
+        for cmd in programa.comandos:
+            self.otimizar_item(cmd)
+
+        programa.retorno = self.otimizar_exp(programa.retorno)
+        return programa
+
+    def otimizar_item(self, item):
+        """Otimiza uma declaração ou comando (também usado no modo --fluxo)."""
+        self.despacho[type(item)](item)
+
+    # DECLARAÇÃO E COMANDOS
+    def visita_Decl(self, decl):
+        decl.expressao = self.otimizar_exp(decl.expressao)
+
+    def visita_CmdAtrib(self, cmd):
+        cmd.expressao = self.otimizar_exp(cmd.expressao)
+
+    def visita_CmdIf(self, cmd):
+        cmd.cond = self.otimizar_exp(cmd.cond)
+        for c in cmd.then_cmds:
+            self.otimizar_item(c)
+        for c in cmd.else_cmds:
+            self.otimizar_item(c)
+
+    def visita_CmdWhile(self, cmd):
+        cmd.cond = self.otimizar_exp(cmd.cond)
+        for c in cmd.corpo:
+            self.otimizar_item(c)
+
+    def visita_CmdReturn(self, cmd):
+        cmd.expressao = self.otimizar_exp(cmd.expressao)
+
+    # EXPRESSÕES
+    def otimizar_exp(self, node):
+        """A expressão dobrada, em pós-ordem com pilha explícita (sem recursão).
+
+        Um OpBin entra na pilha duas vezes: a primeira empilha os operandos;
+        a segunda (operandos_prontos) junta os dois resultados, que estão no
+        topo de resultados.
+        """
+        despacho = self.despacho
+        pilha = [(node, False)]
+        resultados = []
+
+        while pilha:
+            node, operandos_prontos = pilha.pop()
+            if operandos_prontos:
+                dir = resultados.pop()
+                esq = resultados.pop()
+                resultados.append(despacho[type(node)](node, esq, dir))
+            elif type(node) is OpBin:
+                pilha.append((node, True))
+                pilha.append((node.opDir, False))
+                pilha.append((node.opEsq, False))
+            else:
+                resultados.append(despacho[type(node)](node))
+
+        return resultados[0]
+
+    def visita_Const(self, node):
+        return node
+
+    def visita_Var(self, node):
+        return node
+
+    def visita_OpBin(self, node, esq, dir):
+        # esq e dir: os operandos já dobrados
+        if type(esq) is Const and type(dir) is Const:
+            valor = dobrar(node.operador, esq.valor, dir.valor)
+            if valor is not None:
+                self.dobradas += 1
+                return Const(valor)
+
+        if esq is node.opEsq and dir is node.opDir:
+            return node
+        return OpBin(node.operador, esq, dir)
+
+    # ARENA (Arena.py): os filhos sempre têm índice menor que o pai, então
+    # uma passada em ordem crescente dobra de baixo para cima, sem recursão.
+    # A arena não compartilha nós, então o OPBIN vira CONST no lugar.
+    def otimizar_arena(self, arena):
+        tipo, operador, esq, dir, valor = arena.tipo, arena.operador, arena.esq, arena.dir, arena.valor
+
+        for no in range(len(arena)):
+            if tipo[no] == OPBIN and tipo[esq[no]] == CONST and tipo[dir[no]] == CONST:
+                resultado = dobrar(OPERADORES[operador[no]], valor[esq[no]], valor[dir[no]])
+                if resultado is not None:
+                    self.dobradas += 1
+                    tipo[no] = CONST
+                    valor[no] = resultado
+
+
+# INVARIANTES DE LAÇO
+def todos_os_comandos(comandos):
+    """Os comandos da lista e os de dentro dos if/while, sem recursão."""
+    pilha = list(reversed(comandos))
+    while pilha:
+        cmd = pilha.pop()
+        yield cmd
+        if type(cmd) is CmdIf:
+            pilha.extend(reversed(cmd.else_cmds))
+            pilha.extend(reversed(cmd.then_cmds))
+        elif type(cmd) is CmdWhile:
+            pilha.extend(reversed(cmd.corpo))
+
+
+def pode_falhar(operador, dir):
+    # idiv para o programa com divisor 0 (ou -1 com INT_MIN): só é movido
+    # para fora do laço com um divisor constante que não falha
+    return operador == '/' and not (type(dir) is Const and dir.valor not in (0, -1))
+
+
+class MovimentoInvariantes(Visitante):
+    """Tira dos laços as subexpressões que não mudam entre as iterações.
+
+    Uma subexpressão de um CmdWhile (condição ou corpo, inclusive if e
+    while de dentro) é invariante se nenhuma das suas variáveis é
+    atribuída no corpo. A maior subexpressão invariante com operador
+    vira uma variável escondida ("inv.N", que não colide com nomes do
+    fonte), atribuída uma vez num preheader: comandos logo antes do
+    while, então antes do rótulo do início do laço. Expressões não têm
+    efeito colateral, então calcular o preheader mesmo quando o laço
+    roda zero vezes não muda o resultado; a exceção é a divisão, que
+    só sai do laço se não pode falhar (pode_falhar). Subexpressões
+    iguais no mesmo laço dividem a mesma variável.
+
+    Os laços de fora são tratados antes dos de dentro. Os comandos
+    são alterados no lugar; as expressões alteradas são nós novos
+    (uma subexpressão compartilhada não muda).
+    """
+
+    def __init__(self, tabela):
+        super().__init__()
+        self.tabela = tabela
+        self.movidas = 0  # subexpressões levadas para um preheader
+        self.atribuidas = set()
+        self.invariantes = {}  # número da subexpressão -> Var do preheader
+        self.numeros = {}
+        self.preheader = []
+
+    # PROGRAMA
+    def otimizar(self, programa):
+        programa.comandos = self.otimizar_comandos(programa.comandos)
+        return programa
+
+    def otimizar_comandos(self, comandos):
+        """A lista de comandos com o preheader antes de cada while (também usado no modo --fluxo)."""
+        novos = []
+        for cmd in comandos:
+            novos.extend(self.despacho[type(cmd)](cmd))
+        return novos
+
+    # COMANDOS: cada visita_ retorna os comandos que ficam no lugar de cmd
+    def visita_Cmd(self, cmd):
+        return [cmd]
+
+    def visita_CmdIf(self, cmd):
+        cmd.then_cmds = self.otimizar_comandos(cmd.then_cmds)
+        cmd.else_cmds = self.otimizar_comandos(cmd.else_cmds)
+        return [cmd]
+
+    def visita_CmdWhile(self, cmd):
+        self.atribuidas = {c.slot for c in todos_os_comandos(cmd.corpo) if type(c) is CmdAtrib}
+        self.invariantes = {}
+        self.numeros = {}
+        self.preheader = []
+
+        cmd.cond = self.extrair(cmd.cond)
+        for c in todos_os_comandos(cmd.corpo):
+            if type(c) is CmdAtrib:
+                c.expressao = self.extrair(c.expressao)
+            elif type(c) is CmdIf or type(c) is CmdWhile:
+                c.cond = self.extrair(c.cond)
+        preheader = self.preheader
+
+        # os laços de dentro, com o que sobrou de invariante para eles
+        cmd.corpo = self.otimizar_comandos(cmd.corpo)
+        return preheader + [cmd]
+
+    # EXPRESSÕES: cada visita_ retorna (nó, é invariante, número); o número
+    # identifica uma subexpressão invariante pelo valor (iguais têm o mesmo)
+    def extrair(self, node):
+        """A expressão com as subexpressões invariantes trocadas pelas variáveis do preheader.
+
+        Pós-ordem com pilha explícita, como Otimizador.otimizar_exp.
+        """
+        despacho = self.despacho
+        pilha = [(node, False)]
+        resultados = []
+
+        while pilha:
+            node, operandos_prontos = pilha.pop()
+            if operandos_prontos:
+                dir = resultados.pop()
+                esq = resultados.pop()
+                resultados.append(despacho[type(node)](node, esq, dir))
+            elif type(node) is OpBin:
+                pilha.append((node, True))
+                pilha.append((node.opDir, False))
+                pilha.append((node.opEsq, False))
+            else:
+                resultados.append(despacho[type(node)](node))
+
+        novo, invariante, numero = resultados[0]
+        return self.mover(novo, numero) if invariante else novo
+
+    def numerar(self, chave):
+        # chaves rasas (os operandos entram pelo número), então a
+        # profundidade da expressão não pesa no hash
+        return self.numeros.setdefault(chave, len(self.numeros))
+
+    def visita_Const(self, node):
+        return node, True, self.numerar(('const', node.valor))
+
+    def visita_Var(self, node):
+        if node.slot in self.atribuidas:
+            return node, False, None
+        return node, True, self.numerar(('var', node.slot))
+
+    def visita_OpBin(self, node, esq, dir):
+        # esq e dir: os resultados dos operandos
+        esq, esq_invariante, esq_numero = esq
+        dir, dir_invariante, dir_numero = dir
+
+        if esq_invariante and dir_invariante and not pode_falhar(node.operador, dir):
+            # quem decide se move é o pai (move a maior invariante)
+            return node, True, self.numerar((node.operador, esq_numero, dir_numero))
+
+        if esq_invariante:
+            esq = self.mover(esq, esq_numero)
+        if dir_invariante:
+            dir = self.mover(dir, dir_numero)
+
+        if esq is node.opEsq and dir is node.opDir:
+            return node, False, None
+        return OpBin(node.operador, esq, dir), False, None
+
+    def mover(self, node, numero):
+        """Var da variável escondida que guarda o valor do nó, calculado no preheader."""
+        if type(node) is not OpBin:
+            # Const e Var já custam uma instrução só
+            return node
+
+        var = self.invariantes.get(numero)
+        if var is None:
+            nome = f"inv.{len(self.tabela)}"
+            slot = self.tabela.declarar(nome)
+
+            atrib = CmdAtrib(nome, node)
+            atrib.slot = slot
+            self.preheader.append(atrib)
+            self.movidas += 1
+
+            var = self.invariantes[numero] = Var(nome)
+            var.slot = slot
+
+        novo = Var(var.nome)
+        novo.slot = var.slot
+        return novo
@@ -0,0 +1,449 @@
+from IR import Temp, Instrucao, COPIA, CARREGA, GUARDA, SALTA, DESVIA, RETORNA, FI
+from Otimizador import DOBRAS, dobrar
+
+# FORMA SSA E OTIMIZAÇÕES SOBRE O IR (IR.py)
+# O grafo de fluxo de controle são os próprios blocos: as arestas saem dos
+# terminadores (Bloco.sucessores) e predecessores() calcula as de entrada.
+# Na forma SSA cada Temp é definido uma vez só; as variáveis deixam de
+# passar pela memória (carrega/guarda) e viram Temps, com uma instrução fi
+# onde valores de caminhos diferentes se encontram.
+
+
+def predecessores(programa):
+    """bloco -> lista dos blocos que saltam para ele."""
+    preds = {bloco: [] for bloco in programa.blocos}
+    for bloco in programa.blocos:
+        for sucessor in bloco.sucessores():
+            preds[sucessor].append(bloco)
+    return preds
+
+
+def pos_ordem_reversa(entrada):
+    """Blocos alcançáveis a partir da entrada, em pós-ordem reversa (sem recursão)."""
+    visitados = {entrada}
+    ordem = []
+    pilha = [(entrada, iter(entrada.sucessores()))]
+
+    while pilha:
+        bloco, sucessores = pilha[-1]
+        for sucessor in sucessores:
+            if sucessor not in visitados:
+                visitados.add(sucessor)
+                pilha.append((sucessor, iter(sucessor.sucessores())))
+                break
+        else:
+            pilha.pop()
+            ordem.append(bloco)
+
+    ordem.reverse()
+    return ordem
+
+
+def dominadores(ordem, preds):
+    """Dominador imediato de cada bloco (algoritmo de Cooper, Harvey e Kennedy).
+
+    ordem é a pós-ordem reversa; a entrada é o próprio dominador.
+    """
+    numero = {bloco: i for i, bloco in enumerate(ordem)}
+    idom = {ordem[0]: ordem[0]}
+
+    mudou = True
+    while mudou:
+        mudou = False
+        for bloco in ordem[1:]:
+            novo = None
+            for pred in preds[bloco]:
+                if pred not in idom:
+                    continue
+                if novo is None:
+                    novo = pred
+                    continue
+                # ancestral comum: sobe pelos dois lados até se encontrarem
+                a, b = pred, novo
+                while a is not b:
+                    while numero[a] > numero[b]:
+                        a = idom[a]
+                    while numero[b] > numero[a]:
+                        b = idom[b]
+                novo = a
+
+            if idom.get(bloco) is not novo:
+                idom[bloco] = novo
+                mudou = True
+
+    return idom
+
+
+def fronteiras(ordem, preds, idom):
+    """Fronteira de dominância de cada bloco (dict usado como conjunto ordenado)."""
+    fronteira = {bloco: {} for bloco in ordem}
+    for bloco in ordem:
+        if len(preds[bloco]) < 2:
+            continue
+        for pred in preds[bloco]:
+            corredor = pred
+            while corredor is not idom[bloco]:
+                fronteira[corredor][bloco] = True
+                corredor = idom[corredor]
+    return fronteira
+
+
+def contar(programa):
+    return sum(len(bloco.instrucoes) for bloco in programa.blocos)
+
+
+def tem_efeito(ins):
+    """A instrução precisa ficar mesmo sem ninguém ler o resultado?"""
+    if ins.op in (SALTA, DESVIA, RETORNA, GUARDA):
+        return True
+    # o idiv pode parar o programa (divisão por zero, INT_MIN / -1)
+    if ins.op == '/':
+        divisor = ins.args[1]
+        return type(divisor) is Temp or divisor in (0, -1)
+    return False
+
+
+class OtimizadorSSA:
+    """Constrói a forma SSA do IR, otimiza e volta para cópias comuns.
+
+    1. tira os blocos inalcançáveis e calcula dominadores e fronteiras
+    2. coloca os fi (fronteiras iteradas dos blocos que guardam cada
+       variável) e renomeia percorrendo a árvore de dominadores: carrega
+       vira o valor corrente da variável e guarda só muda esse valor
+    3. até estabilizar: propaga cópias, fi com um valor só e operações
+       entre constantes (Otimizador.dobrar); desvia com condição constante
+       vira salta e os blocos que ficam sem caminho saem no fim
+    4. remove as instruções cujo resultado ninguém lê e junta cada bloco
+       que termina em salta com o sucessor, se é o único caminho até ele
+    5. sai da forma SSA: cada fi vira cópias no fim dos predecessores
+       (as arestas críticas ganham um bloco só para elas)
+
+    Os contadores dizem o que cada etapa fez; removidas é o saldo de
+    instruções (antes - depois) no programa inteiro.
+    """
+
+    def __init__(self):
+        self.promovidas = 0  # carrega/guarda trocados por valores SSA
+        self.propagadas = 0  # cópias e fi de um valor só substituídos
+        self.dobradas = 0    # operações entre constantes calculadas aqui
+        self.desvios = 0     # desvia com condição constante
+        self.mortas = 0      # instruções sem efeito e sem leitor
+        self.removidas = 0
+
+    def otimizar(self, programa):
+        antes = contar(programa)
+
+        self.remover_inalcancaveis(programa)
+        self.construir(programa)
+        self.propagar(programa)
+        self.eliminar_mortas(programa)
+        self.juntar_blocos(programa)
+        self.sair(programa)
+
+        self.removidas = antes - contar(programa)
+        return programa
+
+    # GRAFO
+    def remover_inalcancaveis(self, programa):
+        alcancaveis = set(pos_ordem_reversa(programa.blocos[0]))
+        programa.blocos = [bloco for bloco in programa.blocos if bloco in alcancaveis]
+
+        # fi: só os valores das arestas que restaram
+        preds = predecessores(programa)
+        for bloco in programa.blocos:
+            for ins in bloco.instrucoes:
+                if ins.op != FI:
+                    break
+                pares = [(pred, arg) for pred, arg in zip(ins.alvos, ins.args) if pred in preds[bloco]]
+                ins.alvos = tuple(pred for pred, _ in pares)
+                ins.args = tuple(arg for _, arg in pares)
+
+    # CONSTRUÇÃO
+    def construir(self, programa):
+        preds = predecessores(programa)
+        ordem = pos_ordem_reversa(programa.blocos[0])
+        idom = dominadores(ordem, preds)
+        fronteira = fronteiras(ordem, preds, idom)
+
+        # blocos que guardam cada variável
+        definicoes = {}
+        for bloco in ordem:
+            for ins in bloco.instrucoes:
+                if ins.op == GUARDA:
+                    definicoes.setdefault(ins.slot, {})[bloco] = True
+
+        # fi nas fronteiras iteradas de cada variável
+        fis = {bloco: [] for bloco in ordem}
+        slot_fi = {}
+        for slot, blocos in definicoes.items():
+            trabalho = list(blocos)
+            com_fi = set()
+            while trabalho:
+                for bloco in fronteira[trabalho.pop()]:
+                    if bloco in com_fi:
+                        continue
+                    com_fi.add(bloco)
+                    fi = Instrucao(FI, programa.novo_temp(), [0] * len(preds[bloco]), alvos=tuple(preds[bloco]))
+                    fis[bloco].append(fi)
+                    slot_fi[fi] = slot
+                    if bloco not in blocos:
+                        trabalho.append(bloco)
+
+        self.renomear(ordem, idom, fis, slot_fi)
+
+    def renomear(self, ordem, idom, fis, slot_fi):
+        filhos = {bloco: [] for bloco in ordem}
+        for bloco in ordem[1:]:
+            filhos[idom[bloco]].append(bloco)
+
+        # slot -> valores da variável nos blocos dominadores; sem valor, é
+        # o zero com que o .bss começa
+        pilhas = {}
+        substituto = {}
+
+        def corrente(slot):
+            pilha = pilhas.get(slot)
+            return pilha[-1] if pilha else 0
+
+        # um item da pilha é um bloco a renomear ou, depois dos filhos dele,
+        # a lista das variáveis que ele empilhou
+        trabalho = [ordem[0]]
+        while trabalho:
+            item = trabalho.pop()
+            if type(item) is list:
+                for slot in item:
+                    pilhas[slot].pop()
+                continue
+
+            bloco = item
+            empilhados = []
+            novas = list(fis[bloco])
+            for fi in fis[bloco]:
+                pilhas.setdefault(slot_fi[fi], []).append(fi.destino)
+                empilhados.append(slot_fi[fi])
+
+            for ins in bloco.instrucoes:
+                if ins.op == CARREGA:
+                    substituto[ins.destino] = corrente(ins.slot)
+                    self.promovidas += 1
+                elif ins.op == GUARDA:
+                    valor = substituto.get(ins.args[0], ins.args[0])
+                    pilhas.setdefault(ins.slot, []).append(valor)
+                    empilhados.append(ins.slot)
+                    self.promovidas += 1
+                else:
+                    if substituto:
+                        ins.args = tuple(substituto.get(arg, arg) for arg in ins.args)
+                    novas.append(ins)
+            bloco.instrucoes = novas
+
+            for sucessor in bloco.sucessores():
+                for fi in fis[sucessor]:
+                    fi.args[fi.alvos.index(bloco)] = corrente(slot_fi[fi])
+
+            trabalho.append(empilhados)
+            trabalho.extend(reversed(filhos[bloco]))
+
+        for lista in fis.values():
+            for fi in lista:
+                fi.args = tuple(fi.args)
+
+    # PROPAGAÇÃO
+    def propagar(self, programa):
+        """Cópias, fi de um valor só, constantes e desvios constantes.
+
+        Os blocos são percorridos em pós-ordem reversa, então um valor é
+        resolvido antes dos usos (menos os que voltam pelos laços). Um
+        desvia com condição constante vira salta na hora, e a aresta que
+        ficou sem uso já não conta nos fi do bloco de destino: uma cadeia
+        de if com condições constantes cai numa passada só. Repete até
+        nada mudar (um valor resolvido pode chegar a um fi pelo laço).
+        """
+        entrada = programa.blocos[0]
+        substituto = {}
+
+        def resolver(arg):
+            while arg in substituto:
+                arg = substituto[arg]
+            return arg
+
+        desvios = self.desvios
+        mudou = True
+        while mudou:
+            mudou = False
+            # aresta pred -> bloco conta se pred ainda não foi visto (volta
+            # de laço) ou se foi alcançado e ainda salta para bloco
+            vistos = set()
+            alcancados = {entrada}
+
+            for bloco in pos_ordem_reversa(entrada):
+                vistos.add(bloco)
+                if bloco not in alcancados:
+                    continue
+
+                novas = []
+                for ins in bloco.instrucoes:
+                    for arg in ins.args:
+                        if arg in substituto:
+                            ins.args = tuple(resolver(arg) for arg in ins.args)
+                            break
+                    op = ins.op
+
+                    if op == COPIA:
+                        substituto[ins.destino] = ins.args[0]
+                        self.propagadas += 1
+                        mudou = True
+                        continue
+
+                    if op == FI:
+                        valores = {arg for pred, arg in zip(ins.alvos, ins.args)
+                                   if pred not in vistos or (pred in alcancados and bloco in pred.sucessores())}
+                        valores.discard(ins.destino)
+                        if len(valores) == 1:
+                            substituto[ins.destino] = valores.pop()
+                            self.propagadas += 1
+                            mudou = True
+                            continue
+
+                    elif op in DOBRAS and type(ins.args[0]) is not Temp and type(ins.args[1]) is not Temp:
+                        valor = dobrar(op, *ins.args)
+                        if valor is not None:
+                            substituto[ins.destino] = valor
+                            self.dobradas += 1
+                            mudou = True
+                            continue
+
+                    elif op == DESVIA and type(ins.args[0]) is not Temp:
+                        verdadeiro, falso = ins.alvos
+                        ins = Instrucao(SALTA, alvos=(verdadeiro if ins.args[0] != 0 else falso,))
+                        self.desvios += 1
+                        mudou = True
+
+                    novas.append(ins)
+                bloco.instrucoes = novas
+                alcancados.update(bloco.sucessores())
+
+        if self.desvios != desvios:
+            self.remover_inalcancaveis(programa)
+
+    # CÓDIGO MORTO
+    def eliminar_mortas(self, programa):
+        definicao = {}
+        vivas = set()
+        trabalho = []
+        for bloco in programa.blocos:
+            for ins in bloco.instrucoes:
+                if ins.destino is not None:
+                    definicao[ins.destino] = ins
+                if tem_efeito(ins):
+                    vivas.add(ins)
+                    trabalho.append(ins)
+
+        # vivas: as com efeito e as que definem algo lido por uma viva
+        while trabalho:
+            for arg in trabalho.pop().args:
+                ins = definicao.get(arg) if type(arg) is Temp else None
+                if ins is not None and ins not in vivas:
+                    vivas.add(ins)
+                    trabalho.append(ins)
+
+        for bloco in programa.blocos:
+            antes = len(bloco.instrucoes)
+            bloco.instrucoes = [ins for ins in bloco.instrucoes if ins in vivas]
+            self.mortas += antes - len(bloco.instrucoes)
+
+    def juntar_blocos(self, programa):
+        """A salta para B e B só tem A como predecessor: B entra no fim de A.
+
+        O bloco que absorve vai para o lugar do último absorvido (o retorna
+        continua no fim da ordem de emissão), menos a entrada, que fica no
+        começo. Menos blocos também são menos Temps vivos entre blocos.
+        """
+        entrada = programa.blocos[0]
+        preds = predecessores(programa)
+        absorvidos = set()
+        lugar = {}  # bloco que absorveu -> bloco cujo lugar ele ocupa
+
+        for bloco in programa.blocos:
+            if bloco in absorvidos:
+                continue
+            while True:
+                terminador = bloco.terminador
+                if terminador.op != SALTA:
+                    break
+                seguinte = terminador.alvos[0]
+                if (seguinte is bloco or seguinte is entrada or len(preds[seguinte]) != 1
+                        or seguinte.instrucoes[0].op == FI):
+                    break
+
+                bloco.instrucoes[-1:] = seguinte.instrucoes
+                absorvidos.add(seguinte)
+                lugar[bloco] = lugar.pop(seguinte, seguinte)
+
+                # os sucessores de seguinte passam a vir de bloco
+                for sucessor in bloco.sucessores():
+                    preds[sucessor] = [bloco if pred is seguinte else pred for pred in preds[sucessor]]
+                    for ins in sucessor.instrucoes:
+                        if ins.op != FI:
+                            break
+                        ins.alvos = tuple(bloco if pred is seguinte else pred for pred in ins.alvos)
+
+        lugar.pop(entrada, None)
+        ocupa = {seguinte: bloco for bloco, seguinte in lugar.items()}
+        blocos = []
+        for bloco in programa.blocos:
+            if bloco in ocupa:
+                blocos.append(ocupa[bloco])
+            elif bloco not in absorvidos and bloco not in lugar:
+                blocos.append(bloco)
+        programa.blocos = blocos
+
+    # SAÍDA DA FORMA SSA
+    def sair(self, programa):
+        blocos = []
+        for bloco in programa.blocos:
+            fis = []
+            for ins in bloco.instrucoes:
+                if ins.op != FI:
+                    break
+                fis.append(ins)
+
+            if fis:
+                # todos os fi de um bloco têm os predecessores na mesma ordem
+                for k, pred in enumerate(fis[0].alvos):
+                    if len(pred.sucessores()) > 1:
+                        # aresta crítica: as cópias vão num bloco novo no meio dela
+                        meio = programa.novo_bloco()
+                        meio.instrucoes.append(Instrucao(SALTA, alvos=(bloco,)))
+                        terminador = pred.terminador
+                        terminador.alvos = tuple(meio if alvo is bloco else alvo for alvo in terminador.alvos)
+                        blocos.append(meio)
+                        pred = meio
+                    self.copias_paralelas(programa, pred, [(fi.destino, fi.args[k]) for fi in fis])
+                del bloco.instrucoes[:len(fis)]
+
+            blocos.append(bloco)
+        programa.blocos = blocos
+
+    def copias_paralelas(self, programa, bloco, copias):
+        """Cópias destino = origem no fim do bloco, com o efeito de todas lidas antes de qualquer escrita."""
+        pendentes = [(destino, origem) for destino, origem in copias if origem is not destino]
+        novas = []
+
+        while pendentes:
+            lidos = {origem for _, origem in pendentes}
+            for copia in pendentes:
+                if copia[0] not in lidos:
+                    # ninguém mais lê este destino: pode escrever
+                    novas.append(Instrucao(COPIA, copia[0], (copia[1],)))
+                    pendentes.remove(copia)
+                    break
+            else:
+                # ciclo (troca de valores entre fi): o valor antigo de um
+                # destino vai para um Temp novo, e quem o lia passa a ler dali
+                destino = pendentes[0][0]
+                temp = programa.novo_temp()
+                novas.append(Instrucao(COPIA, temp, (destino,)))
+                pendentes = [(d, temp if origem is destino else origem) for d, origem in pendentes]
+
+        bloco.instrucoes[-1:-1] = novas
@@ -1,60 +1,197 @@
-from Syntactic import (
-    Const, Var, OpBin,
-    Decl, Programa,
-    CmdAtrib, CmdIf, CmdWhile
-)
+from Visitor import Visitante
+from Syntactic import OpBin
+from Arena import VAR, OPBIN, ATRIB, IF, WHILE
+
+class TabelaSimbolos:
+    """Variáveis declaradas, cada uma com um slot inteiro fixo.
+
+    O slot é a posição da variável na área de variáveis do programa (o
+    Generator usa variaveis+8*slot); os nomes ficam em nomes[slot].
+    """
 
-class AnalisadorSemantico:
     def __init__(self):
-        self.tabela_simbolos = set()
+        self.slots = {}
+        self.nomes = []
+
+    def __contains__(self, nome):
+        return nome in self.slots
+
+    def __len__(self):
+        return len(self.nomes)
+
+    def declarar(self, nome):
+        """Slot da variável; uma redeclaração reaproveita o slot."""
+        slot = self.slots.get(nome)
+        if slot is None:
+            slot = self.slots[nome] = len(self.nomes)
+            self.nomes.append(nome)
+        return slot
+
+
+class ErroSemantico(Exception):
+    """Todos os erros semânticos encontrados, na ordem do fonte (um por linha)."""
+
+    def __init__(self, erros):
+        self.erros = erros
+        super().__init__("\n".join(erros))
+
+
+class AnalisadorSemantico(Visitante):
+    """Verifica o uso de variáveis sem recursão, com pilhas explícitas.
+
+    Cada nó é visitado uma vez e os erros não interrompem a análise: ficam
+    em self.erros e relatar() os levanta juntos num ErroSemantico.
+    """
+
+    def __init__(self, onde=None):
+        super().__init__()
+        self.tabela_simbolos = TabelaSimbolos()
+        # onde(posicao) -> "linha L, coluna C"; normalmente Lexer.onde
+        self.onde = onde
+        self.erros = []
+        self.posicoes = None
+
+    def erro_nao_declarada(self, nome, posicao):
+        mensagem = f"Erro semântico: variável '{nome}' não foi declarada"
+        if self.onde is not None and posicao is not None:
+            mensagem += f" ({self.onde(posicao)})"
+        self.erros.append(mensagem)
+
+    def relatar(self):
+        if self.erros:
+            raise ErroSemantico(self.erros)
 
     # PROGRAMA
     def verificar(self, programa):
         # declarações
         for decl in programa.declaracoes:
-            self.verificar_expressao(decl.expressao)
-            self.tabela_simbolos.add(decl.nome)
+            self.verificar_decl(decl)
 
         # comandos
         for cmd in programa.comandos:
             self.verificar_cmd(cmd)
 
         # return
-        self.verificar_expressao(programa.retorno)
+        self.verificar_expressao(programa.retorno, programa.posicoes_vars)
+
+        self.relatar()
+
+    # DECLARAÇÃO
+    def verificar_decl(self, decl):
+        self.verificar_expressao(decl.expressao, decl.posicoes_vars)
+        decl.slot = self.tabela_simbolos.declarar(decl.nome)
 
     # COMANDOS
     def verificar_cmd(self, cmd):
-        if isinstance(cmd, CmdAtrib):
-            # variável deve existir
-            if cmd.nome not in self.tabela_simbolos:
-                raise Exception(f"Erro semântico: variável '{cmd.nome}' não foi declarada")
+        # os blocos entram na pilha de trás para frente, para os erros
+        # saírem na ordem do fonte
+        despacho = self.despacho
+        pilha = [cmd]
 
-            self.verificar_expressao(cmd.expressao)
+        while pilha:
+            cmd = pilha.pop()
+            despacho[type(cmd)](cmd, pilha)
 
-        elif isinstance(cmd, CmdIf):
-            self.verificar_expressao(cmd.cond)
+    def visita_CmdAtrib(self, cmd, pilha):
+        # variável deve existir
+        cmd.slot = self.tabela_simbolos.slots.get(cmd.nome)
+        if cmd.slot is None:
+            self.erro_nao_declarada(cmd.nome, cmd.posicao)
 
-            for c in cmd.then_cmds:
-                self.verificar_cmd(c)
+        self.verificar_expressao(cmd.expressao, cmd.posicoes_vars)
 
-            for c in cmd.else_cmds:
-                self.verificar_cmd(c)
+    def visita_CmdIf(self, cmd, pilha):
+        self.verificar_expressao(cmd.cond, cmd.posicoes_vars)
+        pilha.extend(reversed(cmd.else_cmds))
+        pilha.extend(reversed(cmd.then_cmds))
 
-        elif isinstance(cmd, CmdWhile):
-            self.verificar_expressao(cmd.cond)
+    def visita_CmdWhile(self, cmd, pilha):
+        self.verificar_expressao(cmd.cond, cmd.posicoes_vars)
+        pilha.extend(reversed(cmd.corpo))
 
-            for c in cmd.corpo:
-                self.verificar_cmd(c)
+    def visita_CmdReturn(self, cmd, pilha):
+        self.verificar_expressao(cmd.expressao, cmd.posicoes_vars)
 
     # EXPRESSÕES
-    def verificar_expressao(self, node):
-        if isinstance(node, Const):
-            return
+    def verificar_expressao(self, node, posicoes=None):
+        # posicoes: posições das Vars na ordem do fonte, quando elas não as
+        # guardam (FabricaHashConsing); as Vars saem da pilha nessa ordem
+        self.posicoes = None if posicoes is None else iter(posicoes)
+        despacho = self.despacho
+        pilha = [node]
+
+        while pilha:
+            node = pilha.pop()
+            metodo = despacho[type(node)]
+            if metodo is not None:
+                metodo(node, pilha)
+
+    # constantes não têm o que verificar
+    visita_Const = None
+
+    def visita_Var(self, node, pilha):
+        posicao = node.posicao if self.posicoes is None else next(self.posicoes)
+        node.slot = self.tabela_simbolos.slots.get(node.nome)
+        if node.slot is None:
+            self.erro_nao_declarada(node.nome, posicao)
+
+    def visita_OpBin(self, node, pilha):
+        # desce pela esquerda aqui mesmo, empilhando os operandos direitos;
+        # o esquerdo sai primeiro
+        while type(node) is OpBin:
+            pilha.append(node.opDir)
+            node = node.opEsq
+        pilha.append(node)
+
+    # ARENA (Arena.py): mesma verificação, percorrendo as colunas. A arena
+    # já guarda um índice por nome (arena.nomes), que o Generator usa como slot
+    def verificar_arena(self, arena, programa):
+        for decl in arena.lista(arena.esq[programa]):
+            self.verificar_expressao_arena(arena, arena.esq[decl])
+            self.tabela_simbolos.declarar(arena.nomes[arena.valor[decl]])
+
+        for cmd in arena.lista(arena.dir[programa]):
+            self.verificar_cmd_arena(arena, cmd)
+
+        self.verificar_expressao_arena(arena, arena.valor[programa])
+
+        self.relatar()
+
+    def verificar_cmd_arena(self, arena, cmd):
+        tipo = arena.tipo
+        pilha = [cmd]
+
+        while pilha:
+            cmd = pilha.pop()
+
+            if tipo[cmd] == ATRIB:
+                nome = arena.nomes[arena.valor[cmd]]
+                if nome not in self.tabela_simbolos:
+                    self.erro_nao_declarada(nome, arena.posicao[cmd])
+
+                self.verificar_expressao_arena(arena, arena.esq[cmd])
+
+            elif tipo[cmd] == IF:
+                self.verificar_expressao_arena(arena, arena.esq[cmd])
+                pilha.extend(reversed(list(arena.lista(arena.valor[cmd]))))
+                pilha.extend(reversed(list(arena.lista(arena.dir[cmd]))))
+
+            elif tipo[cmd] == WHILE:
+                self.verificar_expressao_arena(arena, arena.esq[cmd])
+                pilha.extend(reversed(list(arena.lista(arena.dir[cmd]))))
+
+    def verificar_expressao_arena(self, arena, node):
+        tipo, esq, dir = arena.tipo, arena.esq, arena.dir
+        pilha = [node]
+
+        while pilha:
+            node = pilha.pop()
 
-        elif isinstance(node, Var):
-            if node.nome not in self.tabela_simbolos:
-                raise Exception(f"Erro semântico: variável '{node.nome}' não foi declarada")
+            if tipo[node] == VAR:
+                nome = arena.nomes[arena.valor[node]]
+                if nome not in self.tabela_simbolos:
+                    self.erro_nao_declarada(nome, arena.posicao[node])
 
-        elif isinstance(node, OpBin):
-            self.verificar_expressao(node.opEsq)
-            self.verificar_expressao(node.opDir)
\ No newline at end of file
+            elif tipo[node] == OPBIN:
+                pilha.append(dir[node])
+                pilha.append(esq[node])
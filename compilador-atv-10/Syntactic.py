@@ -1,3 +1,19 @@
+from Token import (
+    NOMES_TIPOS, EOF, LITERAL_INTEIRO, IDENTIFICADOR,
+    IF, ELSE, WHILE, RETURN,
+    ABRE_CHAVE, FECHA_CHAVE, ABRE_PARENTESE, FECHA_PARENTESE, PONTO_VIRGULA,
+    IGUAL, OP_COMPARACAO, OPERADOR,
+)
+
+# Inteiros da máquina: 64 bits com sinal, em complemento de dois
+INT_MIN = -(1 << 63)
+
+
+def inteiro_64(valor):
+    """valor reduzido a 64 bits com sinal, como fica em %rax."""
+    valor &= (1 << 64) - 1
+    return valor - (1 << 64) if valor >= 1 << 63 else valor
+
 
 # NÓS DA AST
 
@@ -6,11 +22,14 @@ class Exp:
 
 class Const(Exp):
     def __init__(self, valor):
-        self.valor = int(valor)
+        # um literal maior que 64 bits fica com o valor que teria em %rax
+        self.valor = inteiro_64(int(valor))
 
 class Var(Exp):
-    def __init__(self, nome):
+    def __init__(self, nome, posicao=None):
         self.nome = nome
+        self.posicao = posicao
+        self.slot = None  # preenchido pela análise semântica (TabelaSimbolos)
 
 class OpBin(Exp):
     def __init__(self, operador, opEsq, opDir):
@@ -21,19 +40,27 @@ class OpBin(Exp):
 
 # DECLARAÇÃO
 class Decl:
+    # posições dos usos de variáveis na expressão, na ordem do fonte; só a
+    # FabricaHashConsing preenche (as Vars dela não guardam posição)
+    posicoes_vars = None
+
     def __init__(self, nome, expressao):
         self.nome = nome
         self.expressao = expressao
+        self.slot = None
 
 
 # COMANDOS
 class Cmd:
-    pass
+    # como em Decl, para a expressão do comando (a condição no if e no while)
+    posicoes_vars = None
 
 class CmdAtrib(Cmd):
-    def __init__(self, nome, expressao):
+    def __init__(self, nome, expressao, posicao=None):
         self.nome = nome
         self.expressao = expressao
+        self.posicao = posicao
+        self.slot = None
 
 class CmdIf(Cmd):
     def __init__(self, cond, then_cmds, else_cmds):
@@ -53,156 +80,551 @@ class CmdReturn(Cmd):
 
 # PROGRAMA
 class Programa:
+    # como em Decl, para a expressão do return
+    posicoes_vars = None
+
     def __init__(self, declaracoes, comandos, retorno):
         self.declaracoes = declaracoes
         self.comandos = comandos
         self.retorno = retorno
 
 
+# ERROS
+class ErroSintatico(Exception):
+    """Erro sintático com a posição (e linha/coluna) do token onde foi detectado."""
+
+    def __init__(self, mensagem, posicao=None, linha=None, coluna=None):
+        self.mensagem = mensagem
+        self.posicao = posicao
+        self.linha = linha
+        self.coluna = coluna
+
+        texto = f"Erro sintático: {mensagem}"
+        if linha is not None:
+            texto += f" (linha {linha}, coluna {coluna})"
+        super().__init__(texto)
+
+
+# OPERADORES BINÁRIOS
+# lexema -> (precedência, associatividade, construtor do nó). Quanto maior
+# a precedência, mais forte o operador liga; 'nenhuma' impede encadear o
+# operador com outro de mesma precedência (a < b < c é erro). Um operador
+# novo é uma linha aqui (mais o token em Token.py e as instruções em
+# Generator.EMISSORES).
+OPERADORES_BINARIOS = {
+    '==': (1, 'nenhuma', OpBin),
+    '<': (1, 'nenhuma', OpBin),
+    '>': (1, 'nenhuma', OpBin),
+    '+': (2, 'esquerda', OpBin),
+    '-': (2, 'esquerda', OpBin),
+    '*': (3, 'esquerda', OpBin),
+    '/': (3, 'esquerda', OpBin),
+}
+
+# Forma usada pelo laço de Pratt, calculada uma vez a partir da tabela acima:
+# lexema -> (precedência, precedência mínima do operando direito, limite
+# do nível depois do operador, construtor)
+POTENCIAS = {
+    lexema: (
+        precedencia,
+        precedencia if associatividade == 'direita' else precedencia + 1,
+        precedencia + 1 if associatividade == 'esquerda' else precedencia,
+        construtor,
+    )
+    for lexema, (precedencia, associatividade, construtor) in OPERADORES_BINARIOS.items()
+}
+SEM_LIMITE = float('inf')
+
+
+class NosObjeto:
+    """Fábrica padrão do Parser: monta a AST com as classes acima."""
+    Const = Const
+    Var = Var
+    OpBin = OpBin
+    Decl = Decl
+    CmdAtrib = CmdAtrib
+    CmdIf = CmdIf
+    CmdWhile = CmdWhile
+    CmdReturn = CmdReturn
+    Programa = Programa
+
+
+class FabricaHashConsing(NosObjeto):
+    """Fábrica que constrói uma vez só cada subexpressão estruturalmente igual.
+
+    Const, Var e OpBin são puros, então nós iguais (mesmo valor, mesmo
+    nome, ou mesmo operador com os mesmos filhos já compartilhados) viram
+    o mesmo objeto e a AST passa a ser um DAG. Comandos e declarações
+    continuam sendo criados um a um.
+
+    Nós compartilhados não guardam posição: as Vars são criadas sem ela e
+    cada uso fica em posicoes_vars do dono da expressão (Decl, comando ou
+    Programa), na ordem do fonte. É a mesma ordem em que o
+    AnalisadorSemantico visita as Vars, então os erros saem em cada uso,
+    iguais aos da AST comum.
+
+    contagem[no] diz quantas vezes o parser pediu aquele nó, ou seja, em
+    quantos lugares do programa a subexpressão aparece.
+    """
+
+    def __init__(self):
+        self.nos = {}
+        self.contagem = {}
+        self.pedidos = 0
+        # nó -> quantos usos de variáveis a subexpressão tem
+        self.usos = {}
+        # posições das Vars já lidas cujo dono ainda não foi criado. As
+        # expressões de um comando terminam antes dele (e depois das dos
+        # comandos internos), então o dono leva as últimas
+        self.posicoes = []
+
+    def compartilhar(self, chave, classe, *args):
+        self.pedidos += 1
+        no = self.nos.get(chave)
+        if no is None:
+            no = self.nos[chave] = classe(*args)
+            self.contagem[no] = 1
+        else:
+            self.contagem[no] += 1
+        return no
+
+    def dono(self, no, expressao):
+        corte = len(self.posicoes) - (self.usos[expressao] if expressao is not None else 0)
+        no.posicoes_vars = self.posicoes[corte:]
+        del self.posicoes[corte:]
+        return no
+
+    # EXPRESSÕES
+    def Const(self, valor):
+        valor = inteiro_64(int(valor))
+        no = self.compartilhar(('const', valor), Const, valor)
+        self.usos[no] = 0
+        return no
+
+    def Var(self, nome, posicao=None):
+        self.posicoes.append(posicao)
+        no = self.compartilhar(('var', nome), Var, nome)
+        self.usos[no] = 1
+        return no
+
+    def OpBin(self, operador, opEsq, opDir):
+        # os filhos já são únicos, então a identidade deles basta na chave
+        no = self.compartilhar((operador, id(opEsq), id(opDir)), OpBin, operador, opEsq, opDir)
+        self.usos[no] = self.usos[opEsq] + self.usos[opDir]
+        return no
+
+    # DONOS DAS EXPRESSÕES
+    def Decl(self, nome, expressao):
+        return self.dono(Decl(nome, expressao), expressao)
+
+    def CmdAtrib(self, nome, expressao, posicao=None):
+        return self.dono(CmdAtrib(nome, expressao, posicao), expressao)
+
+    def CmdIf(self, cond, then_cmds, else_cmds):
+        return self.dono(CmdIf(cond, then_cmds, else_cmds), cond)
+
+    def CmdWhile(self, cond, corpo):
+        return self.dono(CmdWhile(cond, corpo), cond)
+
+    def CmdReturn(self, expressao):
+        return self.dono(CmdReturn(expressao), expressao)
+
+    def Programa(self, declaracoes, comandos, retorno):
+        # retorno None: programa parcial da recuperação de erros
+        return self.dono(Programa(declaracoes, comandos, retorno), retorno)
+
+    def criados(self):
+        """Quantidade de nós de expressão distintos."""
+        return len(self.nos)
+
+    def repetidos(self):
+        """Subexpressões OpBin que aparecem mais de uma vez, da mais repetida para a menos."""
+        pares = [(no, n) for no, n in self.contagem.items() if n > 1 and isinstance(no, OpBin)]
+        pares.sort(key=lambda par: par[1], reverse=True)
+        return pares
+
+
 # PARSER
 class Parser:
-    def __init__(self, lexer):
+    def __init__(self, lexer, iterativo=False, arena=None, fabrica=None):
         self.lexer = lexer
-        self.token_atual = self.lexer.proximo_token()
+        self.tokens = lexer.fluxo
+        self.token_atual = self.tokens.consumir()
+
+        # erros registrados por parse_recuperando
+        self.erros = []
+
+        # fábrica dos nós: as classes da AST (NosObjeto), uma ArenaAST
+        # (Arena.py, devolve índices de nós) ou outra fábrica com os mesmos
+        # métodos, como a FabricaHashConsing
+        if arena is not None:
+            fabrica = arena
+        if fabrica is None:
+            self.ast = NosObjeto
+            self.potencias = POTENCIAS
+        else:
+            self.ast = fabrica
+            self.potencias = {
+                lexema: linha[:3] + (getattr(fabrica, linha[3].__name__),)
+                for lexema, linha in POTENCIAS.items()
+            }
+
+        # modo iterativo: expressões analisadas com pilhas explícitas, sem
+        # limite de profundidade para parênteses muito aninhados
+        if iterativo:
+            self.analisaExp = self.analisaExpIterativa
+
+    def olhar(self, k=1):
+        """Retorna o token k posições depois do atual, sem consumir."""
+        return self.tokens.olhar(k - 1)
 
     def comer(self, tipo):
         if self.token_atual.tipo == tipo:
             tok = self.token_atual
-            self.token_atual = self.lexer.proximo_token()
+            self.token_atual = self.tokens.consumir()
             return tok
         else:
-            raise Exception(f"Erro sintático: esperado {tipo}, recebido {self.token_atual.tipo}")
+            raise self.erro(f"esperado {NOMES_TIPOS[tipo]}, recebido {NOMES_TIPOS[self.token_atual.tipo]}")
+
+    def onde(self):
+        """Linha e coluna do token atual, para as mensagens de erro."""
+        return self.lexer.onde(self.token_atual.posicao)
+
+    def erro(self, mensagem):
+        """ErroSintatico apontando para o token atual."""
+        posicao = self.token_atual.posicao
+        linha, coluna = self.lexer.linha_coluna(posicao)
+        return ErroSintatico(mensagem, posicao, linha, coluna)
 
     # EXPRESSÕES
     def analisaPrim(self):
         tok = self.token_atual
 
-        if tok.tipo == 'LITERAL_INTEIRO':
-            self.comer('LITERAL_INTEIRO')
-            return Const(tok.lexema)
+        if tok.tipo == LITERAL_INTEIRO:
+            self.comer(LITERAL_INTEIRO)
+            return self.ast.Const(tok.lexema)
 
-        elif tok.tipo == 'IDENTIFICADOR':
-            self.comer('IDENTIFICADOR')
-            return Var(tok.lexema)
+        elif tok.tipo == IDENTIFICADOR:
+            self.comer(IDENTIFICADOR)
+            return self.ast.Var(tok.lexema, tok.posicao)
 
-        elif tok.tipo == 'ABRE_PARENTESE':
-            self.comer('ABRE_PARENTESE')
+        elif tok.tipo == ABRE_PARENTESE:
+            self.comer(ABRE_PARENTESE)
             node = self.analisaExp()
-            self.comer('FECHA_PARENTESE')
+            self.comer(FECHA_PARENTESE)
             return node
 
         else:
-            raise Exception("Erro sintático")
-
-    def analisaExpM(self):
-        node = self.analisaPrim()
-
-        while self.token_atual.tipo == 'OPERADOR' and self.token_atual.lexema in ('*', '/'):
-            op = self.token_atual.lexema
-            self.comer('OPERADOR')
-            node = OpBin(op, node, self.analisaPrim())
+            raise self.erro(f"esperado número, identificador ou '(', recebido {NOMES_TIPOS[tok.tipo]}")
 
-        return node
+    def analisaExp(self, precedencia_minima=0):
+        """Analisa uma expressão pelo método de Pratt, guiado por OPERADORES_BINARIOS.
 
-    def analisaExpA(self):
-        node = self.analisaExpM()
+        Só operadores com precedência >= precedencia_minima entram nesta
+        chamada; o operando direito é analisado com a precedência seguinte
+        (ou a mesma, se o operador associa à direita).
+        """
+        # folhas (o caso mais comum) sem passar por analisaPrim
+        tok = self.token_atual
+        if tok.tipo == LITERAL_INTEIRO:
+            esquerdo = self.ast.Const(tok.lexema)
+            tok = self.token_atual = self.tokens.consumir()
+        elif tok.tipo == IDENTIFICADOR:
+            esquerdo = self.ast.Var(tok.lexema, tok.posicao)
+            tok = self.token_atual = self.tokens.consumir()
+        else:
+            esquerdo = self.analisaPrim()
+            tok = self.token_atual
 
-        while self.token_atual.tipo == 'OPERADOR' and self.token_atual.lexema in ('+', '-'):
-            op = self.token_atual.lexema
-            self.comer('OPERADOR')
-            node = OpBin(op, node, self.analisaExpM())
+        # operadores com precedência >= limite já foram recusados pelo nível de
+        # dentro (ex.: um segundo operador não associativo), então encerram este
+        limite = SEM_LIMITE
+        potencias = self.potencias
 
-        return node
+        while True:
+            linha = potencias.get(tok.lexema)
+            if linha is None or linha[0] < precedencia_minima or linha[0] >= limite:
+                return esquerdo
 
-    #  NOVO: comparação
-    def analisaExp(self):
-        node = self.analisaExpA()
+            self.token_atual = self.tokens.consumir()
+            esquerdo = linha[3](tok.lexema, esquerdo, self.analisaExp(linha[1]))
+            limite = linha[2]
+            tok = self.token_atual
 
-        if self.token_atual.tipo == 'OP_COMPARACAO':
-            op = self.token_atual.lexema
-            self.comer('OP_COMPARACAO')
-            direito = self.analisaExpA()
-            node = OpBin(op, node, direito)
+    def analisaExpIterativa(self):
+        """Mesma gramática de analisaExp, com pilhas de operandos e operadores.
+
+        Cada '(' empilha uma marca (None) no lugar da chamada recursiva, e
+        os operadores são reduzidos pela mesma tabela do analisaExp
+        (POTENCIAS, shunting-yard), inclusive o limite que encerra o nível
+        depois de um operador não associativo. A árvore e as mensagens de
+        erro são as mesmas.
+        """
+        operandos = []
+        operadores = []  # linha de POTENCIAS + lexema; None marca um '('
+        niveis = 0
+        consumir = self.tokens.consumir
+        potencias = self.potencias
+        tok = self.token_atual
 
-        return node
+        while True:
+            # operando: '(' abrem níveis, depois um número ou variável
+            tipo = tok.tipo
+            while tipo == ABRE_PARENTESE:
+                operadores.append(None)
+                niveis += 1
+                tok = consumir()
+                tipo = tok.tipo
+
+            if tipo == LITERAL_INTEIRO:
+                operandos.append(self.ast.Const(tok.lexema))
+            elif tipo == IDENTIFICADOR:
+                operandos.append(self.ast.Var(tok.lexema, tok.posicao))
+            else:
+                self.token_atual = tok
+                raise self.erro(f"esperado número, identificador ou '(', recebido {NOMES_TIPOS[tipo]}")
+            tok = consumir()
+
+            # operador: ')' fecham níveis até aparecer um operador que continue a expressão
+            while True:
+                linha = potencias.get(tok.lexema)
+                # reduz os operadores cujo operando direito não aceita este;
+                # se o nível recusa o operador (mesmo limite do analisaExp),
+                # a expressão acaba aqui
+                while linha is not None and operadores and operadores[-1] is not None:
+                    topo = operadores[-1]
+                    if linha[0] >= topo[1]:
+                        break
+                    operadores.pop()
+                    direito = operandos.pop()
+                    operandos[-1] = topo[3](topo[4], operandos[-1], direito)
+                    if linha[0] >= topo[2]:
+                        linha = None
+                if linha is not None:
+                    break
+
+                self.token_atual = tok
+                if niveis == 0:
+                    while operadores:
+                        topo = operadores.pop()
+                        direito = operandos.pop()
+                        operandos[-1] = topo[3](topo[4], operandos[-1], direito)
+                    return operandos[0]
+
+                self.comer(FECHA_PARENTESE)
+                tok = self.token_atual
+                topo = operadores.pop()
+                while topo is not None:
+                    direito = operandos.pop()
+                    operandos[-1] = topo[3](topo[4], operandos[-1], direito)
+                    topo = operadores.pop()
+                niveis -= 1
+
+            operadores.append(linha + (tok.lexema,))
+            tok = consumir()
 
     # DECLARAÇÃO
     def analisaDecl(self):
-        nome = self.comer('IDENTIFICADOR').lexema
-        self.comer('IGUAL')
+        nome = self.comer(IDENTIFICADOR).lexema
+        self.comer(IGUAL)
         exp = self.analisaExp()
-        self.comer('PONTO_VIRGULA')
-        return Decl(nome, exp)
+        self.comer(PONTO_VIRGULA)
+        return self.ast.Decl(nome, exp)
 
     # COMANDOS
     def analisaCmd(self):
-        if self.token_atual.tipo == 'IDENTIFICADOR':
-            nome = self.comer('IDENTIFICADOR').lexema
-            self.comer('IGUAL')
+        if self.token_atual.tipo == IDENTIFICADOR:
+            tok = self.comer(IDENTIFICADOR)
+            self.comer(IGUAL)
             exp = self.analisaExp()
-            self.comer('PONTO_VIRGULA')
-            return CmdAtrib(nome, exp)
+            self.comer(PONTO_VIRGULA)
+            return self.ast.CmdAtrib(tok.lexema, exp, tok.posicao)
 
-        elif self.token_atual.tipo == 'IF':
+        elif self.token_atual.tipo == IF:
             return self.analisaIf()
 
-        elif self.token_atual.tipo == 'WHILE':
+        elif self.token_atual.tipo == WHILE:
             return self.analisaWhile()
 
         else:
-            raise Exception("Erro sintático")
+            raise self.erro(f"comando inesperado começando com {NOMES_TIPOS[self.token_atual.tipo]}")
 
     def analisaBloco(self):
-        self.comer('ABRE_CHAVE')
+        self.comer(ABRE_CHAVE)
         comandos = []
 
-        while self.token_atual.tipo not in ('FECHA_CHAVE', 'RETURN'):
-            comandos.append(self.analisaCmd())
+        while self.token_atual.tipo not in (FECHA_CHAVE, RETURN, EOF):
+            cmd = self.analisaCmd()
+            if cmd is not None:  # None: comando descartado na recuperação de erros
+                comandos.append(cmd)
 
         return comandos
 
     def analisaIf(self):
-        self.comer('IF')
+        self.comer(IF)
         cond = self.analisaExp()
 
         then_cmds = self.analisaBloco()
-        self.comer('FECHA_CHAVE')
+        self.comer(FECHA_CHAVE)
 
-        self.comer('ELSE')
+        self.comer(ELSE)
         else_cmds = self.analisaBloco()
-        self.comer('FECHA_CHAVE')
+        self.comer(FECHA_CHAVE)
 
-        return CmdIf(cond, then_cmds, else_cmds)
+        return self.ast.CmdIf(cond, then_cmds, else_cmds)
 
     def analisaWhile(self):
-        self.comer('WHILE')
+        self.comer(WHILE)
         cond = self.analisaExp()
 
         corpo = self.analisaBloco()
-        self.comer('FECHA_CHAVE')
+        self.comer(FECHA_CHAVE)
 
-        return CmdWhile(cond, corpo)
+        return self.ast.CmdWhile(cond, corpo)
 
     # PROGRAMA
     def parse(self):
         declaracoes = []
 
-        while self.token_atual.tipo == 'IDENTIFICADOR':
+        while self.token_atual.tipo == IDENTIFICADOR:
             declaracoes.append(self.analisaDecl())
 
-        self.comer('ABRE_CHAVE')
+        self.comer(ABRE_CHAVE)
 
         comandos = []
-        while self.token_atual.tipo != 'RETURN':
+        while self.token_atual.tipo != RETURN:
             comandos.append(self.analisaCmd())
 
-        self.comer('RETURN')
+        self.comer(RETURN)
         retorno = self.analisaExp()
-        self.comer('PONTO_VIRGULA')
+        self.comer(PONTO_VIRGULA)
+
+        self.comer(FECHA_CHAVE)
+
+        if self.token_atual.tipo != EOF:
+            raise self.erro("conteúdo extra depois do fim do programa")
+
+        return self.ast.Programa(declaracoes, comandos, retorno)
+
+    def parse_em_fluxo(self):
+        """Como parse, mas devolve o programa aos pedaços, à medida que é lido.
 
-        self.comer('FECHA_CHAVE')
+        Gera cada Decl, depois cada comando do bloco principal e por fim um
+        CmdReturn com a expressão do return. Quem consome pode verificar e
+        gerar código de um item antes de o próximo ser analisado, sem
+        guardar o programa inteiro (main.py --fluxo). Só para fábricas de
+        objetos (não para a ArenaAST).
+        """
+        while self.token_atual.tipo == IDENTIFICADOR:
+            yield self.analisaDecl()
 
-        if self.token_atual.tipo != 'EOF':
-            raise Exception("Erro: conteúdo extra")
+        self.comer(ABRE_CHAVE)
 
-        return Programa(declaracoes, comandos, retorno)
\ No newline at end of file
+        while self.token_atual.tipo != RETURN:
+            yield self.analisaCmd()
+
+        self.comer(RETURN)
+        retorno = self.analisaExp()
+        self.comer(PONTO_VIRGULA)
+
+        self.comer(FECHA_CHAVE)
+
+        if self.token_atual.tipo != EOF:
+            raise self.erro("conteúdo extra depois do fim do programa")
+
+        yield self.ast.CmdReturn(retorno)
+
+    # RECUPERAÇÃO DE ERROS
+    def parse_recuperando(self):
+        """Como parse, mas registra os erros sintáticos e continua a análise.
+
+        Um comando ou declaração com erro é descartado (ver sincronizar) e
+        a análise segue no próximo. Retorna (Programa parcial, erros), com
+        os erros (ErroSintatico) na ordem do fonte; o primeiro é o mesmo que
+        parse levantaria.
+        """
+        self.erros = []
+        self.analisaCmd = self.analisaCmdRecuperando
+
+        declaracoes = []
+        while self.token_atual.tipo == IDENTIFICADOR:
+            try:
+                declaracoes.append(self.analisaDecl())
+            except ErroSintatico as erro:
+                self.registrar(erro)
+
+        self.esperar(ABRE_CHAVE)
+
+        comandos = []
+        retorno = None
+        while self.token_atual.tipo != RETURN:
+            cmd = self.analisaCmd()
+            if cmd is not None:
+                comandos.append(cmd)
+            elif self.token_atual.tipo in (FECHA_CHAVE, EOF):
+                # bloco principal sem return: o erro já foi registrado
+                if self.token_atual.tipo == FECHA_CHAVE:
+                    self.comer(FECHA_CHAVE)
+                break
+        else:
+            self.comer(RETURN)
+            try:
+                retorno = self.analisaExp()
+                self.comer(PONTO_VIRGULA)
+            except ErroSintatico as erro:
+                self.registrar(erro)
+            self.esperar(FECHA_CHAVE)
+
+        if self.token_atual.tipo != EOF:
+            self.erros.append(self.erro("conteúdo extra depois do fim do programa"))
+
+        return self.ast.Programa(declaracoes, comandos, retorno), self.erros
+
+    def analisaCmdRecuperando(self):
+        """analisaCmd que, em caso de erro, registra, sincroniza e retorna None."""
+        try:
+            return Parser.analisaCmd(self)
+        except ErroSintatico as erro:
+            self.registrar(erro)
+            return None
+
+    def registrar(self, erro):
+        self.erros.append(erro)
+        self.sincronizar()
+
+    def esperar(self, tipo):
+        """Como comer, mas só registra o erro (sem consumir nada) se o token não for o esperado."""
+        try:
+            self.comer(tipo)
+        except ErroSintatico as erro:
+            self.erros.append(erro)
+
+    def sincronizar(self):
+        """Descarta tokens até o fim do comando com erro.
+
+        Para depois de um ';' ou antes de um '}' que feche o bloco onde o
+        erro aconteceu. Blocos abertos pelo próprio comando são pulados
+        inteiros, assim como um 'else' logo depois do bloco.
+        """
+        profundidade = 0
+
+        while self.token_atual.tipo != EOF:
+            tipo = self.token_atual.tipo
+
+            if tipo == PONTO_VIRGULA and profundidade == 0:
+                self.comer(PONTO_VIRGULA)
+                return
+
+            if tipo == FECHA_CHAVE:
+                if profundidade == 0:
+                    return
+                profundidade -= 1
+                self.comer(FECHA_CHAVE)
+                if profundidade == 0 and self.token_atual.tipo != ELSE:
+                    return
+                continue
+
+            if tipo == ABRE_CHAVE:
+                profundidade += 1
+
+            self.comer(tipo)
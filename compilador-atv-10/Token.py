@@ -1,7 +1,82 @@
+# TIPOS DE TOKEN
+# Cada tipo é um inteiro pequeno (comparação barata no parser);
+# NOMES_TIPOS traduz o código de volta para mensagens de erro e depuração.
+EOF = 0
+LITERAL_INTEIRO = 1
+IDENTIFICADOR = 2
+IF = 3
+ELSE = 4
+WHILE = 5
+RETURN = 6
+ABRE_CHAVE = 7
+FECHA_CHAVE = 8
+ABRE_PARENTESE = 9
+FECHA_PARENTESE = 10
+PONTO_VIRGULA = 11
+IGUAL = 12
+OP_COMPARACAO = 13
+OPERADOR = 14
+
+NOMES_TIPOS = (
+    'EOF',
+    'LITERAL_INTEIRO',
+    'IDENTIFICADOR',
+    'IF',
+    'ELSE',
+    'WHILE',
+    'RETURN',
+    'ABRE_CHAVE',
+    'FECHA_CHAVE',
+    'ABRE_PARENTESE',
+    'FECHA_PARENTESE',
+    'PONTO_VIRGULA',
+    'IGUAL',
+    'OP_COMPARACAO',
+    'OPERADOR',
+)
+
+# ESPECIFICAÇÃO DOS TOKENS FIXOS
+# Mesmo formato de PONTUACOES/OPERADORES do compilador EC1: todos os
+# motores do Lexer (a busca por símbolo do Lexer, as expressões regulares
+# do LexerRegex/LexerBytes/LexerParalelo e o autômato do LexerAFD) são
+# gerados a partir daqui, então um token novo só precisa de uma entrada
+# nestas tabelas (o tipo dele em NOMES_TIPOS, se for um tipo novo).
+PONTUACOES = {
+    "{": {"tipo": ABRE_CHAVE, "lexema": "{"},
+    "}": {"tipo": FECHA_CHAVE, "lexema": "}"},
+    "(": {"tipo": ABRE_PARENTESE, "lexema": "("},
+    ")": {"tipo": FECHA_PARENTESE, "lexema": ")"},
+    ";": {"tipo": PONTO_VIRGULA, "lexema": ";"},
+}
+
+OPERADORES = {
+    "==": {"tipo": OP_COMPARACAO, "lexema": "=="},
+    "<": {"tipo": OP_COMPARACAO, "lexema": "<"},
+    ">": {"tipo": OP_COMPARACAO, "lexema": ">"},
+    "=": {"tipo": IGUAL, "lexema": "="},
+    "+": {"tipo": OPERADOR, "lexema": "+"},
+    "-": {"tipo": OPERADOR, "lexema": "-"},
+    "*": {"tipo": OPERADOR, "lexema": "*"},
+    "/": {"tipo": OPERADOR, "lexema": "/"},
+}
+
+PALAVRAS_CHAVE = {
+    "if": IF,
+    "else": ELSE,
+    "while": WHILE,
+    "return": RETURN,
+}
+
+
 class Token:
-    def __init__(self, tipo, lexema):
+    # posicao: onde o token começa no fonte; o Lexer que o criou
+    # converte esse valor em (linha, coluna) só quando necessário
+    __slots__ = ('tipo', 'lexema', 'posicao')
+
+    def __init__(self, tipo, lexema, posicao=None):
         self.tipo = tipo
         self.lexema = lexema
+        self.posicao = posicao
 
     def __repr__(self):
-        return f"<{self.tipo}, '{self.lexema}'>"
+        return f"<{NOMES_TIPOS[self.tipo]}, '{self.lexema}'>"
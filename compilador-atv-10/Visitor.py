@@ -0,0 +1,39 @@
+# marca de "o passe não tem visita_<Classe>" (None é um valor válido: ver Visitante)
+AUSENTE = object()
+
+
+class TabelaDespacho(dict):
+    """classe do nó -> método do passe que o trata.
+
+    Começa vazia; a primeira vez que aparece um nó de uma classe, o método
+    visita_<Classe> é procurado (subindo pelas classes base) e guardado.
+    """
+
+    def __init__(self, passe):
+        super().__init__()
+        self.passe = passe
+
+    def __missing__(self, classe):
+        for base in classe.__mro__:
+            metodo = getattr(self.passe, 'visita_' + base.__name__, AUSENTE)
+            if metodo is not AUSENTE:
+                self[classe] = metodo
+                return metodo
+
+        raise Exception(f"Erro interno: {type(self.passe).__name__} não trata nós {classe.__name__}")
+
+
+class Visitante:
+    """Base dos passes sobre a AST de objetos (AnalisadorSemantico, Generator).
+
+    Um passe implementa visita_<Classe> para cada tipo de nó que trata
+    (visita_Const, visita_OpBin, visita_CmdIf, ...) e despacha com
+    self.despacho[type(no)](no), sem cadeia de isinstance. Um tipo de nó
+    novo só precisa do seu visita_ nos passes que o usam; uma subclasse
+    sem método próprio cai no da classe base. visita_<Classe> = None diz
+    que o passe não tem nada a fazer com aquele tipo de nó (quem despacha
+    pula a chamada).
+    """
+
+    def __init__(self):
+        self.despacho = TabelaDespacho(self)
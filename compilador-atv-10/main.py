@@ -1,9 +1,15 @@
 import sys
 import os
-from Lexer import Lexer
-from Syntactic import Parser
+from Lexer import Lexer, LexerRegex, LexerBytes, LexerParalelo, LexerAFD
+from Cache import lexer_com_cache, carregar_ast, salvar_ast
+from Syntactic import Parser, FabricaHashConsing, Decl
+from Arena import ArenaAST
 from Semantic import AnalisadorSemantico
-from Generator import Generator
+from Generator import Generator, GeneratorRegistradores, GeneratorIR, REGISTRADORES
+from IR import GeradorIR
+from SSA import OtimizadorSSA
+from Otimizador import Otimizador, MovimentoInvariantes
+from Peephole import Peephole
 
 MODELO_ASSEMBLY = """
   .section .bss
@@ -21,48 +27,298 @@ _start:
   .include "runtime.s"
 """
 
+# Com --fluxo o .text é escrito aos pedaços e o .bss vai no fim, quando
+# todas as variáveis já são conhecidas
+INICIO_FLUXO = """
+  .section .text
+  .globl _start
+
+_start:
+"""
+
+FIM_FLUXO = """
+  call imprime_num
+  call sair
+
+  .include "runtime.s"
+
+  .section .bss
+{variaveis_bss}
+"""
+
+# Motores de análise léxica disponíveis (--lexer=...)
+LEXERS = {
+    'padrao': Lexer,
+    'regex': LexerRegex,
+    'paralelo': LexerParalelo,
+    'afd': LexerAFD,
+}
+
+def ler_argumentos(argv):
+    """Separa os arquivos de entrada/saída das opções --chave=valor."""
+    arquivos = []
+    opcoes = {}
+
+    for arg in argv:
+        if arg.startswith('--'):
+            chave, _, valor = arg[2:].partition('=')
+            opcoes[chave] = valor
+        else:
+            arquivos.append(arg)
+
+    return arquivos, opcoes
+
+# Backends de geração de código (--backend=...)
+BACKENDS = ('pilha', 'registradores', 'ir')
+
+def criar_gerador(opcoes, tabela=None):
+    """Gerador do backend escolhido (--backend=pilha|registradores|ir)."""
+    if opcoes.get('backend') == 'registradores':
+        registradores = int(opcoes.get('registradores') or len(REGISTRADORES))
+        return GeneratorRegistradores(tabela, registradores)
+    if opcoes.get('backend') == 'ir':
+        return GeneratorIR(tabela)
+    return Generator(tabela)
+
+def despejar_ir(destino, programa_ir):
+    """--dump-ir: o IR em texto na saída padrão, ou no arquivo de --dump-ir=arquivo."""
+    if destino:
+        with open(destino, 'w') as f:
+            f.write(programa_ir.texto() + "\n")
+    else:
+        print(programa_ir.texto())
+
+def compilar_em_fluxo(parser, semantico, gerador, arquivo_saida_nome, otimizador=None, peephole=None, invariantes=None):
+    """Verifica, gera e grava cada declaração/comando logo depois de analisá-lo.
+
+    A memória fica limitada ao maior comando, não ao programa inteiro. A
+    saída é escrita num arquivo temporário e só substitui a final se a
+    compilação terminar sem erros.
+    """
+    temporario = arquivo_saida_nome + '.tmp'
+
+    try:
+        with open(temporario, 'w') as f:
+            f.write(INICIO_FLUXO)
+            comandos = False
+
+            for item in parser.parse_em_fluxo():
+                if isinstance(item, Decl):
+                    semantico.verificar_decl(item)
+                else:
+                    semantico.verificar_cmd(item)
+
+                # depois de um erro semântico a análise continua (para
+                # relatar todos os erros, e um erro sintático mais adiante
+                # tem precedência, como no modo normal), mas não gera código
+                if semantico.erros:
+                    continue
+
+                if otimizador is not None:
+                    otimizador.otimizar_item(item)
+
+                if isinstance(item, Decl):
+                    gerador.gera_decl(item)
+                else:
+                    if not comandos:
+                        gerador.instrucoes.append("  # comandos")
+                        comandos = True
+                    # um while chega com o preheader antes dele
+                    for cmd in invariantes.otimizar_comandos([item]) if invariantes is not None else [item]:
+                        gerador.gera_cmd(cmd)
+
+                if peephole is not None:
+                    gerador.instrucoes[:] = peephole.otimizar(gerador.instrucoes)
+                gerador.descarregar(f)
+
+            semantico.relatar()
+
+            f.write(FIM_FLUXO.replace("{variaveis_bss}", gerador.get_codigo_bss()))
+
+        os.replace(temporario, arquivo_saida_nome)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+def relatar_otimizacoes(opcoes, otimizador, peephole, otimizador_ssa=None, invariantes=None):
+    """--relatorio: quantas reescritas cada otimização fez."""
+    if 'relatorio' not in opcoes or otimizador is None:
+        return
+    print(f"Constantes dobradas: {otimizador.dobradas}")
+    if invariantes is not None:
+        print(f"Invariantes movidas para fora de laços: {invariantes.movidas}")
+    if otimizador_ssa is not None:
+        print("SSA:")
+        print(f"  variáveis promovidas (carrega/guarda): {otimizador_ssa.promovidas}")
+        print(f"  cópias propagadas: {otimizador_ssa.propagadas}")
+        print(f"  constantes dobradas: {otimizador_ssa.dobradas}")
+        print(f"  desvios constantes: {otimizador_ssa.desvios}")
+        print(f"  instruções mortas: {otimizador_ssa.mortas}")
+        print(f"  instruções removidas (saldo): {otimizador_ssa.removidas}")
+    print("Peephole:")
+    print(peephole.relatorio())
+
 def main():
-    if len(sys.argv) < 3:
-        print("Uso: python main.py <arquivo.ev> <arquivo_saida.s>")
+    arquivos, opcoes = ler_argumentos(sys.argv[1:])
+
+    if len(arquivos) < 2:
+        print("Uso: python main.py <arquivo.ev> <arquivo_saida.s> [--lexer=padrao|regex|paralelo|afd] [--entrada=mmap] [--cache-tokens] [--parser=iterativo] [--ast=arena|compartilhada] [--recuperar] [--cache-ast[=diretorio]] [--fluxo] [--otimizacao=0|1|2] [--relatorio] [--backend=pilha|registradores|ir] [--registradores=N] [--dump-ir[=arquivo]]")
         sys.exit(1)
 
-    arquivo_entrada = sys.argv[1]
-    arquivo_saida_nome = sys.argv[2]
+    arquivo_entrada = arquivos[0]
+    arquivo_saida_nome = arquivos[1]
+
+    classe_lexer = LEXERS.get(opcoes.get('lexer', 'padrao'))
+    if classe_lexer is None:
+        print(f"Lexer desconhecido: '{opcoes['lexer']}'. Opções: {', '.join(LEXERS)}")
+        sys.exit(1)
 
-    with open(arquivo_entrada, 'r') as f:
-        codigo_fonte = f.read()
+    if opcoes.get('backend', 'pilha') not in BACKENDS:
+        print(f"Backend desconhecido: '{opcoes['backend']}'. Opções: {', '.join(BACKENDS)}")
+        sys.exit(1)
+
+    # os backends com registradores e do IR trabalham sobre a AST de objetos
+    usa_objetos = opcoes.get('backend') in ('registradores', 'ir') or 'dump-ir' in opcoes
+    if usa_objetos and ('cache-ast' in opcoes or opcoes.get('ast') == 'arena'):
+        print("--backend=registradores, --backend=ir e --dump-ir não podem ser usados com --cache-ast ou --ast=arena")
+        sys.exit(1)
+
+    # --fluxo: analisa, verifica e gera um comando por vez (só AST de objetos;
+    # o IR precisa do programa inteiro)
+    if 'fluxo' in opcoes and ('recuperar' in opcoes or 'cache-ast' in opcoes or opcoes.get('ast') == 'arena'
+                              or opcoes.get('backend') == 'ir' or 'dump-ir' in opcoes):
+        print("--fluxo não pode ser usado com --recuperar, --cache-ast, --ast=arena, --backend=ir ou --dump-ir")
+        sys.exit(1)
+
+    # --cache-ast[=diretório]: reaproveita a AST já verificada de um fonte igual
+    diretorio_cache_ast = None
+    if 'cache-ast' in opcoes:
+        diretorio_cache_ast = opcoes['cache-ast'] or os.path.join(os.path.dirname(arquivo_entrada), '.evcache')
+
+    diretorio_saida = os.path.dirname(arquivo_saida_nome)
+    if diretorio_saida:
+        os.makedirs(diretorio_saida, exist_ok=True)
+
+    # --otimizacao=N: 0 desliga tudo; 1 (padrão) dobra constantes e aplica
+    # as regras peephole de nível 1; 2 aplica também as de nível 2
+    nivel = int(opcoes.get('otimizacao') or 1)
+    otimizador = Otimizador() if nivel > 0 else None
+    peephole = Peephole(nivel) if nivel > 0 else None
+    otimizador_ssa = None
 
     # Fluxo de compilação:
     # 1. Análise Léxica
-    lexer = Lexer(codigo_fonte)
+    if opcoes.get('entrada') == 'mmap':
+        # lê direto dos bytes do arquivo mapeado, sem decodificar tudo
+        lexer = LexerBytes.de_arquivo(arquivo_entrada)
+        fonte = lexer.dados
+    else:
+        with open(arquivo_entrada, 'r') as f:
+            codigo_fonte = f.read()
+
+        fonte = codigo_fonte
+        lexer = None
+
+    em_cache = carregar_ast(diretorio_cache_ast, fonte) if diretorio_cache_ast else None
+
+    if em_cache is not None:
+        # acerto: pula as análises léxica, sintática e semântica
+        arena, ast = em_cache
+    else:
+        if lexer is None:
+            if 'cache-tokens' in opcoes:
+                # reaproveita os tokens gravados em <arquivo>.evtok se o fonte não mudou
+                lexer = lexer_com_cache(arquivo_entrada, codigo_fonte, classe_lexer)
+            else:
+                lexer = classe_lexer(codigo_fonte)
+
+        # 2. Análise Sintática
+        # com --ast=arena, a AST fica em colunas (Arena.py) em vez de objetos;
+        # o cache da AST também guarda a arena
+        usar_arena = opcoes.get('ast') == 'arena' or diretorio_cache_ast is not None
+        arena = ArenaAST() if usar_arena else None
+        # com --ast=compartilhada, subexpressões iguais viram um nó só
+        fabrica = FabricaHashConsing() if opcoes.get('ast') == 'compartilhada' and not usar_arena else None
+        parser = Parser(lexer, iterativo=opcoes.get('parser') == 'iterativo', arena=arena, fabrica=fabrica)
+        if 'fluxo' in opcoes:
+            # cada declaração/comando segue direto para a verificação e a geração
+            semantico = AnalisadorSemantico(lexer.onde)
+            gerador = criar_gerador(opcoes, semantico.tabela_simbolos)
+            invariantes = MovimentoInvariantes(semantico.tabela_simbolos) if nivel > 0 else None
+            compilar_em_fluxo(parser, semantico, gerador, arquivo_saida_nome, otimizador, peephole, invariantes)
+            print(f"Sucesso: Arquivo '{arquivo_saida_nome}' gerado.")
+            relatar_otimizacoes(opcoes, otimizador, peephole, invariantes=invariantes)
+            return
 
-    # 2. Análise Sintática
-    parser = Parser(lexer)
-    ast = parser.parse()
+        if 'recuperar' in opcoes:
+            # relata todos os erros sintáticos de uma vez
+            ast, erros = parser.parse_recuperando()
+            if erros:
+                for erro in erros:
+                    print(erro, file=sys.stderr)
+                sys.exit(1)
+        else:
+            ast = parser.parse()
 
-    # 3. Análise Semântica (verificação de variáveis)
-    semantico = AnalisadorSemantico()
-    semantico.verificar(ast)
+        # 3. Análise Semântica (verificação de variáveis)
+        semantico = AnalisadorSemantico(lexer.onde)
+        if arena is not None:
+            semantico.verificar_arena(arena, ast)
+        else:
+            semantico.verificar(ast)
 
-    # 4. Geração de Código
-    gerador = Generator()
-    gerador.gera_programa(ast)
+        if diretorio_cache_ast:
+            salvar_ast(diretorio_cache_ast, fonte, arena, ast)
+
+    # 4. Otimização (dobra de constantes e, na AST de objetos, invariantes
+    # de laço; o peephole roda sobre as instruções geradas, antes do texto
+    # final; --otimizacao=0 desliga tudo)
+    invariantes = None
+    if otimizador is not None:
+        if arena is not None:
+            otimizador.otimizar_arena(arena)
+        else:
+            otimizador.otimizar(ast)
+            invariantes = MovimentoInvariantes(semantico.tabela_simbolos)
+            invariantes.otimizar(ast)
+
+    # 5. Geração de Código
+    if arena is not None:
+        gerador = Generator()
+        gerador.gera_programa_arena(arena, ast)
+    else:
+        # usa os slots resolvidos na análise semântica
+        gerador = criar_gerador(opcoes, semantico.tabela_simbolos)
+        if isinstance(gerador, GeneratorIR) or 'dump-ir' in opcoes:
+            # blocos básicos com instruções de três endereços (IR.py),
+            # otimizados na forma SSA (SSA.py)
+            programa_ir = GeradorIR(semantico.tabela_simbolos).gera_programa(ast)
+            if nivel > 0:
+                otimizador_ssa = OtimizadorSSA()
+                otimizador_ssa.otimizar(programa_ir)
+            if 'dump-ir' in opcoes:
+                despejar_ir(opcoes['dump-ir'], programa_ir)
+
+        if isinstance(gerador, GeneratorIR):
+            gerador.gera_programa_ir(programa_ir)
+        else:
+            gerador.gera_programa(ast)
 
     codigo_bss = gerador.get_codigo_bss()
+    if peephole is not None:
+        gerador.instrucoes = peephole.otimizar(gerador.instrucoes)
     codigo_text = gerador.get_codigo_text()
 
     arquivo_saida_conteudo = MODELO_ASSEMBLY.replace("{variaveis_bss}", codigo_bss)
     arquivo_saida_conteudo = arquivo_saida_conteudo.replace("{codigo_gerado}", codigo_text)
 
     # Salva o resultado no arquivo de saída
-    diretorio_saida = os.path.dirname(arquivo_saida_nome)
-    if diretorio_saida:
-        os.makedirs(diretorio_saida, exist_ok=True)
-
     with open(arquivo_saida_nome, 'w') as f:
         f.write(arquivo_saida_conteudo)
 
     print(f"Sucesso: Arquivo '{arquivo_saida_nome}' gerado.")
+    relatar_otimizacoes(opcoes, otimizador, peephole, otimizador_ssa, invariantes)
 
 if __name__ == '__main__':
     main()
@@ -1,5 +1,18 @@
 import os
+import shutil
 import subprocess
+import time
+from Lexer import Lexer, LexerRegex, LexerAFD, CODIGOS_FIXOS
+from Syntactic import Parser, FabricaHashConsing, ErroSintatico
+from Arena import ArenaAST, ATRIB
+from Semantic import AnalisadorSemantico, ErroSemantico
+from Otimizador import Otimizador, MovimentoInvariantes
+from Peephole import Peephole
+from IR import GeradorIR, CARREGA, GUARDA, FI
+from SSA import OtimizadorSSA
+from Syntactic import Const, OpBin
+from Token import EOF
+from Cache import carregar_ast, salvar_ast, caminho_ast, MAGICO, CABECALHO
 
 TESTES_SUCESSO = [
     # Básico
@@ -15,6 +28,18 @@ TESTES_SUCESSO = [
     # Atribuição dentro do bloco
     ("x = 10;\n{\nx = x + 1;\nreturn x;\n}", "11"),
 
+    # Constantes (dobradas em tempo de compilação com a semântica da máquina)
+    ("{\nreturn (0 - 7) / 2;\n}", "-3"),
+    ("{\nreturn (3 < 5) + (5 > 3) + (2 == 2) + (1 > 2);\n}", "3"),
+    ("{\nreturn 4611686018427387904 * 4 + 1;\n}", "1"),
+    ("{\nreturn 18446744073709551621;\n}", "5"),
+
+    # Palavra-chave colada a uma letra fora do ASCII é um identificador só (em todos os lexers)
+    ("ifç = 4;\n{\nreturn ifç;\n}", "4"),
+
+    # Variáveis com nome de rótulo do runtime (ficam em slots, não em rótulos próprios)
+    ("buffer = 3;\nsair = 4;\n{\nreturn buffer + sair;\n}", "7"),
+
     # IF
     (
         "a = 10;\nb = 5;\n{\nif a > b {\na = 1;\n} else {\na = 2;\n}\nreturn a;\n}",
@@ -36,6 +61,50 @@ TESTES_SUCESSO = [
         "a = 5;\n{\nwhile a > 0 {\na = a - 1;\n}\nif a == 0 {\na = 10;\n} else {\na = 20;\n}\nreturn a;\n}",
         "10"
     ),
+
+    # Atribuições mortas e troca de valores num laço (fi que leem uns aos outros)
+    ("x = 1;\n{\nx = 2;\nx = 3;\nreturn x;\n}", "3"),
+    (
+        "a = 1;\nb = 2;\nt = 0;\ni = 0;\n{\nwhile i < 3 {\nt = a;\na = b;\nb = t;\ni = i + 1;\n}\nreturn a * 10 + b;\n}",
+        "21"
+    ),
+
+    # Invariantes de laço: a conta sai do laço; a divisão por zero de um
+    # laço que não roda continua sem rodar
+    (
+        "b = 3;\nc = 4;\ni = 0;\ns = 0;\n{\nwhile i < 10 {\ns = s + (b * 100 + c);\ni = i + 1;\n}\nreturn s;\n}",
+        "3040"
+    ),
+    (
+        "b = 3;\nz = 0;\ns = 1;\n{\nwhile z > 0 {\ns = s + b / z;\n}\nreturn s;\n}",
+        "1"
+    ),
+]
+
+# Cada bateria de testes roda uma vez para cada conjunto de opções do main.py
+OPCOES_COMPILACAO = [
+    "",
+    "--lexer=regex",
+    "--lexer=paralelo",
+    "--lexer=afd",
+    "--entrada=mmap",
+    "--cache-tokens",
+    "--parser=iterativo",
+    "--ast=arena",
+    "--ast=arena --parser=iterativo",
+    "--ast=compartilhada",
+    "--recuperar",
+    "--cache-ast",
+    "--fluxo",
+    "--fluxo --lexer=afd --ast=compartilhada",
+    "--otimizacao=0",
+    "--otimizacao=2",
+    "--backend=registradores",
+    "--backend=registradores --registradores=2 --otimizacao=0",
+    "--fluxo --backend=registradores",
+    "--backend=registradores --otimizacao=2",
+    "--backend=ir",
+    "--backend=ir --otimizacao=0",
 ]
 
 # =====================================================
@@ -69,6 +138,9 @@ TESTES_ERRO_LEXICO_SINTATICO = [
 
     # Falta ponto e vírgula
     ("{\nreturn 10\n}", "Erro sintático"),
+
+    # Comparações não são associativas
+    ("{\nreturn 1 < 2 < 3;\n}", "Erro sintático"),
 ]
 
 
@@ -78,14 +150,15 @@ def rodar_comando(comando):
 
 
 def limpar_arquivos_temporarios():
-    arquivos = ['temp.ev', 'temp.s', 'temp.o', 'temp_exe']
+    arquivos = ['temp.ev', 'temp.evtok', 'temp.ir', 'temp.s', 'temp.o', 'temp_exe']
     for f in arquivos:
         if os.path.exists(f):
             os.remove(f)
+    shutil.rmtree('.evcache', ignore_errors=True)
 
 
-def testar_sucesso():
-    print("--- Rodando Testes de Sucesso ---")
+def testar_sucesso(opcoes=""):
+    print(f"--- Rodando Testes de Sucesso {opcoes} ---")
     passou_todos = True
 
     for i, (codigo, esperado) in enumerate(TESTES_SUCESSO):
@@ -93,7 +166,7 @@ def testar_sucesso():
             f.write(codigo)
 
         # 1. Compilar
-        res_comp = rodar_comando("python3 main.py temp.ev temp.s")
+        res_comp = rodar_comando(f"python3 main.py temp.ev temp.s {opcoes}")
 
         if res_comp.returncode != 0:
             print(f"Teste {i+1} Falhou na compilação: {repr(codigo)}")
@@ -127,15 +200,15 @@ def testar_sucesso():
     return passou_todos
 
 
-def testar_erros_semanticos():
-    print("\n--- Rodando Testes de Erros Semânticos ---")
+def testar_erros_semanticos(opcoes=""):
+    print(f"\n--- Rodando Testes de Erros Semânticos {opcoes} ---")
     passou_todos = True
 
     for i, (codigo, erro_esperado) in enumerate(TESTES_ERRO_SEMANTICO):
         with open('temp.ev', 'w') as f:
             f.write(codigo)
 
-        res_comp = rodar_comando("python3 main.py temp.ev temp.s")
+        res_comp = rodar_comando(f"python3 main.py temp.ev temp.s {opcoes}")
 
         if res_comp.returncode != 0 and erro_esperado.lower() in res_comp.stderr.lower():
             print(f"Teste Semântico {i+1} Passou: Capturou '{erro_esperado}' para {repr(codigo)[:50]}")
@@ -147,15 +220,15 @@ def testar_erros_semanticos():
     return passou_todos
 
 
-def testar_erros_lexico_sintatico():
-    print("\n--- Rodando Testes de Erros Léxicos/Sintáticos ---")
+def testar_erros_lexico_sintatico(opcoes=""):
+    print(f"\n--- Rodando Testes de Erros Léxicos/Sintáticos {opcoes} ---")
     passou_todos = True
 
     for i, (codigo, erro_esperado) in enumerate(TESTES_ERRO_LEXICO_SINTATICO):
         with open('temp.ev', 'w') as f:
             f.write(codigo)
 
-        res_comp = rodar_comando("python3 main.py temp.ev temp.s")
+        res_comp = rodar_comando(f"python3 main.py temp.ev temp.s {opcoes}")
 
         if res_comp.returncode != 0 and erro_esperado.lower() in res_comp.stderr.lower():
             print(f"Teste Léxico/Sintático {i+1} Passou: Capturou '{erro_esperado}' para {repr(codigo)[:50]}")
@@ -167,16 +240,661 @@ def testar_erros_lexico_sintatico():
     return passou_todos
 
 
+def testar_posicoes_lexers():
+    print("\n--- Rodando Teste de Posições dos Tokens (todos os lexers) ---")
+    passou_todos = True
+
+    def tokens(lexer):
+        lista = []
+        while True:
+            tok = lexer.proximo_token()
+            lista.append((tok.tipo, tok.lexema, tok.posicao))
+            if tok.tipo == 0:
+                return lista
+
+    # posicao é o offset do token no fonte, o mesmo com qualquer lexer
+    for codigo, _ in TESTES_SUCESSO:
+        esperado = tokens(Lexer(codigo))
+        for classe in (LexerRegex, LexerAFD):
+            if tokens(classe(codigo)) != esperado:
+                print(f"Posições Falhou com {classe.__name__} para {repr(codigo)[:50]}")
+                passou_todos = False
+
+    # e chega igual ao erro sintático
+    for codigo, erro_esperado in TESTES_ERRO_LEXICO_SINTATICO:
+        if erro_esperado != "Erro sintático":
+            continue
+        posicoes = []
+        for classe in (Lexer, LexerRegex, LexerAFD):
+            try:
+                Parser(classe(codigo)).parse()
+            except ErroSintatico as e:
+                posicoes.append(e.posicao)
+        if len(set(posicoes)) != 1 or len(posicoes) != 3:
+            print(f"Posições Falhou no erro de {repr(codigo)[:50]}: {posicoes}")
+            passou_todos = False
+
+    if passou_todos:
+        print("Posições Passou: mesmos offsets em Lexer, LexerRegex e LexerAFD")
+    return passou_todos
+
+
+def testar_cache_tokens():
+    print("\n--- Rodando Testes do Cache de Tokens ---")
+    passou_todos = True
+    codigo, esperado = TESTES_SUCESSO[-1]
+
+    def compilar_e_executar():
+        res_comp = rodar_comando("python3 main.py temp.ev temp.s --cache-tokens")
+        if res_comp.returncode != 0:
+            return res_comp.stderr.strip()
+        rodar_comando("as --64 -o temp.o temp.s")
+        rodar_comando("ld -o temp_exe temp.o")
+        return rodar_comando("./temp_exe").stdout.strip()
+
+    with open('temp.ev', 'w') as f:
+        f.write(codigo)
+    if os.path.exists('temp.evtok'):
+        os.remove('temp.evtok')
+
+    # 1. falta: grava o cache
+    saida = compilar_e_executar()
+    if saida != esperado or not os.path.exists('temp.evtok'):
+        print(f"Cache 1 Falhou: esperado '{esperado}' e temp.evtok gravado, obteve '{saida}'")
+        passou_todos = False
+
+    # 2. acerto: mesmo resultado lendo do cache
+    with open('temp.evtok', 'rb') as f:
+        gravado = f.read()
+    saida = compilar_e_executar()
+    if saida != esperado:
+        print(f"Cache 2 Falhou: esperado '{esperado}', obteve '{saida}'")
+        passou_todos = False
+
+    # 3. cache corrompido é ignorado (e regravado)
+    with open('temp.evtok', 'wb') as f:
+        f.write(gravado[:len(gravado) // 2])
+    saida = compilar_e_executar()
+    with open('temp.evtok', 'rb') as f:
+        regravado = f.read()
+    if saida != esperado or regravado != gravado:
+        print(f"Cache 3 Falhou: cache corrompido não foi ignorado (obteve '{saida}')")
+        passou_todos = False
+
+    # 4. um código trocado ('+' vira '*') é pego pelo resumo das colunas:
+    # o cache é ignorado e o resultado não muda
+    inicio_codigos = len(MAGICO) + CABECALHO.size
+    trocado = bytearray(gravado)
+    trocado[gravado.index(CODIGOS_FIXOS['+'], inicio_codigos)] = CODIGOS_FIXOS['*']
+    with open('temp.evtok', 'wb') as f:
+        f.write(trocado)
+    saida = compilar_e_executar()
+    if saida != esperado:
+        print(f"Cache 4 Falhou: código trocado no cache mudou o resultado para '{saida}'")
+        passou_todos = False
+
+    # 5. fonte alterado: o cache antigo não vale mais
+    with open('temp.ev', 'w') as f:
+        f.write("{\nreturn 42;\n}")
+    saida = compilar_e_executar()
+    if saida != "42":
+        print(f"Cache 5 Falhou: esperado '42' com o fonte alterado, obteve '{saida}'")
+        passou_todos = False
+
+    if passou_todos:
+        print("Testes do cache de tokens passaram")
+
+    return passou_todos
+
+
+def testar_aninhamento_profundo():
+    print("\n--- Rodando Teste de Aninhamento Profundo (--parser=iterativo) ---")
+    profundidade = 3000
+    # cadeia de OpBin de verdade (parênteses em volta de um número só viram
+    # um Const): x + (x + (... + i)) no laço e x + (x + (... + x)) no return
+    cadeia = "(x + " * profundidade + "%s" + ")" * profundidade
+    fonte = ("x = 1;\ni = 0;\ns = 0;\n{\nwhile i < 2 {\ns = s + " + cadeia % "i" + ";\ni = i + 1;\n}\n"
+             "return s + " + cadeia % "x" + ";\n}")
+    esperado = str(3 * profundidade + 2)
+
+    with open('temp.ev', 'w') as f:
+        f.write(fonte)
+
+    # todos os passes percorrem as expressões sem recursão
+    passou_todos = True
+    for opcoes in ["", "--otimizacao=0", "--ast=arena", "--fluxo", "--backend=ir",
+                   "--backend=registradores", "--backend=registradores --registradores=2"]:
+        res_comp = rodar_comando(f"python3 main.py temp.ev temp.s --parser=iterativo {opcoes}")
+        if res_comp.returncode != 0:
+            print(f"Aninhamento Falhou na compilação [{opcoes}]: {res_comp.stderr.strip()[-200:]}")
+            passou_todos = False
+            continue
+
+        rodar_comando("as --64 -o temp.o temp.s")
+        rodar_comando("ld -o temp_exe temp.o")
+        saida = rodar_comando("./temp_exe").stdout.strip()
+
+        if saida != esperado:
+            print(f"Aninhamento Falhou [{opcoes}]: esperado '{esperado}', obteve '{saida}'")
+            passou_todos = False
+
+    if passou_todos:
+        print(f"Aninhamento Passou: {profundidade} níveis de operadores")
+    return passou_todos
+
+
+def testar_compartilhamento():
+    print("\n--- Rodando Teste de Compartilhamento de Subexpressões (hash-consing) ---")
+    fonte = "a = 1;\nb = a * 2 + 3;\nc = a * 2 + 3;\n{\nb = a * 2;\nreturn b + c;\n}"
+    fabrica = FabricaHashConsing()
+    programa = Parser(Lexer(fonte), fabrica=fabrica).parse()
+
+    b, c = programa.declaracoes[1], programa.declaracoes[2]
+    if b.expressao is not c.expressao or programa.comandos[0].expressao is not b.expressao.opEsq:
+        print("Compartilhamento Falhou: subexpressões iguais não viraram o mesmo nó")
+        return False
+
+    # a * 2 aparece três vezes; a * 2 + 3, duas
+    repetidos = fabrica.repetidos()
+    if repetidos != [(b.expressao.opEsq, 3), (b.expressao, 2)]:
+        print(f"Compartilhamento Falhou: contagem inesperada {repetidos}")
+        return False
+
+    # o nó de 'a' é um só: cada uso fica com a posição no dono da expressão
+    posicoes = [d.posicoes_vars for d in programa.declaracoes[1:]] + [programa.comandos[0].posicoes_vars]
+    if b.expressao.opEsq.opEsq.posicao is not None or posicoes != [[11], [26], [43]]:
+        print(f"Compartilhamento Falhou: posições inesperadas {posicoes}")
+        return False
+
+    print(f"Compartilhamento Passou: {fabrica.pedidos} nós pedidos, {fabrica.criados()} criados")
+    return True
+
+
+PROGRAMA_VARIOS_ERROS_SEMANTICOS = "a = b;\nc = 1;\n{\nd = c;\nif c > 0 {\nc = e;\n} else {\nc = c + e;\n}\nreturn f;\n}"
+
+ERROS_SEMANTICOS_ESPERADOS = [
+    "variável 'b' não foi declarada (linha 1, coluna 5)",
+    "variável 'd' não foi declarada (linha 4, coluna 1)",
+    "variável 'e' não foi declarada (linha 6, coluna 5)",
+    "variável 'e' não foi declarada (linha 8, coluna 9)",
+    "variável 'f' não foi declarada (linha 10, coluna 8)",
+]
+
+
+def testar_semantico_completo():
+    print("\n--- Rodando Testes do Semântico (todos os erros, sem recursão) ---")
+    passou_todos = True
+
+    with open('temp.ev', 'w') as f:
+        f.write(PROGRAMA_VARIOS_ERROS_SEMANTICOS)
+
+    # 'e' aparece duas vezes e é relatada nas duas posições (também com
+    # --ast=compartilhada, em que os dois usos são o mesmo nó)
+    for opcoes in ("", "--ast=arena", "--fluxo", "--ast=compartilhada"):
+        res_comp = rodar_comando(f"python3 main.py temp.ev temp.s {opcoes}")
+        faltando = [erro for erro in ERROS_SEMANTICOS_ESPERADOS if erro not in res_comp.stderr]
+        if res_comp.returncode == 0 or faltando:
+            print(f"Semântico {opcoes} Falhou: não relatou {faltando}")
+            passou_todos = False
+        elif res_comp.stderr.count("não foi declarada") != len(ERROS_SEMANTICOS_ESPERADOS):
+            print(f"Semântico {opcoes} Falhou: relatou mais erros que o esperado\n{res_comp.stderr}")
+            passou_todos = False
+
+    # expressão aninhada bem além do limite de recursão do Python
+    profundidade = 5000
+    fonte = "x = 1;\n{\nreturn " + "(x + " * profundidade + "y" + ")" * profundidade + ";\n}"
+    semantico = AnalisadorSemantico()
+    try:
+        semantico.verificar(Parser(Lexer(fonte), iterativo=True).parse())
+        print("Semântico Falhou: 'y' não declarada passou sem erro")
+        passou_todos = False
+    except ErroSemantico as e:
+        if len(e.erros) != 1:
+            print(f"Semântico Falhou: esperava 1 erro, obteve {len(e.erros)}")
+            passou_todos = False
+    except RecursionError:
+        print(f"Semântico Falhou: estourou a recursão com {profundidade} níveis")
+        passou_todos = False
+
+    if passou_todos:
+        print(f"Semântico Passou: {len(ERROS_SEMANTICOS_ESPERADOS)} erros de uma vez, {profundidade} níveis sem recursão")
+    return passou_todos
+
+
+def testar_dobra_constantes():
+    print("\n--- Rodando Testes da Dobra de Constantes ---")
+    fonte = "x = 7 + 5 * 3;\n{\nx = x + 2 * 3;\nreturn x / (4 - 4);\n}"
+
+    programa = Parser(Lexer(fonte)).parse()
+    AnalisadorSemantico().verificar(programa)
+    otimizador = Otimizador()
+    otimizador.otimizar(programa)
+
+    decl, atrib = programa.declaracoes[0], programa.comandos[0]
+    if not (isinstance(decl.expressao, Const) and decl.expressao.valor == 22):
+        print("Dobra Falhou: 7 + 5 * 3 não virou a constante 22")
+        return False
+    if not (isinstance(atrib.expressao, OpBin) and isinstance(atrib.expressao.opDir, Const) and atrib.expressao.opDir.valor == 6):
+        print("Dobra Falhou: x + 2 * 3 deveria virar x + 6")
+        return False
+    # divisão por zero fica para a execução
+    if not (isinstance(programa.retorno, OpBin) and programa.retorno.opDir.valor == 0):
+        print("Dobra Falhou: a divisão por zero não deveria ser dobrada")
+        return False
+
+    # a arena dobra as mesmas operações
+    arena = ArenaAST()
+    Parser(Lexer(fonte), arena=arena).parse()
+    otimizador_arena = Otimizador()
+    otimizador_arena.otimizar_arena(arena)
+    if otimizador_arena.dobradas != otimizador.dobradas:
+        print(f"Dobra Falhou: arena dobrou {otimizador_arena.dobradas}, objetos {otimizador.dobradas}")
+        return False
+
+    print(f"Dobra Passou: {otimizador.dobradas} operações calculadas na compilação")
+    return True
+
+
+def testar_peephole():
+    print("\n--- Rodando Testes do Peephole ---")
+    instrucoes = [
+        "  mov $3, %rax",
+        "  push %rax",
+        "  mov $4, %rax",
+        "  pop %rbx",
+        "  cmp %rbx, %rax",
+        "  setl %al",
+        "  movzb %al, %rax",
+        "  cmp $0, %rax",
+        "  jz L0",
+        "  jmp L1",
+        "L0:",
+        "L1:",
+    ]
+    esperado = [
+        "  mov $3, %rbx",
+        "  mov $4, %rax",
+        "  cmp %rbx, %rax",
+        "  setl %al",
+        "  movzb %al, %rax",
+        "  jge L0",
+        "L0:",
+        "L1:",
+    ]
+
+    peephole = Peephole(2)
+    saida = peephole.otimizar(instrucoes)
+    if saida != esperado:
+        print(f"Peephole Falhou: obteve {saida}")
+        return False
+
+    # o nível 1 não mexe no salto condicional
+    if "  cmp $0, %rax" not in Peephole(1).otimizar(instrucoes):
+        print("Peephole Falhou: nível 1 aplicou regra de nível 2")
+        return False
+
+    reescritas = sum(peephole.contagem.values())
+    print(f"Peephole Passou: {len(instrucoes)} -> {len(saida)} linhas em {reescritas} reescritas")
+    return True
+
+
+def testar_ir():
+    print("\n--- Rodando Testes do IR ---")
+    fonte = "x = 3;\n{\nwhile (x > 0) {\nx = x - 1;\n}\nreturn x * 2;\n}"
+    esperado = "\n".join([
+        "B0:",
+        "  guarda x, 3",
+        "  salta B1",
+        "B1:",
+        "  t0 = carrega x",
+        "  t1 = t0 > 0",
+        "  desvia t1, B2, B3",
+        "B2:",
+        "  t2 = carrega x",
+        "  t3 = t2 - 1",
+        "  guarda x, t3",
+        "  salta B1",
+        "B3:",
+        "  t4 = carrega x",
+        "  t5 = t4 * 2",
+        "  retorna t5",
+    ])
+
+    programa = Parser(Lexer(fonte)).parse()
+    semantico = AnalisadorSemantico()
+    semantico.verificar(programa)
+    programa_ir = GeradorIR(semantico.tabela_simbolos).gera_programa(programa)
+
+    if programa_ir.texto() != esperado:
+        print(f"IR Falhou: obteve\n{programa_ir.texto()}")
+        return False
+
+    sucessores = [[b.rotulo for b in bloco.sucessores()] for bloco in programa_ir.blocos]
+    if sucessores != [["B1"], ["B2", "B3"], ["B1"], []]:
+        print(f"IR Falhou: sucessores {sucessores}")
+        return False
+
+    # --dump-ir=arquivo grava o mesmo texto
+    with open('temp.ev', 'w') as f:
+        f.write(fonte)
+    res_comp = rodar_comando("python3 main.py temp.ev temp.s --backend=ir --dump-ir=temp.ir --otimizacao=0")
+    with open('temp.ir') as f:
+        despejado = f.read().strip()
+    if res_comp.returncode != 0 or despejado != esperado:
+        print(f"IR Falhou: --dump-ir gravou\n{despejado}")
+        return False
+
+    print(f"IR Passou: {len(programa_ir.blocos)} blocos, {programa_ir.n_temps} temporários")
+    return True
+
+
+def testar_ssa():
+    print("\n--- Rodando Testes da Forma SSA ---")
+    fonte = "x = 1;\ny = 2;\n{\nx = 2;\nx = 3;\ny = x;\nwhile (y > 0) {\ny = y - 1;\n}\nreturn x + y;\n}"
+    esperado = "\n".join([
+        "B0:",
+        "  t8 = copia 3",
+        "  salta B1",
+        "B1:",
+        "  t2 = t8 > 0",
+        "  desvia t2, B2, B3",
+        "B2:",
+        "  t4 = t8 - 1",
+        "  t8 = copia t4",
+        "  salta B1",
+        "B3:",
+        "  t7 = 3 + t8",
+        "  retorna t7",
+    ])
+
+    programa = Parser(Lexer(fonte)).parse()
+    semantico = AnalisadorSemantico()
+    semantico.verificar(programa)
+    programa_ir = GeradorIR(semantico.tabela_simbolos).gera_programa(programa)
+    antes = sum(len(bloco.instrucoes) for bloco in programa_ir.blocos)
+
+    ssa = OtimizadorSSA()
+    ssa.otimizar(programa_ir)
+
+    # as variáveis viraram Temps: sem carrega/guarda e sem fi depois da saída do SSA
+    sobrando = [ins.op for bloco in programa_ir.blocos for ins in bloco.instrucoes if ins.op in (CARREGA, GUARDA, FI)]
+    if sobrando:
+        print(f"SSA Falhou: sobraram {sobrando}")
+        return False
+
+    if programa_ir.texto() != esperado:
+        print(f"SSA Falhou: obteve\n{programa_ir.texto()}")
+        return False
+
+    depois = sum(len(bloco.instrucoes) for bloco in programa_ir.blocos)
+    if ssa.removidas != antes - depois:
+        print(f"SSA Falhou: relatou {ssa.removidas} removidas, foram {antes - depois}")
+        return False
+
+    # condição constante: o if some e o resultado vira constante
+    programa = Parser(Lexer("a = 2;\n{\nif a > 1 {\na = a * 5;\n} else {\na = 0;\n}\nreturn a;\n}")).parse()
+    semantico = AnalisadorSemantico()
+    semantico.verificar(programa)
+    programa_ir = OtimizadorSSA().otimizar(GeradorIR(semantico.tabela_simbolos).gera_programa(programa))
+    if programa_ir.texto() != "B0:\n  retorna 10":
+        print(f"SSA Falhou: if constante deu\n{programa_ir.texto()}")
+        return False
+
+    print(f"SSA Passou: {antes} -> {depois} instruções")
+    return True
+
+
+def testar_invariantes():
+    print("\n--- Rodando Testes de Invariantes de Laço ---")
+    fonte = "b = 3;\nc = 4;\nz = 0;\ni = 0;\ns = 0;\n{\nwhile i < b * 2 {\ns = s + (b * 100 + c) + i / z + i / 2;\ni = i + 1;\n}\nreturn s;\n}"
+    programa = Parser(Lexer(fonte)).parse()
+    semantico = AnalisadorSemantico()
+    semantico.verificar(programa)
+    invariantes = MovimentoInvariantes(semantico.tabela_simbolos)
+    invariantes.otimizar(programa)
+
+    # b * 2 e b * 100 + c vão para o preheader, logo antes do while;
+    # i / z e i / 2 dependem de i e ficam
+    nomes = [getattr(cmd, 'nome', None) for cmd in programa.comandos]
+    if invariantes.movidas != 2 or nomes != ["inv.5", "inv.6", None]:
+        print(f"Invariantes Falhou: {invariantes.movidas} movidas, comandos {nomes}")
+        return False
+
+    laco = programa.comandos[2]
+    if laco.cond.opDir.nome != "inv.5" or laco.corpo[0].expressao.opEsq.opEsq.opDir.nome != "inv.6":
+        print("Invariantes Falhou: o laço não usa as variáveis do preheader")
+        return False
+
+    # divisão que pode falhar (divisor variável ou -1) não sai do laço
+    fonte = "b = 3;\nz = 0;\ns = 0;\n{\nwhile s < 0 {\ns = b / z + b / (0 - 1);\n}\nreturn s;\n}"
+    programa = Parser(Lexer(fonte)).parse()
+    semantico = AnalisadorSemantico()
+    semantico.verificar(programa)
+    Otimizador().otimizar(programa)  # como no main.py: 0 - 1 vira a constante -1
+    invariantes = MovimentoInvariantes(semantico.tabela_simbolos)
+    invariantes.otimizar(programa)
+    if invariantes.movidas != 0 or len(programa.comandos) != 1:
+        print(f"Invariantes Falhou: moveu uma divisão ({invariantes.movidas} movidas)")
+        return False
+
+    print("Invariantes Passou")
+    return True
+
+
+def testar_cache_ast():
+    print("\n--- Rodando Testes do Cache da AST ---")
+    passou_todos = True
+    diretorio = '.evcache'
+    shutil.rmtree(diretorio, ignore_errors=True)
+
+    # 1. falta e acerto geram o mesmo assembly
+    codigo, _ = TESTES_SUCESSO[-1]
+    with open('temp.ev', 'w') as f:
+        f.write(codigo)
+
+    saidas = []
+    for _ in range(2):
+        rodar_comando("python3 main.py temp.ev temp.s --cache-ast")
+        with open('temp.s') as f:
+            saidas.append(f.read())
+
+    if not os.path.exists(caminho_ast(diretorio, codigo)) or saidas[0] != saidas[1]:
+        print("Cache AST 1 Falhou: o acerto gerou um assembly diferente (ou nada foi gravado)")
+        passou_todos = False
+
+    # 2. arquivo corrompido é ignorado
+    with open(caminho_ast(diretorio, codigo), 'wb') as f:
+        f.write(b"lixo")
+    if carregar_ast(diretorio, codigo) is not None:
+        print("Cache AST 2 Falhou: arquivo corrompido foi aceito")
+        passou_todos = False
+
+    # um byte trocado em qualquer ponto (o resumo sha256 não bate mais)
+    arena = ArenaAST()
+    programa = Parser(Lexer(codigo), arena=arena).parse()
+    salvar_ast(diretorio, codigo, arena, programa)
+    with open(caminho_ast(diretorio, codigo), 'rb') as f:
+        dados = bytearray(f.read())
+    for posicao in (len(dados) // 2, len(dados) - 1):
+        trocado = bytearray(dados)
+        trocado[posicao] ^= 1
+        with open(caminho_ast(diretorio, codigo), 'wb') as f:
+            f.write(trocado)
+        if carregar_ast(diretorio, codigo) is not None:
+            print(f"Cache AST 2 Falhou: byte {posicao} trocado foi aceito")
+            passou_todos = False
+
+    # resumo certo, mas a arena aponta para um filho que não existe
+    for no in range(len(arena)):
+        if arena.tipo[no] == ATRIB:
+            arena.esq[no] = len(arena)
+            break
+    salvar_ast(diretorio, codigo, arena, programa)
+    if carregar_ast(diretorio, codigo) is not None:
+        print("Cache AST 2 Falhou: arena com filho inválido foi aceita")
+        passou_todos = False
+
+    # 3. LRU: com espaço para dois programas, o menos usado sai
+    fontes = [f"x = {i};\n{{\nreturn x;\n}}" for i in range(3)]
+    shutil.rmtree(diretorio, ignore_errors=True)
+
+    tamanho = 0
+    for fonte in fontes[:2]:
+        arena = ArenaAST()
+        programa = Parser(Lexer(fonte), arena=arena).parse()
+        salvar_ast(diretorio, fonte, arena, programa)
+        tamanho = max(tamanho, os.path.getsize(caminho_ast(diretorio, fonte)))
+        time.sleep(0.01)
+
+    carregar_ast(diretorio, fontes[0])  # fontes[0] passa a ser o mais recente
+    time.sleep(0.01)
+
+    arena = ArenaAST()
+    programa = Parser(Lexer(fontes[2]), arena=arena).parse()
+    salvar_ast(diretorio, fontes[2], arena, programa, tamanho_maximo=2 * tamanho)
+
+    presentes = [os.path.exists(caminho_ast(diretorio, fonte)) for fonte in fontes]
+    if presentes != [True, False, True]:
+        print(f"Cache AST 3 Falhou: esperado [True, False, True] no diretório, obteve {presentes}")
+        passou_todos = False
+
+    shutil.rmtree(diretorio, ignore_errors=True)
+
+    if passou_todos:
+        print("Testes do cache da AST passaram")
+
+    return passou_todos
+
+
+# =====================================================
+# Recuperação de erros: todos os erros numa única análise
+# =====================================================
+PROGRAMA_VARIOS_ERROS = """a = 10;
+b = ;
+{
+  a = a + ;
+  if a > b {
+    b = b * ;
+  } else {
+    b = 2;
+  }
+  while a > 0 {
+    a = a - 1
+  }
+  x = (a + 1;
+  return a;
+}"""
+
+ERROS_ESPERADOS = [
+    (2, 5, "esperado número, identificador ou '(', recebido PONTO_VIRGULA"),
+    (4, 11, "esperado número, identificador ou '(', recebido PONTO_VIRGULA"),
+    (6, 13, "esperado número, identificador ou '(', recebido PONTO_VIRGULA"),
+    (12, 3, "esperado PONTO_VIRGULA, recebido FECHA_CHAVE"),
+    (13, 13, "esperado FECHA_PARENTESE, recebido PONTO_VIRGULA"),
+]
+
+
+def testar_recuperacao():
+    print("\n--- Rodando Testes de Recuperação de Erros ---")
+    passou_todos = True
+
+    # 1. todos os erros do programa, na ordem, sem subprocessos
+    _, erros = Parser(Lexer(PROGRAMA_VARIOS_ERROS)).parse_recuperando()
+    obtidos = [(e.linha, e.coluna, e.mensagem) for e in erros]
+    if obtidos == ERROS_ESPERADOS:
+        print(f"Recuperação Passou: {len(erros)} erros numa única análise")
+    else:
+        print("Recuperação Falhou:")
+        print(f"  Esperado: {ERROS_ESPERADOS}")
+        print(f"  Obtido:   {obtidos}")
+        passou_todos = False
+
+    # 2. os casos sintáticos de um processo por caso, todos no mesmo processo:
+    #    o primeiro erro registrado é o que o parse normal levantaria
+    for i, (codigo, erro_esperado) in enumerate(TESTES_ERRO_LEXICO_SINTATICO):
+        if erro_esperado != "Erro sintático":
+            continue
+
+        try:
+            Parser(Lexer(codigo)).parse()
+            esperado = None
+        except Exception as e:
+            esperado = str(e)
+
+        _, erros = Parser(Lexer(codigo)).parse_recuperando()
+        if not erros or str(erros[0]) != esperado:
+            print(f"Recuperação {i+1} Falhou para {repr(codigo)[:50]}: esperado {esperado}, obteve {[str(e) for e in erros]}")
+            passou_todos = False
+
+    return passou_todos
+
+
+def testar_lookahead():
+    print("\n--- Rodando Teste de Lookahead (FluxoTokens) ---")
+    passou_todos = True
+
+    # olhar k tokens à frente e depois consumi-los: saem os mesmos, na ordem
+    lexer = Lexer("a = 1 + b")
+    vistos = [lexer.olhar_proximo_token(k) for k in range(4)]
+    consumidos = [lexer.proximo_token() for _ in range(4)]
+    if [tok.lexema for tok in vistos] != ['a', '=', '1', '+'] or any(a is not b for a, b in zip(vistos, consumidos)):
+        print(f"Lookahead Falhou: olhou {[t.lexema for t in vistos]}, consumiu {[t.lexema for t in consumidos]}")
+        passou_todos = False
+
+    # o buffer guarda no máximo capacidade tokens
+    try:
+        lexer.olhar_proximo_token(lexer.fluxo.capacidade)
+        print("Lookahead Falhou: olhar além da capacidade não levantou ValueError")
+        passou_todos = False
+    except ValueError:
+        pass
+
+    # depois do último token, o EOF se repete (no olhar e no consumir)
+    ultimo = lexer.proximo_token()
+    fins = [lexer.olhar_proximo_token(k).tipo for k in range(3)] + [lexer.proximo_token().tipo for _ in range(3)]
+    if ultimo.lexema != 'b' or fins != [EOF] * 6:
+        print(f"Lookahead Falhou: esperava EOF repetido depois de 'b', obteve {fins}")
+        passou_todos = False
+
+    # Parser.olhar(k) é o token k posições depois do atual
+    parser = Parser(Lexer("a = 1 + b"))
+    if [parser.olhar(k).lexema for k in (1, 2, 3)] != ['=', '1', '+'] or parser.token_atual.lexema != 'a':
+        print("Lookahead Falhou: Parser.olhar não devolveu os tokens seguintes ao atual")
+        passou_todos = False
+
+    if passou_todos:
+        print("Lookahead Passou")
+    return passou_todos
+
+
 if __name__ == '__main__':
     if not os.path.exists("runtime.s"):
         print("Aviso: O arquivo 'runtime.s' não foi encontrado no diretório. Os testes de execução falharão.")
 
     try:
-        sucesso = testar_sucesso()
-        semantico = testar_erros_semanticos()
-        lexico_sintatico = testar_erros_lexico_sintatico()
-
-        if sucesso and semantico and lexico_sintatico:
+        passou = True
+
+        for opcoes in OPCOES_COMPILACAO:
+            sucesso = testar_sucesso(opcoes)
+            semantico = testar_erros_semanticos(opcoes)
+            lexico_sintatico = testar_erros_lexico_sintatico(opcoes)
+            passou = passou and sucesso and semantico and lexico_sintatico
+
+        passou = testar_posicoes_lexers() and passou
+        passou = testar_lookahead() and passou
+        passou = testar_cache_tokens() and passou
+        passou = testar_aninhamento_profundo() and passou
+        passou = testar_recuperacao() and passou
+        passou = testar_compartilhamento() and passou
+        passou = testar_semantico_completo() and passou
+        passou = testar_dobra_constantes() and passou
+        passou = testar_peephole() and passou
+        passou = testar_ir() and passou
+        passou = testar_ssa() and passou
+        passou = testar_invariantes() and passou
+        passou = testar_cache_ast() and passou
+
+        if passou:
             print("\nTODOS OS TESTES PASSARAM!")
         else:
             print("\nALGUNS TESTES FALHARAM. Verifique o log acima.")
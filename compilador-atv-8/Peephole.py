@@ -0,0 +1,159 @@
+# OTIMIZADOR PEEPHOLE
+# Olha só para as últimas linhas já emitidas (a "janela") e troca padrões
+# conhecidos por sequências equivalentes mais curtas. Cada linha é lida uma
+# vez para a forma (operação, (operandos)); rótulos viram (':', (nome,)) e
+# comentários ('#', (linha,)), que interrompem os padrões. Cada regra recebe
+# a janela nessa forma e retorna (quantas do fim remover, novas) ou None.
+
+# saltos condicionais depois de cmp: set da comparação -> salto do caso falso
+SALTO_CONTRARIO = {'setl': 'jge', 'setg': 'jle', 'sete': 'jne'}
+
+def analisar(linha):
+    """Forma (operação, (operandos)) de uma linha de assembly."""
+    limpa = linha.strip()
+    if not limpa or limpa.startswith('#'):
+        return '#', (linha,)
+    linha = limpa
+    if linha.endswith(':'):
+        return ':', (linha[:-1],)
+    operacao, _, resto = linha.partition(' ')
+    return operacao, tuple(resto.split(', ')) if resto else ()
+
+
+def texto(parte):
+    operacao, operandos = parte
+    if operacao == '#':
+        return operandos[0]
+    if operacao == ':':
+        return f"{operandos[0]}:"
+    return f"  {operacao} {', '.join(operandos)}"
+
+
+def registrador(operando):
+    return operando.startswith('%')
+
+
+# REGRAS (o nome da função diz o padrão; a chave em REGRAS é a operação
+# da última linha, a única que muda entre uma tentativa e outra)
+def push_pop(partes):
+    # push X / pop Y  ->  mov X, Y  (nada, se X e Y são o mesmo)
+    a, b = partes[-2:]
+    if a[0] == 'push':
+        origem, destino = a[1][0], b[1][0]
+        return 2, [] if origem == destino else [('mov', (origem, destino))]
+    return None
+
+
+def push_mov_pop(partes):
+    # push %rax / mov Y, %rax / pop %rbx  ->  mov %rax, %rbx / mov Y, %rax
+    a, b, c = partes[-3:]
+    if (a == ('push', ('%rax',)) and c == ('pop', ('%rbx',))
+            and b[0] == 'mov' and b[1][1] == '%rax'
+            and not any(reg in b[1][0] for reg in ('%rax', '%rbx', '%rsp'))):
+        return 3, [('mov', ('%rax', '%rbx')), b]
+    return None
+
+
+def guardado_e_relido(partes):
+    # mov %rax, M / mov M, %rax  ->  o segundo mov é desnecessário
+    a, b = partes[-2:]
+    if a[0] == 'mov' and not registrador(a[1][1]) and a[1] == b[1][::-1]:
+        return 1, []
+    return None
+
+
+def mov_encaminhado(partes):
+    # mov X, %rax / mov %rax, %rbx / mov Y, %rax  ->  mov X, %rbx / mov Y, %rax
+    # (o valor de %rax do primeiro mov morre no terceiro)
+    a, b, c = partes[-3:]
+    if (a[0] == b[0] == 'mov' and a[1][1] == '%rax' and b[1] == ('%rax', '%rbx')
+            and c[1][1] == '%rax' and '%rbx' not in a[1][0] and '%rax' not in c[1][0]):
+        return 3, [('mov', (a[1][0], '%rbx')), c]
+    return None
+
+
+def salto_para_o_proximo(partes):
+    # jmp L seguido só de rótulos, entre eles L: o salto não faz nada
+    i = len(partes) - 1
+    rotulos = set()
+    while i >= 0 and partes[i][0] == ':':
+        rotulos.add(partes[i][1][0])
+        i -= 1
+
+    if i >= 0 and partes[i][0] == 'jmp' and partes[i][1][0] in rotulos:
+        return len(partes) - i, partes[i + 1:]
+    return None
+
+
+def comparacao_e_salto(partes):
+    # setCC %al / movzb %al, %rax / cmp $0, %rax / jz L  ->  setCC, movzb e o salto
+    # contrário de CC: as flags ainda são as do cmp que veio antes do set
+    a, b, c, d = partes[-4:]
+    if (a[0] in SALTO_CONTRARIO and a[1] == ('%al',)
+            and b == ('movzb', ('%al', '%rax')) and c == ('cmp', ('$0', '%rax'))):
+        return 2, [(SALTO_CONTRARIO[a[0]], d[1])]
+    return None
+
+
+# (nome, nível mínimo de otimização, operação da última linha, tamanho da janela, regra)
+REGRAS = [
+    ("push/pop", 1, 'pop', 2, push_pop),
+    ("push/mov/pop", 1, 'pop', 3, push_mov_pop),
+    ("valor guardado e relido", 1, 'mov', 2, guardado_e_relido),
+    ("mov encaminhado", 1, 'mov', 3, mov_encaminhado),
+    ("salto para o próximo rótulo", 1, ':', 2, salto_para_o_proximo),
+    ("comparação seguida de salto", 2, 'jz', 4, comparacao_e_salto),
+]
+
+
+class Peephole:
+    """Aplica as REGRAS do nível escolhido até nenhuma mudar mais nada.
+
+    Uma passada basta para chegar ao ponto fixo: as linhas que uma troca
+    produz voltam para a entrada e são testadas de novo, e uma janela só
+    depende das linhas que terminam nela.
+
+    contagem[nome] guarda quantas reescritas cada regra fez.
+    """
+
+    def __init__(self, nivel=1):
+        self.contagem = {}
+        # operação da última linha -> regras que podem casar
+        self.regras = {}
+        for nome, minimo, ultima, janela, regra in REGRAS:
+            if minimo <= nivel:
+                self.regras.setdefault(ultima, []).append((nome, janela, regra))
+                self.contagem[nome] = 0
+
+    def otimizar(self, instrucoes):
+        # linhas repetidas (push %rax, pop %rbx, ...) são lidas uma vez só
+        formas = {}
+        linhas = {}
+        for linha in instrucoes:
+            if linha not in formas:
+                formas[linha] = analisar(linha)
+                linhas[formas[linha]] = linha
+
+        pendentes = [formas[linha] for linha in reversed(instrucoes)]
+        saida = []
+        regras = self.regras
+
+        while pendentes:
+            saida.append(pendentes.pop())
+
+            for nome, janela, regra in regras.get(saida[-1][0], ()):
+                if len(saida) < janela:
+                    continue
+                troca = regra(saida)
+                if troca is not None:
+                    quantas, novas = troca
+                    del saida[len(saida) - quantas:]
+                    # as linhas novas são testadas como se viessem da entrada
+                    pendentes.extend(reversed(novas))
+                    self.contagem[nome] += 1
+                    break
+
+        return [linhas.get(parte) or texto(parte) for parte in saida]
+
+    def relatorio(self):
+        return "\n".join(f"  {nome}: {n}" for nome, n in self.contagem.items())
@@ -1,10 +1,43 @@
+from collections import deque
+from itertools import repeat
 from Token import Token
 
+
+class FluxoTokens:
+    """Fluxo de tokens sob demanda com um buffer de lookahead limitado.
+
+    Cada token sai do gerador uma única vez: olhar(k) só enche o buffer
+    até a posição k, e consumir() esvazia o buffer antes de pedir um
+    novo token ao gerador.
+    """
+
+    def __init__(self, tokens, capacidade=4):
+        self.tokens = tokens
+        self.buffer = deque()
+        self.capacidade = capacidade
+
+    def olhar(self, k=0):
+        """Retorna o k-ésimo token à frente (0 = o próximo) sem consumir."""
+        if k >= self.capacidade:
+            raise ValueError(f"Lookahead de {k + 1} tokens excede o buffer de {self.capacidade}")
+
+        while len(self.buffer) <= k:
+            self.buffer.append(next(self.tokens))
+
+        return self.buffer[k]
+
+    def consumir(self):
+        if self.buffer:
+            return self.buffer.popleft()
+        return next(self.tokens)
+
+
 class Lexer:
     def __init__(self, texto):
         self.texto = texto
         self.pos = 0
         self.char_atual = self.texto[self.pos] if self.texto else None
+        self.fluxo = FluxoTokens(self.gerar_tokens())
 
     def avancar(self):
         self.pos += 1
@@ -14,16 +47,22 @@ class Lexer:
         while self.char_atual is not None and self.char_atual.isspace():
             self.avancar()
 
-    def olhar_proximo_token(self):
-        """Retorna o próximo token sem consumir (lookahead)."""
-        pos_salva = self.pos
-        char_salvo = self.char_atual
-        tok = self.proximo_token()
-        self.pos = pos_salva
-        self.char_atual = char_salvo
-        return tok
+    def gerar_tokens(self):
+        """Gera os tokens um a um; depois do fim, repete o EOF."""
+        while True:
+            tok = self.ler_token()
+            if tok.tipo == 'EOF':
+                yield from repeat(tok)
+            yield tok
+
+    def olhar_proximo_token(self, k=0):
+        """Retorna o próximo token (ou o k-ésimo adiante) sem consumir (lookahead)."""
+        return self.fluxo.olhar(k)
 
     def proximo_token(self):
+        return self.fluxo.consumir()
+
+    def ler_token(self):
         while self.char_atual is not None:
             if self.char_atual.isspace():
                 self.pular_espacos()
@@ -38,12 +38,17 @@ class Programa:
 class Parser:
     def __init__(self, lexer):
         self.lexer = lexer
-        self.token_atual = self.lexer.proximo_token()
+        self.tokens = lexer.fluxo
+        self.token_atual = self.tokens.consumir()
+
+    def olhar(self, k=1):
+        """Retorna o token k posições depois do atual, sem consumir."""
+        return self.tokens.olhar(k - 1)
 
     def comer(self, tipo):
         if self.token_atual.tipo == tipo:
             tok = self.token_atual
-            self.token_atual = self.lexer.proximo_token()
+            self.token_atual = self.tokens.consumir()
             return tok
         else:
             raise Exception(f"Erro sintático: esperado {tipo}, recebido {self.token_atual.tipo} ('{self.token_atual.lexema}')")
@@ -4,6 +4,7 @@ from Lexer import Lexer
 from Syntactic import Parser
 from Semantic import AnalisadorSemantico
 from Generator import Generator
+from Peephole import Peephole
 
 MODELO_ASSEMBLY = """
   .section .bss
@@ -22,12 +23,20 @@ _start:
 """
 
 def main():
-    if len(sys.argv) < 3:
-        print("Uso: python main.py <arquivo.ev> <arquivo_saida.s>")
+    argumentos = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    opcoes = [arg for arg in sys.argv[1:] if arg.startswith('--')]
+    if len(argumentos) < 2:
+        print("Uso: python main.py <arquivo.ev> <arquivo_saida.s> [--otimizacao=0|1|2] [--relatorio]")
         sys.exit(1)
 
-    arquivo_entrada = sys.argv[1]
-    arquivo_saida_nome = sys.argv[2]
+    arquivo_entrada = argumentos[0]
+    arquivo_saida_nome = argumentos[1]
+
+    # --otimizacao=N: 0 desliga o peephole, 1 (padrão) aplica as regras básicas
+    nivel = 1
+    for opcao in opcoes:
+        if opcao.startswith('--otimizacao='):
+            nivel = int(opcao.split('=', 1)[1])
 
     with open(arquivo_entrada, 'r') as f:
         codigo_fonte = f.read()
@@ -48,6 +57,14 @@ def main():
     gerador = Generator()
     gerador.gera_programa(ast)
 
+    # 5. Otimização peephole
+    if nivel > 0:
+        peephole = Peephole(nivel)
+        gerador.instrucoes = peephole.otimizar(gerador.instrucoes)
+        if '--relatorio' in opcoes:
+            print("Peephole:")
+            print(peephole.relatorio())
+
     codigo_bss = gerador.get_codigo_bss()
     codigo_text = gerador.get_codigo_text()
 
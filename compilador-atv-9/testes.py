@@ -1,5 +1,7 @@
 import os
 import subprocess
+from Lexer import Lexer
+from Syntactic import Parser
 
 TESTES_SUCESSO = [
     # Programas sem variáveis (apenas expressão final)
@@ -173,6 +175,44 @@ def testar_erros_lexico_sintatico():
     return passou_todos
 
 
+def testar_lookahead():
+    print("\n--- Rodando Teste de Lookahead (FluxoTokens) ---")
+    passou_todos = True
+
+    # olhar k tokens à frente e depois consumi-los: saem os mesmos, na ordem
+    lexer = Lexer("a = 1 + b")
+    vistos = [lexer.olhar_proximo_token(k) for k in range(4)]
+    consumidos = [lexer.proximo_token() for _ in range(4)]
+    if [tok.lexema for tok in vistos] != ['a', '=', '1', '+'] or any(a is not b for a, b in zip(vistos, consumidos)):
+        print(f"Lookahead Falhou: olhou {[t.lexema for t in vistos]}, consumiu {[t.lexema for t in consumidos]}")
+        passou_todos = False
+
+    # o buffer guarda no máximo capacidade tokens
+    try:
+        lexer.olhar_proximo_token(lexer.fluxo.capacidade)
+        print("Lookahead Falhou: olhar além da capacidade não levantou ValueError")
+        passou_todos = False
+    except ValueError:
+        pass
+
+    # depois do último token, o EOF se repete (no olhar e no consumir)
+    ultimo = lexer.proximo_token()
+    fins = [lexer.olhar_proximo_token(k).tipo for k in range(3)] + [lexer.proximo_token().tipo for _ in range(3)]
+    if ultimo.lexema != 'b' or fins != ['EOF'] * 6:
+        print(f"Lookahead Falhou: esperava EOF repetido depois de 'b', obteve {fins}")
+        passou_todos = False
+
+    # Parser.olhar(k) é o token k posições depois do atual
+    parser = Parser(Lexer("a = 1 + b"))
+    if [parser.olhar(k).lexema for k in (1, 2, 3)] != ['=', '1', '+'] or parser.token_atual.lexema != 'a':
+        print("Lookahead Falhou: Parser.olhar não devolveu os tokens seguintes ao atual")
+        passou_todos = False
+
+    if passou_todos:
+        print("Lookahead Passou")
+    return passou_todos
+
+
 if __name__ == '__main__':
     if not os.path.exists("runtime.s"):
         print("Aviso: O arquivo 'runtime.s' não foi encontrado no diretório. Os testes de execução falharão.")
@@ -181,8 +221,9 @@ if __name__ == '__main__':
         sucesso = testar_sucesso()
         semantico = testar_erros_semanticos()
         lexico_sintatico = testar_erros_lexico_sintatico()
+        lookahead = testar_lookahead()
 
-        if sucesso and semantico and lexico_sintatico:
+        if sucesso and semantico and lexico_sintatico and lookahead:
             print("\nTODOS OS TESTES PASSARAM!")
         else:
             print("\nALGUNS TESTES FALHARAM. Verifique o log acima.")
@@ -1,7 +1,12 @@
-from models.Token import Token, PONTUACOES, OPERADORES
+from models.Token import (
+    Token, PONTUACOES, CHAR_CLASSES, TRANSITIONS, ACCEPTING, N_CLASSES,
+    CLASSE_INVALIDO, CLASSE_ESPACO, CLASSE_DIGITO, ESTADO_MORTO, ESTADO_INICIAL,
+)
 from errors import LexicalError
 
-from typing import IO, List, Tuple
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
 
 class LexAnalyzer:
     """
@@ -24,6 +29,44 @@ class LexAnalyzer:
         """
         return self.get_tokens(source_code), self.errors
 
+    def analyze_parallel(self, source_code: IO, workers: Optional[int] = None) -> Tuple[List[Token], List[LexicalError]]:
+        """
+        Variante de analyze que divide a entrada em blocos de linhas e analisa
+        cada bloco em um processo separado.
+
+        Nenhum token atravessa uma quebra de linha, então os blocos são
+        independentes. Os resultados são juntados na ordem da entrada: tokens,
+        posições e erros saem iguais aos de analyze.
+
+        Args:
+            source_code (IO): O arquivo de entrada.
+            workers (Optional[int]): Número de processos (padrão: número de CPUs).
+
+        Returns:
+            Tuple[List[Token], List[LexicalError]]: A lista de tokens e a lista de erros encontrados.
+        """
+        lines = list(source_code)
+        workers = workers or os.cpu_count() or 1
+        size = max(1, -(-len(lines) // workers))
+        starts = range(0, len(lines), size)
+
+        if len(starts) <= 1:
+            return self.analyze(lines)
+
+        chunks = [lines[start:start + size] for start in starts]
+
+        with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            results = list(executor.map(_analyze_chunk, chunks, starts))
+
+        for index, (tokens, errors) in enumerate(results):
+            # só o último bloco mantém o END_OF_FILE
+            if index < len(results) - 1:
+                tokens.pop()
+            self.tokens.extend(tokens)
+            self.errors.extend(errors)
+
+        return self.tokens, self.errors
+
     def get_tokens(self, source_code: IO) -> List[Token]:
         """
         Analisa o arquivo de entrada linha por linha e gera uma lista de tokens.
@@ -31,58 +74,88 @@ class LexAnalyzer:
         Returns:
             List[Token]: A lista de tokens encontrados no arquivo de entrada.
         """
-        line_index = 0
+        self.tokens.extend(self.iter_tokens(source_code))
+        return self.tokens
+
+    def iter_tokens(self, source_code: Iterable[str], first_line: int = 0) -> Iterator[Token]:
+        """
+        Analisa o arquivo de entrada sob demanda, gerando um token por vez.
+
+        Cada linha só é lida quando o consumidor (por exemplo, o Parser) pede
+        o próximo token, e os tokens não são guardados em self.tokens. Os erros
+        léxicos continuam sendo acumulados em self.errors.
+
+        Args:
+            source_code (Iterable[str]): O arquivo de entrada (ou qualquer sequência de linhas).
+            first_line (int): O número da primeira linha, usado nas posições.
+
+        Yields:
+            Token: O próximo token do arquivo de entrada, terminando com END_OF_FILE.
+        """
+        line_index = first_line
         column_index = 0
 
-        for line_index, line in enumerate(source_code):
+        for line_index, line in enumerate(source_code, first_line):
             column_index = 0
             while column_index < len(line):
-                char = line[column_index]
+                char_class = self._classify(line, column_index)
 
-                if char.isdigit():
-                    column_index = self._process_number(line, line_index, column_index)
+                if char_class == CLASSE_ESPACO:
+                    column_index += 1
                     continue
-                
-                elif char in PONTUACOES:
-                    self._add_token(PONTUACOES[char]["tipo"], PONTUACOES[char]["lexema"], line_index, column_index)
-                
-                elif char in OPERADORES:
-                    self._add_token(OPERADORES[char]["tipo"], OPERADORES[char]["lexema"], line_index, column_index)
-                
-                elif char == " " or char == "\n":
-                    pass
-                
-                else:
-                    self.errors.append(LexicalError(posicao=(line_index, column_index)))
-                
-                column_index += 1
-
-        self.tokens.append(Token(PONTUACOES["EOF"]["tipo"], PONTUACOES["EOF"]["lexema"], (line_index, column_index)))
-        return self.tokens
 
-    def _process_number(self, line: str, line_index: int, start_index: int) -> int:
+                # maior prefixo aceito pelo autômato a partir de start
+                start = column_index
+                state = ESTADO_INICIAL
+                end = -1
+                kind = None
+                while True:
+                    state = TRANSITIONS[state * N_CLASSES + char_class]
+                    if state == ESTADO_MORTO:
+                        break
+                    column_index += 1
+                    if ACCEPTING[state] is not None:
+                        end = column_index
+                        kind = ACCEPTING[state]
+                    if column_index == len(line):
+                        break
+                    char_class = self._classify(line, column_index)
+
+                if kind is None:
+                    self.errors.append(LexicalError(posicao=(line_index, start)))
+                    column_index = start + 1
+                    continue
+
+                column_index = end
+                yield Token(kind, line[start:end], (line_index, start))
+
+        yield Token(PONTUACOES["EOF"]["tipo"], PONTUACOES["EOF"]["lexema"], (line_index, column_index))
+
+    @staticmethod
+    def _classify(line: str, index: int) -> int:
         """
-        Extrai um token de número da linha começando em start_index.
+        Retorna a classe do caractere em line[index] (consulta em CHAR_CLASSES).
 
         Args:
             line (str): A linha atual do código.
-            line_index (int): O número da linha atual.
-            start_index (int): O índice da coluna inicial do número.
+            index (int): O índice do caractere.
 
         Returns:
-            int: O novo índice da coluna após processar o número.
-        """
-        number = ""
-        current_index = start_index
-        while current_index < len(line) and line[current_index].isdigit():
-            number += line[current_index]
-            current_index += 1
-        
-        self.tokens.append(Token("NUMERO", number, (line_index, start_index)))
-        return current_index
-
-    def _add_token(self, token_type: str, lexeme: str, line_index: int, column_index: int):
+            int: A classe do caractere no autômato.
         """
-        Adiciona um token à lista de tokens.
-        """
-        self.tokens.append(Token(token_type, lexeme, (line_index, column_index)))
\ No newline at end of file
+        code = ord(line[index])
+        if code < 256:
+            return CHAR_CLASSES[code]
+        return CLASSE_DIGITO if line[index].isdigit() else CLASSE_INVALIDO
+
+
+def _analyze_chunk(lines: List[str], first_line: int) -> Tuple[List[Token], List[LexicalError]]:
+    """
+    Analisa um bloco de linhas em um processo separado (usado por analyze_parallel).
+
+    Returns:
+        Tuple[List[Token], List[LexicalError]]: Os tokens (com END_OF_FILE) e os erros do bloco.
+    """
+    analyzer = LexAnalyzer()
+    tokens = list(analyzer.iter_tokens(lines, first_line))
+    return tokens, analyzer.errors
@@ -2,33 +2,48 @@ from io import StringIO
 import sys
 
 from lex import LexAnalyzer
-from parser import Parser
+from parser import Parser, SyntaxError
 from errors import LexicalError
 
 
+def show_errors(errors):
+    for error in errors:
+        error.show()
+    sys.exit(1)
+
+
 def main():
     if len(sys.argv) != 2:
-        print("Uso: python3 main.py \"<expressao>\"")
+        print("Uso: python3 main.py \"<expressao>\"  (ou \"-\" para ler da entrada padrão)")
         sys.exit(1)
 
     source = sys.argv[1]
 
     lex = LexAnalyzer()
-    tokens, errors = lex.analyze(StringIO(source))
 
-    if errors:
-        for error in errors:
-            error.show()
-        sys.exit(1)
+    if source == "-":
+        # Modo streaming: o parser puxa os tokens da entrada padrão sob demanda,
+        # então os erros léxicos só são conhecidos ao fim da análise sintática.
+        tokens, errors = lex.iter_tokens(sys.stdin), lex.errors
+    else:
+        tokens, errors = lex.analyze(StringIO(source))
+
+        if errors:
+            show_errors(errors)
 
     parser = Parser(tokens)
 
     try:
         tree = parser.parse()
     except SyntaxError as e:
+        if errors:
+            show_errors(errors)
         print(f"SyntaxError: {e}")
         sys.exit(1)
 
+    if errors:
+        show_errors(errors)
+
     print("Árvore sintática:")
     print(tree.imprimir())
 
@@ -1,3 +1,6 @@
+from array import array
+from typing import List, Optional, Tuple
+
 class Token:
     """
     Representa um token para análise léxica.
@@ -44,4 +47,64 @@ OPERADORES = {
         "tipo": "DIVISAO",
         "lexema": "/",
     },
-}
\ No newline at end of file
+}
+
+# AUTÔMATO DO ANALISADOR LÉXICO
+# Gerado a partir de PONTUACOES e OPERADORES (o mesmo formato de tabela usado
+# pelo LexerAFD do compilador atv-10). Um token novo só precisa de uma entrada
+# nas tabelas acima; o custo por caractere continua sendo uma consulta.
+CLASSE_INVALIDO, CLASSE_ESPACO, CLASSE_DIGITO = range(3)
+ESTADO_MORTO, ESTADO_INICIAL, ESTADO_NUMERO = range(3)
+
+
+def build_dfa(specs: dict) -> Tuple[bytes, array, List[Optional[str]], int]:
+    """
+    Monta as tabelas do autômato a partir das especificações dos tokens fixos.
+
+    Args:
+        specs (dict): Tabelas no formato de PONTUACOES/OPERADORES (a entrada "EOF" é ignorada).
+
+    Returns:
+        Tuple[bytes, array, List[Optional[str]], int]: A classe de cada caractere de 0 a 255,
+        as transições (uma linha de n_classes colunas por estado), o tipo aceito em
+        cada estado (ou None) e o número de classes.
+    """
+    lexemas = {lexema: spec["tipo"] for lexema, spec in specs.items() if lexema != "EOF"}
+    caracteres = sorted({char for lexema in lexemas for char in lexema})
+    classe_simbolo = {char: CLASSE_DIGITO + 1 + i for i, char in enumerate(caracteres)}
+    n_classes = CLASSE_DIGITO + 1 + len(caracteres)
+
+    def classificar(char: str) -> int:
+        if char in classe_simbolo:
+            return classe_simbolo[char]
+        if char == " " or char == "\n":
+            return CLASSE_ESPACO
+        if char.isdigit():
+            return CLASSE_DIGITO
+        return CLASSE_INVALIDO
+
+    classes = bytes(classificar(chr(code)) for code in range(256))
+
+    linhas = [[ESTADO_MORTO] * n_classes for _ in range(ESTADO_NUMERO + 1)]
+    aceitacao: List[Optional[str]] = [None] * len(linhas)
+
+    linhas[ESTADO_INICIAL][CLASSE_DIGITO] = ESTADO_NUMERO
+    linhas[ESTADO_NUMERO][CLASSE_DIGITO] = ESTADO_NUMERO
+    aceitacao[ESTADO_NUMERO] = "NUMERO"
+
+    for lexema, tipo in lexemas.items():
+        estado = ESTADO_INICIAL
+        for char in lexema:
+            classe = classe_simbolo[char]
+            if linhas[estado][classe] == ESTADO_MORTO:
+                linhas[estado][classe] = len(linhas)
+                linhas.append([ESTADO_MORTO] * n_classes)
+                aceitacao.append(None)
+            estado = linhas[estado][classe]
+        aceitacao[estado] = tipo
+
+    transicoes = array("B", [destino for linha in linhas for destino in linha])
+    return classes, transicoes, aceitacao, n_classes
+
+
+CHAR_CLASSES, TRANSITIONS, ACCEPTING, N_CLASSES = build_dfa({**PONTUACOES, **OPERADORES})
@@ -6,17 +6,30 @@ class SyntaxError(Exception):
 
 
 class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
+    def __init__(self, tokens, iterativo=False):
+        # aceita a lista pronta ou um iterador (LexAnalyzer.iter_tokens):
+        # os tokens são puxados um a um, conforme a análise avança
+        self.tokens = iter(tokens)
+        self.atual = None
         self.pos = 0
 
+        # modo iterativo: pilha explícita no lugar da recursão, sem limite
+        # de profundidade para expressões muito aninhadas
+        if iterativo:
+            self.analisa_expressao = self.analisa_expressao_iterativa
+
     def proximo_token(self):
-        token = self.tokens[self.pos]
+        token = self.token_atual()
+        self.atual = None
         self.pos += 1
         return token
 
     def token_atual(self):
-        return self.tokens[self.pos]
+        if self.atual is None:
+            self.atual = next(self.tokens, None)
+            if self.atual is None:
+                raise SyntaxError("Fim inesperado da entrada")
+        return self.atual
 
     def verificar(self, tipo_esperado):
         token = self.proximo_token()
@@ -53,6 +66,41 @@ class Parser:
                 f"(linha {token.posicao[0]}, coluna {token.posicao[1]})"
             )
 
+    def analisa_expressao_iterativa(self):
+        """
+        Mesma gramática de analisa_expressao, com uma pilha de quadros no lugar
+        das chamadas recursivas: cada '(' aberto empilha um quadro que guarda o
+        operando esquerdo e o operador. Gera a mesma árvore e os mesmos erros.
+        """
+        quadros = []
+
+        while True:
+            token = self.proximo_token()
+
+            if token.tipo == "ABRE_PARENTESE":
+                quadros.append(())
+                continue
+
+            if token.tipo != "NUMERO":
+                raise SyntaxError(
+                    f"Token inesperado {token.tipo} "
+                    f"(linha {token.posicao[0]}, coluna {token.posicao[1]})"
+                )
+
+            no = Const(int(token.lexema))
+
+            # o nó completa o operando direito dos quadros que já têm operador
+            while quadros and quadros[-1]:
+                op_esq, operador = quadros.pop()
+                self.verificar("FECHA_PARENTESE")
+                no = OpBin(operador, op_esq, no)
+
+            if not quadros:
+                return no
+
+            # senão, é o operando esquerdo do quadro do topo
+            quadros[-1] = (no, self.analisa_operador())
+
     def analisa_operador(self):
         token = self.proximo_token()
         if token.tipo in {
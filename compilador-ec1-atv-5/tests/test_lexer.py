@@ -14,6 +14,7 @@ Executar com: python3 -m unittest test_lexer -v
 import unittest
 from io import StringIO
 from lex import LexAnalyzer
+from models.Token import build_dfa, ESTADO_INICIAL, PONTUACOES, OPERADORES
 
 
 def format_tokens(tokens):
@@ -392,5 +393,110 @@ class TestOutputFormat(unittest.TestCase):
         self.assertIn("coluna 4", output[0])
 
 
+
+class TestStreaming(unittest.TestCase):
+    """Testes para a geração de tokens sob demanda (iter_tokens)."""
+
+    def test_same_tokens_as_get_tokens(self):
+        """Testa que o modo streaming gera os mesmos tokens da lista."""
+        code = "(1 + 2)\n* (30 / 4)"
+        tokens, _ = LexAnalyzer().analyze(StringIO(code))
+        streamed = list(LexAnalyzer().iter_tokens(StringIO(code)))
+
+        self.assertEqual(format_tokens(streamed), format_tokens(tokens))
+
+    def test_reads_input_lazily(self):
+        """Testa que as linhas só são lidas quando os tokens são pedidos."""
+        lidas = []
+
+        def linhas():
+            for linha in ["1 +\n", "2\n", "3\n"]:
+                lidas.append(linha)
+                yield linha
+
+        analyzer = LexAnalyzer()
+        stream = analyzer.iter_tokens(linhas())
+
+        self.assertEqual(next(stream).lexema, "1")
+        self.assertEqual(len(lidas), 1)
+        self.assertEqual(analyzer.tokens, [])
+
+    def test_errors_collected_while_streaming(self):
+        """Testa que os erros léxicos são acumulados durante o streaming."""
+        analyzer = LexAnalyzer()
+        list(analyzer.iter_tokens(StringIO("1 + x")))
+
+        self.assertEqual(len(analyzer.errors), 1)
+        self.assertEqual(analyzer.errors[0].posicao, (0, 4))
+
+
+
+class TestParallel(unittest.TestCase):
+    """Testes para a análise léxica em paralelo (analyze_parallel)."""
+
+    CODE = "(1 + 2)\n(3 * x)\n\n(40 / 5)\n@ (6 - 7)\n8"
+
+    def test_same_tokens_as_sequential(self):
+        """Testa que o resultado em paralelo é igual ao sequencial."""
+        tokens, _ = LexAnalyzer().analyze(StringIO(self.CODE))
+        parallel, _ = LexAnalyzer().analyze_parallel(StringIO(self.CODE), workers=3)
+
+        self.assertEqual(format_tokens(parallel), format_tokens(tokens))
+
+    def test_errors_in_source_order(self):
+        """Testa que os erros saem na ordem do código-fonte."""
+        _, errors = LexAnalyzer().analyze_parallel(StringIO(self.CODE), workers=3)
+
+        self.assertEqual([e.posicao for e in errors], [(1, 5), (4, 0)])
+
+    def test_single_eof(self):
+        """Testa que só existe um END_OF_FILE, no final."""
+        tokens, _ = LexAnalyzer().analyze_parallel(StringIO(self.CODE), workers=3)
+
+        eofs = [t for t in tokens if t.tipo == "END_OF_FILE"]
+        self.assertEqual(len(eofs), 1)
+        self.assertIs(tokens[-1], eofs[0])
+
+
+class TestDFA(unittest.TestCase):
+    """Testes para o autômato gerado a partir de PONTUACOES e OPERADORES."""
+
+    def run_dfa(self, tables, text):
+        """Percorre o autômato e retorna o tipo aceito pelo texto inteiro."""
+        classes, transitions, accepting, n_classes = tables
+        state = ESTADO_INICIAL
+        for char in text:
+            state = transitions[state * n_classes + classes[ord(char)]]
+        return accepting[state]
+
+    def test_tables_are_compact(self):
+        """Testa que as tabelas ficam em bytes/array, com 256 classes de caractere."""
+        classes, transitions, _, n_classes = build_dfa({**PONTUACOES, **OPERADORES})
+
+        self.assertIsInstance(classes, bytes)
+        self.assertEqual(len(classes), 256)
+        self.assertEqual(len(transitions) % n_classes, 0)
+
+    def test_new_token_only_needs_spec_entry(self):
+        """Testa que um operador novo de dois caracteres é reconhecido só pela tabela."""
+        specs = {**PONTUACOES, **OPERADORES, "**": {"tipo": "POTENCIA", "lexema": "**"}}
+        tables = build_dfa(specs)
+
+        self.assertEqual(self.run_dfa(tables, "**"), "POTENCIA")
+        self.assertEqual(self.run_dfa(tables, "*"), "MULTIPLICACAO")
+        self.assertEqual(self.run_dfa(tables, "123"), "NUMERO")
+
+    def test_multi_digit_numbers(self):
+        """Testa que números com vários dígitos viram um único token."""
+        tokens, errors = LexAnalyzer().analyze(StringIO("(1234*56)"))
+
+        self.assertEqual(format_tokens(tokens)[1:4], [
+            "<NUMERO, '1234', (0, 1)>",
+            "<MULTIPLICACAO, '*', (0, 5)>",
+            "<NUMERO, '56', (0, 6)>",
+        ])
+        self.assertEqual(errors, [])
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -16,6 +16,7 @@ from io import StringIO
 
 from lex import LexAnalyzer
 from parser import Parser, SyntaxError
+from ast_ec1 import OpBin
 
 
 class ParserTestBase(unittest.TestCase):
@@ -99,5 +100,68 @@ class TestSyntaxErrors(unittest.TestCase):
             self.parse_with_error("1 2")
 
 
+
+class TestStreamingParser(unittest.TestCase):
+    """Testes para o parser consumindo tokens sob demanda."""
+
+    def parse_stream(self, code: str):
+        lex = LexAnalyzer()
+        tree = Parser(lex.iter_tokens(StringIO(code))).parse()
+        self.assertEqual(len(lex.errors), 0, "Erro léxico inesperado")
+        return tree
+
+    def test_nested_expression(self):
+        tree = self.parse_stream("(33 + (912 * 11))")
+        self.assertEqual(tree.avaliar(), 33 + 912 * 11)
+        self.assertEqual(tree.imprimir(), "(33 + (912 * 11))")
+
+    def test_multiline_expression(self):
+        tree = self.parse_stream("((1 + 2)\n*\n(3 + 4))")
+        self.assertEqual(tree.avaliar(), 21)
+
+    def test_syntax_error(self):
+        with self.assertRaises(SyntaxError):
+            self.parse_stream("(1 + 2")
+
+
+class TestIterativeParser(unittest.TestCase):
+    """Testes para o parser com pilha explícita (Parser(tokens, iterativo=True))."""
+
+    def parse_both(self, code: str):
+        tokens, errors = LexAnalyzer().analyze(StringIO(code))
+        self.assertEqual(len(errors), 0, "Erro léxico inesperado")
+        return Parser(tokens).parse(), Parser(tokens, iterativo=True).parse()
+
+    def test_same_tree_as_recursive(self):
+        for code in ["42", "(1 + 2)", "((2 * (3 + 4)) - 5)", "(((1 + 2) * 3) / (4 - (5 + 6)))"]:
+            recursiva, iterativa = self.parse_both(code)
+            self.assertEqual(iterativa.imprimir(), recursiva.imprimir())
+            self.assertEqual(iterativa.avaliar(), recursiva.avaliar())
+
+    def test_no_recursion_limit(self):
+        depth = 5000
+        code = "(1 + " * depth + "1" + ")" * depth
+        tokens, _ = LexAnalyzer().analyze(StringIO(code))
+
+        tree = Parser(tokens, iterativo=True).parse()
+
+        niveis = 0
+        while isinstance(tree, OpBin):
+            self.assertEqual(tree.esq.valor, 1)
+            tree = tree.dir
+            niveis += 1
+        self.assertEqual(niveis, depth)
+
+    def test_same_errors_as_recursive(self):
+        for code in ["(1 + 2", "1 + 2)", "()", "(+ 1)", "(1 2)", "(1 + 2) 3"]:
+            tokens, _ = LexAnalyzer().analyze(StringIO(code))
+            mensagens = []
+            for iterativo in (False, True):
+                with self.assertRaises(SyntaxError) as ctx:
+                    Parser(tokens, iterativo=iterativo).parse()
+                mensagens.append(str(ctx.exception))
+            self.assertEqual(mensagens[0], mensagens[1], code)
+
+
 if __name__ == "__main__":
     unittest.main()